@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""
+compiled_dictionary.py - Compiled, memory-mapped dictionary format
+コンパイル済み・メモリマップ辞書形式
+
+================================================================================
+WHY THIS MODULE EXISTS / このモジュールが存在する理由
+================================================================================
+
+The JSON dictionaries ({reading: {surface: count}}) are easy to edit and
+inspect, but loading them means parsing tens of MB of JSON and building a
+nested Python dict on every engine start. With SKK-JISYO.L plus okurigana
+expansion this costs seconds of CPU and hundreds of MB of RSS.
+
+JSON辞書（{読み: {表層形: カウント}}）は編集や確認が容易だが、読み込むには
+エンジン起動のたびに数十MBのJSONを解析し、ネストしたPython辞書を構築する
+必要がある。SKK-JISYO.Lと送り仮名展開では数秒のCPUと数百MBのメモリを消費する。
+
+This module compiles a JSON dictionary into a flat binary file that can be
+mmap()ed and queried IN PLACE. Opening it costs almost nothing, and pages are
+shared between processes through the OS page cache.
+
+このモジュールはJSON辞書をフラットなバイナリファイルにコンパイルし、
+mmap()でその場で検索できるようにする。オープンのコストはほぼゼロで、
+ページはOSのページキャッシュを通じてプロセス間で共有される。
+
+The JSON files remain the editable source of truth. The compiled file is a
+derived artifact written next to it (system_dictionary.json →
+system_dictionary.bin) and is only used while it is FRESH, i.e. while the
+size and mtime recorded at compile time still match the JSON file.
+
+JSONファイルは編集可能な正本のまま。コンパイル済みファイルはその隣に
+書き出される派生物（system_dictionary.json → system_dictionary.bin）で、
+新鮮な間（コンパイル時に記録したサイズとmtimeがJSONファイルと一致する間）
+のみ使用される。
+
+================================================================================
+FILE LAYOUT / ファイル構造
+================================================================================
+
+All integers are little-endian. / 全ての整数はリトルエンディアン。
+
+    ┌──────────────────────────────────────────────────────────────────────┐
+    │ HEADER (44 bytes)                                                    │
+    │   magic            8s   b'PSKKDIC\\0'                                 │
+    │   version          u32                                               │
+    │   reading_count    u32                                               │
+    │   candidate_count  u32                                               │
+    │   index_offset     u32  → READING INDEX                              │
+    │   candidate_offset u32  → CANDIDATE TABLE                            │
+    │   pool_offset      u32  → STRING POOL                                │
+    │   pool_size        u32                                               │
+    │   metadata_offset  u32  → METADATA (JSON)                            │
+    │   metadata_size    u32                                               │
+    ├──────────────────────────────────────────────────────────────────────┤
+    │ READING INDEX  (reading_count × 16 bytes, sorted by UTF-8 bytes)     │
+    │   key_offset u32, key_length u32, cand_start u32, cand_count u32     │
+    ├──────────────────────────────────────────────────────────────────────┤
+    │ CANDIDATE TABLE (candidate_count × 16 bytes)                         │
+    │   surface_offset u32, surface_length u32, count f64                  │
+    │   (each reading's slice is pre-sorted by count, descending)          │
+    │   （各読みの範囲はカウント降順にソート済み）                          │
+    ├──────────────────────────────────────────────────────────────────────┤
+    │ STRING POOL (UTF-8, de-duplicated)                                   │
+    ├──────────────────────────────────────────────────────────────────────┤
+    │ METADATA (UTF-8 JSON, e.g. source file fingerprint)                  │
+    └──────────────────────────────────────────────────────────────────────┘
+
+Lookups binary-search the reading index (UTF-8 byte order equals code point
+order), then decode only the candidate slice of the matched reading. The same
+order makes the readings sharing a prefix contiguous, which is what
+common_prefix_search() and predictive_search() rely on (see reading_index.py).
+
+検索は読みインデックスを二分探索し（UTF-8のバイト順はコードポイント順と
+一致する）、マッチした読みの候補範囲のみをデコードする。同じ順序により
+接頭辞を共有する読みは連続するため、common_prefix_search()と
+predictive_search()はこれを利用する（reading_index.py参照）。
+
+================================================================================
+MERGED SNAPSHOT / マージ済みスナップショット
+================================================================================
+
+The same format also stores a snapshot of SEVERAL dictionaries already merged
+(max count per candidate), e.g. ~/.config/ibus-pskk/merged_dictionary.bin.
+Its metadata records a fingerprint of every source file:
+
+同じ形式で複数の辞書をマージ済み（候補ごとに最大カウント）のスナップ
+ショットも格納する。例: ~/.config/ibus-pskk/merged_dictionary.bin。
+そのメタデータは各ソースファイルのフィンガープリントを記録する:
+
+    {"sources": [{"path": ..., "size": ..., "mtime_ns": ..., "blake2b": ...}, ...]}
+
+open_snapshot() accepts the snapshot only if the list of sources is the same
+and every source still matches. Size and mtime are compared first; the
+content hash is only computed when they differ, so a touched-but-identical
+file does not force a rebuild while the common case costs one stat() per file.
+
+open_snapshot()はソースのリストが同じで、全てのソースが一致する場合のみ
+スナップショットを受け入れる。まずサイズとmtimeを比較し、異なる場合のみ
+内容ハッシュを計算する。内容が同じでタイムスタンプだけ変わったファイルで
+再構築を強制せず、通常はファイルごとにstat()1回で済む。
+
+================================================================================
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PSKKDIC\0'
+FORMAT_VERSION = 1
+
+COMPILED_SUFFIX = '.bin'
+
+_HEADER = struct.Struct('<8sIIIIIIIII')
+_INDEX_ENTRY = struct.Struct('<IIII')
+_CANDIDATE_ENTRY = struct.Struct('<IId')
+
+
+def _normalize_count(entry):
+    """
+    Normalize a dictionary entry value to a count.
+    辞書エントリの値をカウントに正規化。
+
+    Mirrors HenkanProcessor's handling of the legacy {"POS", "cost"} format:
+    cost is negated so that lower cost = higher count.
+    HenkanProcessorの旧形式{"POS", "cost"}の扱いと同じ: コストを符号反転し、
+    低コスト = 高カウントとする。
+    """
+    if isinstance(entry, dict):
+        return -entry.get('cost', 0)
+    return entry if isinstance(entry, (int, float)) else 1
+
+
+def _decode_count(value):
+    """Return integral counts as int so that round-trips keep JSON types."""
+    return int(value) if value.is_integer() else value
+
+
+def get_compiled_path(json_path):
+    """
+    Return the path of the compiled file that belongs to a JSON dictionary.
+    JSON辞書に対応するコンパイル済みファイルのパスを返す。
+
+    Example / 例:
+        ~/.config/ibus-pskk/system_dictionary.json
+            → ~/.config/ibus-pskk/system_dictionary.bin
+    """
+    return os.path.splitext(json_path)[0] + COMPILED_SUFFIX
+
+
+def source_fingerprint(path):
+    """
+    Return a cheap fingerprint (path, size, mtime) of a source file.
+    ソースファイルの軽量なフィンガープリント（パス、サイズ、mtime）を返す。
+
+    Returns:
+        dict or None: {'path', 'size', 'mtime_ns'}, or None if the file
+                      cannot be stat()ed.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {
+        'path': os.path.abspath(path),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+    }
+
+
+def content_fingerprint(path):
+    """
+    Return source_fingerprint() plus a BLAKE2b hash of the file content.
+    source_fingerprint()にファイル内容のBLAKE2bハッシュを加えたものを返す。
+
+    Returns:
+        dict or None: {'path', 'size', 'mtime_ns', 'blake2b'}, or None if the
+                      file cannot be read.
+    """
+    fingerprint = source_fingerprint(path)
+    if fingerprint is None:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    fingerprint['blake2b'] = digest.hexdigest()
+    return fingerprint
+
+
+def _fingerprint_matches(recorded, path):
+    """Check a recorded content_fingerprint() against the file at path."""
+    if not isinstance(recorded, dict) or recorded.get('path') != os.path.abspath(path):
+        return False
+    current = source_fingerprint(path)
+    if current is None or current['size'] != recorded.get('size'):
+        return False
+    if current['mtime_ns'] == recorded.get('mtime_ns'):
+        return True
+    # Timestamp changed: only a content change invalidates the snapshot
+    hashed = content_fingerprint(path)
+    return hashed is not None and hashed['blake2b'] == recorded.get('blake2b')
+
+
+def compile_dictionary(dictionary, output_path, metadata=None):
+    """
+    Compile a {reading: {surface: count}} dictionary into the binary format.
+    {読み: {表層形: カウント}}辞書をバイナリ形式にコンパイル。
+
+    The file is written to a temporary path and renamed into place, so a
+    reader never observes a half-written file.
+    ファイルは一時パスに書き込まれてからリネームされるため、読み手が
+    書きかけのファイルを見ることはない。
+
+    Args:
+        dictionary: Dict mapping reading → {surface: count}. Legacy
+                    {"POS", "cost"} entries are accepted.
+                    読み → {表層形: カウント}の辞書。旧形式も受け付ける。
+        output_path: Destination path (typically get_compiled_path(json)).
+                     出力先パス（通常はget_compiled_path(json)）。
+        metadata: Optional JSON-serializable dict stored in the file.
+                  ファイルに格納される任意のJSONシリアライズ可能な辞書。
+
+    Returns:
+        bool: True on success, False on failure.
+              成功ならTrue、失敗ならFalse。
+    """
+    pool = bytearray()
+    pool_offsets = {}
+
+    def intern(text):
+        data = text.encode('utf-8')
+        offset = pool_offsets.get(data)
+        if offset is None:
+            offset = len(pool)
+            pool_offsets[data] = offset
+            pool.extend(data)
+        return offset, len(data)
+
+    readings = sorted(
+        (reading.encode('utf-8'), reading)
+        for reading, candidates in dictionary.items()
+        if isinstance(candidates, dict) and candidates
+    )
+
+    index = bytearray()
+    table = bytearray()
+    candidate_count = 0
+    for reading_bytes, reading in readings:
+        key_offset, key_length = intern(reading)
+        sorted_candidates = sorted(
+            ((surface, _normalize_count(entry))
+             for surface, entry in dictionary[reading].items()),
+            key=lambda x: x[1],
+            reverse=True
+        )
+        index += _INDEX_ENTRY.pack(key_offset, key_length,
+                                   candidate_count, len(sorted_candidates))
+        for surface, count in sorted_candidates:
+            surface_offset, surface_length = intern(surface)
+            table += _CANDIDATE_ENTRY.pack(surface_offset, surface_length, float(count))
+        candidate_count += len(sorted_candidates)
+
+    metadata_bytes = json.dumps(metadata or {}, ensure_ascii=False).encode('utf-8')
+
+    index_offset = _HEADER.size
+    candidate_offset = index_offset + len(index)
+    pool_offset = candidate_offset + len(table)
+    metadata_offset = pool_offset + len(pool)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(readings), candidate_count,
+                          index_offset, candidate_offset, pool_offset, len(pool),
+                          metadata_offset, len(metadata_bytes))
+
+    tmp_path = f'{output_path}.tmp{os.getpid()}'
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(index)
+            f.write(table)
+            f.write(pool)
+            f.write(metadata_bytes)
+        os.replace(tmp_path, output_path)
+    except OSError as e:
+        logger.error(f'Failed to write compiled dictionary: {output_path} - {e}')
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+    logger.info(f'Compiled dictionary: {output_path} '
+                f'({len(readings)} readings, {candidate_count} candidates)')
+    return True
+
+
+def compile_json_dictionary(json_path, dictionary=None, output_path=None):
+    """
+    Compile a JSON dictionary file and record its fingerprint.
+    JSON辞書ファイルをコンパイルし、そのフィンガープリントを記録する。
+
+    Args:
+        json_path: Path to the source JSON dictionary.
+                   ソースJSON辞書へのパス。
+        dictionary: Already-parsed content of json_path, if the caller has it
+                    (avoids re-reading the file right after writing it).
+                    呼び出し側が既に持っている場合のjson_pathの内容
+                    （書き込み直後の再読み込みを避ける）。
+        output_path: Destination; defaults to get_compiled_path(json_path).
+                     出力先。デフォルトはget_compiled_path(json_path)。
+
+    Returns:
+        bool: True on success, False on failure.
+    """
+    fingerprint = source_fingerprint(json_path)
+    if fingerprint is None:
+        logger.warning(f'Cannot compile missing dictionary: {json_path}')
+        return False
+
+    if dictionary is None:
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                dictionary = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f'Failed to read dictionary for compilation: {json_path} - {e}')
+            return False
+
+    if not isinstance(dictionary, dict):
+        logger.warning(f'Invalid dictionary format (expected dict): {json_path}')
+        return False
+
+    return compile_dictionary(dictionary, output_path or get_compiled_path(json_path),
+                              metadata={'source': fingerprint})
+
+
+def open_compiled_for(json_path):
+    """
+    Open the compiled counterpart of a JSON dictionary if it is fresh.
+    JSON辞書のコンパイル済みファイルが新鮮であればオープンする。
+
+    The compiled file is FRESH when the source fingerprint stored in its
+    metadata matches the JSON file's current size and mtime. A stale or
+    unreadable compiled file is ignored, and the caller falls back to JSON.
+    コンパイル済みファイルは、メタデータに格納されたソースのフィンガー
+    プリントがJSONファイルの現在のサイズとmtimeに一致する場合に新鮮。
+    古い・読めないファイルは無視され、呼び出し側はJSONにフォールバックする。
+
+    Returns:
+        CompiledDictionary or None
+    """
+    compiled_path = get_compiled_path(json_path)
+    if not os.path.exists(compiled_path):
+        return None
+
+    current = source_fingerprint(json_path)
+    if current is None:
+        return None
+
+    try:
+        compiled = CompiledDictionary(compiled_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f'Ignoring unreadable compiled dictionary: {compiled_path} - {e}')
+        return None
+
+    recorded = compiled.metadata.get('source') or {}
+    if (recorded.get('size') != current['size']
+            or recorded.get('mtime_ns') != current['mtime_ns']):
+        logger.info(f'Compiled dictionary is stale, using JSON: {json_path}')
+        compiled.close()
+        return None
+
+    return compiled
+
+
+def write_snapshot(dictionary, snapshot_path, fingerprints):
+    """
+    Write an already-merged dictionary as a snapshot keyed by its sources.
+    マージ済み辞書をソースをキーとしたスナップショットとして書き出す。
+
+    Args:
+        dictionary: Merged {reading: {surface: count}} dictionary.
+                    マージ済みの{読み: {表層形: カウント}}辞書。
+        snapshot_path: Destination path. / 出力先パス。
+        fingerprints: content_fingerprint() of every source, in load order,
+                      taken BEFORE the sources were read (so that a source
+                      modified during the merge invalidates the snapshot).
+                      読み込み順の各ソースのcontent_fingerprint()。ソースを
+                      読む前に取得すること（マージ中に変更されたソースが
+                      スナップショットを無効化するように）。
+
+    Returns:
+        bool: True on success, False on failure.
+    """
+    if not fingerprints or any(fp is None for fp in fingerprints):
+        logger.warning('Not writing dictionary snapshot: missing source fingerprint')
+        return False
+    return compile_dictionary(dictionary, snapshot_path,
+                              metadata={'sources': list(fingerprints)})
+
+
+def open_snapshot(snapshot_path, source_paths):
+    """
+    Open a merged snapshot if it was built from exactly these unchanged sources.
+    変更されていない同一のソースから構築されたスナップショットをオープン。
+
+    Args:
+        snapshot_path: Path of the snapshot file. / スナップショットのパス。
+        source_paths: Source dictionary paths, in load order.
+                      読み込み順のソース辞書パス。
+
+    Returns:
+        CompiledDictionary or None: None if the snapshot is missing, unreadable
+                                    or does not match the sources.
+    """
+    if not source_paths or not os.path.exists(snapshot_path):
+        return None
+
+    try:
+        snapshot = CompiledDictionary(snapshot_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f'Ignoring unreadable dictionary snapshot: {snapshot_path} - {e}')
+        return None
+
+    recorded = snapshot.metadata.get('sources')
+    if (not isinstance(recorded, list) or len(recorded) != len(source_paths)
+            or not all(_fingerprint_matches(fp, path)
+                       for fp, path in zip(recorded, source_paths))):
+        logger.info(f'Dictionary snapshot does not match its sources: {snapshot_path}')
+        snapshot.close()
+        return None
+
+    return snapshot
+
+
+class CompiledDictionary:
+    """
+    Read-only, memory-mapped view of a compiled dictionary.
+    コンパイル済み辞書の読み取り専用メモリマップビュー。
+
+    Lookups decode only the matched reading's candidates; nothing else is
+    copied into Python objects. Candidates come back already sorted by count
+    (descending), as stored at compile time.
+    検索はマッチした読みの候補のみをデコードし、それ以外はPythonオブジェクト
+    にコピーされない。候補はコンパイル時に格納された通りカウント降順で返る。
+
+    Usage / 使用法:
+        with CompiledDictionary(path) as d:
+            d.lookup('へんかん')  # → (('変換', 100), ('返還', 50), ...)
+    """
+
+    def __init__(self, path):
+        """
+        Open and validate a compiled dictionary file.
+
+        Raises:
+            OSError: If the file cannot be opened.
+            ValueError: If the file is not a compiled dictionary of a
+                        supported version.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError('file too small for a compiled dictionary')
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self._reading_count, self._candidate_count,
+         self._index_offset, self._candidate_offset, self._pool_offset,
+         pool_size, metadata_offset, metadata_size) = _HEADER.unpack_from(self._mm, 0)
+
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError('bad magic')
+        if version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f'unsupported version {version}')
+        if metadata_offset + metadata_size > size:
+            self._mm.close()
+            raise ValueError('truncated file')
+
+        self._metadata_range = (metadata_offset, metadata_size)
+        self._metadata = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Unmap the file. / ファイルのマップを解除。"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __len__(self):
+        return self._reading_count
+
+    @property
+    def candidate_count(self):
+        """Total number of (reading, surface) entries. / 全エントリ数。"""
+        return self._candidate_count
+
+    @property
+    def metadata(self):
+        """Metadata dict stored at compile time. / コンパイル時のメタデータ。"""
+        if self._metadata is None:
+            offset, size = self._metadata_range
+            try:
+                self._metadata = json.loads(self._mm[offset:offset + size].decode('utf-8'))
+            except ValueError:
+                self._metadata = {}
+        return self._metadata
+
+    def _key_at(self, i):
+        """Return the UTF-8 bytes of the i-th reading."""
+        key_offset, key_length, _, _ = _INDEX_ENTRY.unpack_from(
+            self._mm, self._index_offset + i * _INDEX_ENTRY.size)
+        start = self._pool_offset + key_offset
+        return self._mm[start:start + key_length]
+
+    def _lower_bound(self, key, lo=0):
+        """Return the index of the first reading >= key (UTF-8 bytes)."""
+        hi = self._reading_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, key):
+        """Binary-search the reading index; return the entry index or -1."""
+        lo = self._lower_bound(key)
+        if lo < self._reading_count and self._key_at(lo) == key:
+            return lo
+        return -1
+
+    def _candidates_at(self, i):
+        """Decode the candidate slice of the i-th reading."""
+        mm = self._mm
+        pool = self._pool_offset
+        _, _, start, count = _INDEX_ENTRY.unpack_from(
+            mm, self._index_offset + i * _INDEX_ENTRY.size)
+        result = []
+        offset = self._candidate_offset + start * _CANDIDATE_ENTRY.size
+        for _ in range(count):
+            surface_offset, surface_length, value = _CANDIDATE_ENTRY.unpack_from(mm, offset)
+            surface = mm[pool + surface_offset:pool + surface_offset + surface_length]
+            result.append((surface.decode('utf-8'), _decode_count(value)))
+            offset += _CANDIDATE_ENTRY.size
+        return tuple(result)
+
+    def __contains__(self, reading):
+        return self._find(reading.encode('utf-8')) >= 0
+
+    def lookup(self, reading):
+        """
+        Return the candidates of a reading, sorted by count (descending).
+        読みの候補をカウント降順で返す。
+
+        Returns:
+            tuple or None: ((surface, count), ...) or None if not found.
+        """
+        i = self._find(reading.encode('utf-8'))
+        if i < 0:
+            return None
+        return self._candidates_at(i)
+
+    def get(self, reading, default=None):
+        """Dict-style access: {surface: count} or default. / 辞書形式アクセス。"""
+        candidates = self.lookup(reading)
+        if candidates is None:
+            return default
+        return dict(candidates)
+
+    def common_prefix_search(self, text):
+        """
+        Return every reading that is a prefix of text, shortest first.
+        textの接頭辞である全ての読みを短い順に返す。
+
+        Same contract as ReadingIndex.common_prefix_search(), answered from
+        the mapped reading index. / ReadingIndexと同じ契約。
+        """
+        result = []
+        lo = 0
+        for end in range(1, len(text) + 1):
+            prefix = text[:end]
+            key = prefix.encode('utf-8')
+            lo = self._lower_bound(key, lo)
+            if lo >= self._reading_count:
+                break
+            found = self._key_at(lo)
+            if not found.startswith(key):
+                break
+            if found == key:
+                result.append(prefix)
+        return result
+
+    def predictive_search(self, prefix, limit=None):
+        """
+        Return the readings starting with prefix, in sorted order.
+        prefixで始まる読みをソート順に返す。
+
+        Same contract as ReadingIndex.predictive_search(). / ReadingIndexと同じ契約。
+        """
+        key = prefix.encode('utf-8')
+        result = []
+        for i in range(self._lower_bound(key), self._reading_count):
+            found = self._key_at(i)
+            if not found.startswith(key):
+                break
+            result.append(found.decode('utf-8'))
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def readings(self):
+        """Iterate over all readings in sorted order. / 全ての読みを順に列挙。"""
+        for i in range(self._reading_count):
+            yield self._key_at(i).decode('utf-8')
+
+    def items(self):
+        """Iterate over (reading, {surface: count}) pairs. / 全エントリを列挙。"""
+        for i in range(self._reading_count):
+            yield self._key_at(i).decode('utf-8'), dict(self._candidates_at(i))
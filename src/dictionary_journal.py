@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+dictionary_journal.py - Append-only edit log for user_dictionary.json
+user_dictionary.jsonのための追記専用の編集ログ
+
+================================================================================
+WHY THIS MODULE EXISTS / このモジュールが存在する理由
+================================================================================
+
+user_dictionary.json is edited at runtime: by the user dictionary editor, by
+programmatic add_entry() calls and by candidate learning. Rewriting the whole
+pretty-printed JSON for every edit costs O(dictionary size) per edit, and a
+crash in the middle of the rewrite loses the file.
+
+user_dictionary.jsonは実行時に編集される: ユーザー辞書エディタ、プログラム
+からのadd_entry()呼び出し、候補の学習によって。編集のたびに整形済みJSON
+全体を書き直すと編集ごとにO(辞書サイズ)かかり、書き直し中のクラッシュで
+ファイルが失われる。
+
+Instead, edits are appended to a journal next to the dictionary:
+代わりに、編集は辞書の隣のジャーナルに追記される:
+
+    user_dictionary.json       ← snapshot (plain dictionary JSON, unchanged format)
+                                 スナップショット（通常の辞書JSON、形式は同じ）
+    user_dictionary.journal    ← edits made since the snapshot, one per line
+                                 スナップショット以降の編集（1行に1件）
+
+Readers load the snapshot and replay the journal on top of it (load(),
+replay()). Once the journal grows past COMPACT_THRESHOLD bytes, the replayed
+result is written as the new snapshot and the journal is started over
+(compact()).
+
+読み手はスナップショットを読み込み、その上にジャーナルを再生する（load()、
+replay()）。ジャーナルがCOMPACT_THRESHOLDバイトを超えると、再生結果を新しい
+スナップショットとして書き出し、ジャーナルをやり直す（compact()）。
+
+================================================================================
+JOURNAL FORMAT / ジャーナル形式
+================================================================================
+
+One JSON value per line. The first line is a header naming the snapshot the
+journal applies to, by a hash of its content; every other line is a record:
+
+1行に1つのJSON値。1行目はジャーナルが適用されるスナップショットを内容の
+ハッシュで示すヘッダー。それ以外の行はレコード:
+
+    {"base": "3f2a...c9"}              header / ヘッダー
+    ["add", "たなか", "田中", 1]         count += 1 (creates the entry)
+    ["set", "たなか", "田中", 5]         count = 5
+    ["raise", "きょう", "京", 4]         count = max(count, 4) (learning)
+    ["remove", "たなか", "田中"]         delete the entry
+
+================================================================================
+CRASH SAFETY / クラッシュ安全性
+================================================================================
+
+    - Snapshots are written to a temporary file and renamed into place, so
+      the snapshot is always either the old or the new one.
+      スナップショットは一時ファイルに書いてからリネームするため、常に旧か
+      新のどちらか。
+    - A record torn by a crash during an append is the last line; lines that
+      do not parse are skipped.
+      追記中のクラッシュで壊れたレコードは最終行であり、解析できない行は
+      スキップされる。
+    - Compaction renames the new snapshot into place BEFORE deleting the
+      journal. If it stops in between, the journal's base no longer matches
+      the snapshot, so it is recognized as already compacted and ignored
+      (load() deletes it) instead of being applied twice.
+      圧縮はジャーナルを削除する前に新しいスナップショットをリネームする。
+      途中で止まった場合、ジャーナルのbaseがスナップショットと一致しなく
+      なるため、圧縮済みとして認識され二重に適用されずに無視される
+      （load()が削除する）。
+
+A snapshot edited by hand (or replaced by anything else) likewise makes the
+journal stale. Appends and compactions are serialized within the process;
+two processes compacting the same journal at once may lose the records
+appended in between.
+
+手で編集された（または他の方法で置き換えられた）スナップショットも同様に
+ジャーナルを古くする。追記と圧縮はプロセス内で直列化される。2つのプロセスが
+同時に同じジャーナルを圧縮すると、その間に追記されたレコードが失われる
+ことがある。
+"""
+
+import json
+import logging
+import os
+import threading
+
+import compiled_dictionary
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = '.journal'
+
+# Journal size (bytes) past which append() folds it into a new snapshot
+COMPACT_THRESHOLD = 64 * 1024
+
+# Serializes appends and compactions within the process (re-entrant: a
+# compaction loads and writes under it)
+_lock = threading.RLock()
+
+
+def get_journal_path(dictionary_path):
+    """
+    Return the journal path of a dictionary file.
+    辞書ファイルのジャーナルのパスを返す。
+
+    Example / 例:
+        ~/.config/ibus-pskk/user_dictionary.json
+            → ~/.config/ibus-pskk/user_dictionary.journal
+    """
+    return os.path.splitext(dictionary_path)[0] + JOURNAL_SUFFIX
+
+
+def _snapshot_digest(dictionary_path):
+    """Content hash of the snapshot, or None if it does not exist."""
+    fingerprint = compiled_dictionary.content_fingerprint(dictionary_path)
+    return fingerprint['blake2b'] if fingerprint is not None else None
+
+
+def apply_record(data, record):
+    """
+    Apply one journal record to dictionary data in place.
+    1つのジャーナルレコードを辞書データにその場で適用する。
+
+    Args:
+        data: {reading: {surface: count}} to update / 更新する辞書データ
+        record: ['add'|'set'|'raise', reading, surface, count] or
+                ['remove', reading, surface]
+
+    Returns:
+        bool: False if the record is malformed (data is left unchanged).
+              レコードが不正ならFalse（データは変更されない）。
+    """
+    if not isinstance(record, list) or len(record) < 3:
+        return False
+    op, reading, surface = record[0], record[1], record[2]
+    if not isinstance(reading, str) or not isinstance(surface, str):
+        return False
+
+    if op == 'remove':
+        candidates = data.get(reading)
+        if isinstance(candidates, dict):
+            candidates.pop(surface, None)
+            if not candidates:
+                del data[reading]
+        return True
+
+    if len(record) < 4 or not isinstance(record[3], (int, float)) or op not in ('add', 'set', 'raise'):
+        return False
+    count = record[3]
+    candidates = data.get(reading)
+    if not isinstance(candidates, dict):
+        candidates = data[reading] = {}
+    current = candidates.get(surface)
+    if not isinstance(current, (int, float)):
+        current = None
+    if op == 'add':
+        candidates[surface] = (current or 0) + count
+    elif op == 'set' or current is None or current < count:
+        candidates[surface] = count
+    return True
+
+
+def _read_records(journal_path):
+    """Return (base, records) of a journal; (None, None) if it cannot be read."""
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None, []
+    except OSError as e:
+        logger.error(f'Failed to read dictionary journal: {journal_path} - {e}')
+        return None, None
+
+    base = None
+    records = []
+    for number, line in enumerate(lines):
+        try:
+            value = json.loads(line)
+        except ValueError:
+            logger.warning(f'Skipping unreadable journal line {number + 1}: {journal_path}')
+            continue
+        if number == 0 and isinstance(value, dict):
+            base = value.get('base')
+        else:
+            records.append(value)
+    return base, records
+
+
+def replay(data, dictionary_path):
+    """
+    Apply the journal of dictionary_path to data, loaded from its snapshot.
+    スナップショットから読み込んだdataにdictionary_pathのジャーナルを適用する。
+
+    A stale journal (written for a previous snapshot) is ignored and removed.
+    Unless the caller held _lock since data was read, a compaction may have
+    replaced the snapshot in between; use load() instead.
+    古いジャーナル（以前のスナップショット用）は無視され削除される。
+    dataを読んでから呼び出し元が_lockを保持していなければ、その間に圧縮が
+    スナップショットを置き換えている可能性がある。代わりにload()を使うこと。
+
+    Args:
+        data: Dictionary data loaded from dictionary_path, updated in place.
+              dictionary_pathから読み込んだ辞書データ（その場で更新）。
+        dictionary_path: Path of the snapshot / スナップショットのパス
+
+    Returns:
+        int: Number of records applied. / 適用したレコード数。
+    """
+    journal_path = get_journal_path(dictionary_path)
+    if not os.path.exists(journal_path):
+        return 0
+    with _lock:
+        base, records = _read_records(journal_path)
+        if records is None:
+            return 0
+        if base != _snapshot_digest(dictionary_path):
+            logger.info(f'Removing stale dictionary journal: {journal_path}')
+            _remove(journal_path)
+            return 0
+    return sum(1 for record in records if apply_record(data, record))
+
+
+def load(dictionary_path):
+    """
+    Load a dictionary: its snapshot with the journal replayed on top.
+    辞書を読み込む: スナップショットにジャーナルを再生したもの。
+
+    Both are read under _lock, so a concurrent compaction cannot pair the
+    old snapshot with the journal of the new one.
+    両方を_lockの下で読むため、同時の圧縮が古いスナップショットと新しい
+    スナップショットのジャーナルを組み合わせることはない。
+
+    Returns:
+        dict: {reading: {surface: count}}; {} if the snapshot is missing.
+
+    Raises:
+        OSError, ValueError: The snapshot exists but cannot be read or parsed.
+                             スナップショットが存在するが読めない/解析できない。
+    """
+    data = {}
+    with _lock:
+        if os.path.exists(dictionary_path):
+            with open(dictionary_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError(f'expected a JSON object: {dictionary_path}')
+        replay(data, dictionary_path)
+    return data
+
+
+def _write_snapshot(dictionary_path, data):
+    """Atomically replace the snapshot with data. Caller holds _lock."""
+    tmp_path = f'{dictionary_path}.tmp{os.getpid()}'
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(dictionary_path)), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, dictionary_path)
+    except OSError as e:
+        logger.error(f'Failed to write dictionary snapshot: {dictionary_path} - {e}')
+        _remove(tmp_path)
+        return False
+    return True
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.error(f'Failed to remove {path}: {e}')
+
+
+def write_snapshot(dictionary_path, data):
+    """
+    Replace the dictionary with data and start a new, empty journal.
+    辞書をdataで置き換え、新しい空のジャーナルを開始する。
+
+    Use this when data is the complete new content (e.g. a full save).
+    dataが完全な新しい内容である場合に使う（全体の保存など）。
+
+    Returns:
+        bool: True if the snapshot was written. / 書き込めたらTrue。
+    """
+    with _lock:
+        if not _write_snapshot(dictionary_path, data):
+            return False
+        _remove(get_journal_path(dictionary_path))
+    return True
+
+
+def compact(dictionary_path):
+    """
+    Fold the journal into a new snapshot.
+    ジャーナルを新しいスナップショットに畳み込む。
+
+    Returns:
+        bool: True if compacted (or there was nothing to compact).
+              圧縮できた（または圧縮するものがなかった）らTrue。
+    """
+    with _lock:
+        try:
+            data = load(dictionary_path)
+        except (OSError, ValueError) as e:
+            logger.error(f'Cannot compact dictionary journal: {dictionary_path} - {e}')
+            return False
+        if not write_snapshot(dictionary_path, data):
+            return False
+    logger.info(f'Compacted dictionary journal: {dictionary_path}')
+    return True
+
+
+def append(dictionary_path, records):
+    """
+    Append edit records to the journal of dictionary_path.
+    dictionary_pathのジャーナルに編集レコードを追記する。
+
+    Costs O(len(records)), except when a journal is started (the snapshot
+    is hashed, and created empty if missing, so that dictionary lists pick
+    it up) and when the journal has grown past COMPACT_THRESHOLD.
+    O(len(records))のコスト。ただしジャーナルの開始時（スナップショットを
+    ハッシュし、なければ辞書リストが見つけられるよう空で作成する）と、
+    ジャーナルがCOMPACT_THRESHOLDを超えた時を除く。
+
+    Args:
+        dictionary_path: Path of the snapshot / スナップショットのパス
+        records: Iterable of records, as accepted by apply_record().
+                 apply_record()が受け付けるレコードのイテラブル。
+
+    Returns:
+        bool: True if the records were appended. / 追記できたらTrue。
+    """
+    lines = ''.join(json.dumps(list(record), ensure_ascii=False) + '\n' for record in records)
+    if not lines:
+        return True
+    journal_path = get_journal_path(dictionary_path)
+    with _lock:
+        try:
+            if not os.path.exists(journal_path):
+                if not os.path.exists(dictionary_path) and not _write_snapshot(dictionary_path, {}):
+                    return False
+                header = json.dumps({'base': _snapshot_digest(dictionary_path)}) + '\n'
+                lines = header + lines
+            with open(journal_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                size = f.tell()
+        except OSError as e:
+            logger.error(f'Failed to append to dictionary journal: {journal_path} - {e}')
+            return False
+    if size > COMPACT_THRESHOLD:
+        compact(dictionary_path)
+    return True
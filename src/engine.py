@@ -308,6 +308,65 @@ The engine delegates specific tasks to specialized processors:
    辞書検索を使ったかな漢字変換を処理。
    CRF境界予測による文節単位の変換をサポート。
 
+================================================================================
+BACKGROUND CONVERSION / バックグラウンド変換
+================================================================================
+
+do_process_key_event() runs on the GLib main loop. A space-tap whose yomi
+is a whole-word dictionary hit converts right away, but a miss needs the CRF
+N-best prediction and per-bunsetsu lookups, which can take noticeable time
+for a long yomi. That conversion runs on the conversion worker thread
+(HenkanProcessor.compute_conversion()) while the preedit keeps showing the
+yomi, and the result is applied through GLib.idle_add():
+
+do_process_key_event() は GLib メインループ上で実行される。全語辞書ヒットの
+読みはその場で変換するが、ミスした場合は CRF N-best 予測と文節ごとの検索が
+必要で、長い読みでは時間がかかる。その変換はワーカースレッドで実行され、
+その間プリエディットは読みを表示し続け、結果は GLib.idle_add() で適用される：
+
+  space↑ ──► request #N ──► worker: compute_conversion(yomi)
+                                     │
+  main loop keeps running ◄──────────┘ idle_add ──► apply if #N is current
+  メインループは動作し続ける                         #N が最新なら適用
+
+Each request gets a number from a counter; a result is applied only if its
+request is still the pending one. Escape/BackSpace (and focus-out, reset)
+cancel the pending request. Any other key event, press or release, is
+consumed and queued, and the queue is replayed right after the result is
+applied, so the keys act on the converted state exactly as they would have
+synchronously, without the main loop ever waiting for the worker. A
+replayed key that the engine does not handle is forwarded to the client.
+各リクエストにはカウンタから番号が振られ、その番号が保留中のリクエストの
+ものである場合にのみ結果が適用される。Escape/BackSpace（およびフォーカス
+アウト、リセット）は保留中のリクエストを取り消す。その他のキーイベントは
+押下・離上とも消費してキューに入れ、結果の適用直後に再生するため、メイン
+ループがワーカーを待つことなく、同期変換の場合と全く同じく変換後の状態に
+作用する。再生したキーをエンジンが処理しなければクライアントに転送する。
+
+  space↑ ──► request #N    a↓ a↑ ──► queued      idle_add ──► apply #N
+                                     キュー                   ──► replay a↓ a↑
+
+--------------------------------------------------------------------------------
+SPECULATIVE CONVERSION / 投機的変換
+--------------------------------------------------------------------------------
+
+With "speculative_conversion" enabled, a pause in typing while the yomi is
+being entered (BUNSETSU_ACTIVE) arms a timer; when it fires, the worker
+thread computes HenkanProcessor.compute_conversion() for the current yomi
+and keeps the result. A space-tap on the same yomi then only applies it.
+
+"speculative_conversion" が有効な場合、読み入力中（BUNSETSU_ACTIVE）に
+タイピングが止まるとタイマーが設定され、発火するとワーカースレッドが現在の
+読みに対して HenkanProcessor.compute_conversion() を計算して結果を保持する。
+同じ読みでスペースをタップすると、その結果を適用するだけで済む。
+
+  key ──► cancel (token += 1) ──► re-arm timer ──► [pause] ──► worker
+          キャンセル               タイマー再設定      [停止]      ワーカー
+
+Every key event bumps the speculation token, so queued or running
+speculations for an older yomi are discarded instead of being stored.
+キーイベントごとに投機トークンが増えるため、古い読みの投機は破棄される。
+
 ================================================================================
 REFERENCES / 参考資料
 ================================================================================
@@ -331,12 +390,18 @@ import user_dictionary_editor
 from simultaneous_processor import SimultaneousInputProcessor
 from kanchoku import KanchokuProcessor
 from henkan import HenkanProcessor
+import latency
+import tracing
 
+from collections import namedtuple
 from enum import IntEnum
+import atexit
 import json
 import logging
 import os
 import queue
+import threading
+import time
 
 import gi
 gi.require_version('IBus', '1.0')
@@ -348,6 +413,11 @@ logger = logging.getLogger(__name__)
 APPLICABLE_STROKE_SET_FOR_JAPANESE = set(list('1234567890qwertyuiopasdfghjk;lzxcvbnm,./'))
 
 KANCHOKU_KEY_SET = set(list('qwertyuiopasdfghjkl;zxcvbnm,./'))
+
+# Entry of the key binding dispatch table (see _compile_key_bindings):
+# config name for logging, bound handler and its arguments, and whether the
+# action only applies while there is a preedit
+KeyBindingAction = namedtuple('KeyBindingAction', ('name', 'handler', 'args', 'needs_preedit'))
 MISSING_KANCHOKU_KANJI = '無'
 
 # modifier mask-bit segment
@@ -436,6 +506,36 @@ NAME_TO_LOGGING_LEVEL = {
     'CRITICAL': logging.CRITICAL,
 }
 
+# File (in the user config dir) written by "Dump Event Trace" in the properties menu
+EVENT_TRACE_FILE_NAME = 'event_trace.jsonl'
+
+# File (in the user config dir) written by "Latency Report..." in the properties menu
+LATENCY_REPORT_FILE_NAME = 'latency_report.json'
+
+
+# =============================================================================
+# BACKGROUND CONVERSION JOBS
+# =============================================================================
+
+class ConversionJob:
+    """
+    One unit of work for the conversion worker thread.
+
+    kind is 'speculate' (precompute while typing pauses; identified by the
+    speculation token), 'convert' (a space-tap whose result is awaited;
+    identified by the conversion request number) or 'commit' (an implicit
+    conversion whose first candidate is committed, numbered like 'convert').
+    The worker stores the ConversionResult (or None on failure).
+    """
+
+    __slots__ = ('kind', 'number', 'yomi', 'result')
+
+    def __init__(self, kind, number, yomi):
+        self.kind = kind
+        self.number = number
+        self.yomi = yomi
+        self.result = None
+
 
 # =============================================================================
 # KANCHOKU / BUNSETSU STATE MACHINE
@@ -485,6 +585,7 @@ class EnginePSKK(IBus.Engine):
         self._pressed_key_set = set()
         self._handled_config_keys = set()  # Keys handled by config bindings (to consume releases)
         self._sands_key_set = set()
+        self._key_path = 'key.other'            # Latency path of the key event being handled
 
         # Kanchoku / Bunsetsu state machine variables
         self._marker_state = MarkerState.IDLE
@@ -509,24 +610,39 @@ class EnginePSKK(IBus.Engine):
         self._preedit_pending = ''   # Currently pending string -- should not be part of hiragana
         self._converted = False  # Set True after Ctrl+K/J/L; next char input auto-commits
 
+        # Speculative conversion state (see SPECULATIVE CONVERSION above)
+        self._speculative_conversion = False    # Cached "speculative_conversion" config
+        self._speculation_timer_id = None       # GLib timeout armed by a typing pause
+        self._speculation_token = 0             # Bumped on every key; stale work is dropped
+        self._speculation = None                # ConversionResult precomputed by the worker
+        self._speculation_lock = threading.Lock()
+        self._conversion_worker = None          # Worker thread consuming self._q
+
+        # Background conversion state (see BACKGROUND CONVERSION above)
+        self._conversion_request = 0            # Counter identifying the current request
+        self._pending_conversion = None         # ConversionJob awaiting its result
+        self._deferred_key_events = []          # (keyval, keycode, state) held back meanwhile
+
         # This property is for confirming the kanji-kana converted string
         # LookupTable.new(page_size, cursor_pos, cursor_visible, round)
         # round=True enables wrap-around when cycling candidates
         self._lookup_table = IBus.LookupTable.new(10, 0, True, True)
         self._lookup_table.set_orientation(IBus.Orientation.VERTICAL)
+        # Index of the candidate page currently held by _lookup_table
+        # (None = empty); see _show_lookup_page
+        self._lookup_page = None
 
         self._init_props()
         #self.register_properties(self._prop_list)
 
         # load configs
+        # (this also creates the henkan (kana-kanji conversion) processor)
+        self._henkan_processor = None
         self._load_configs()
         self._layout_data = util.get_layout_data(self._config)
         self._simul_processor = SimultaneousInputProcessor(self._layout_data)
         self._kanchoku_layout = self._load_kanchoku_layout()
         self._kanchoku_processor = KanchokuProcessor(self._kanchoku_layout)
-        # Initialize henkan (kana-kanji conversion) processor with dictionaries
-        dictionary_files = util.get_dictionary_files(self._config)
-        self._henkan_processor = HenkanProcessor(dictionary_files)
 
         # Input mode defaults to 'A' (set in self._mode above)
 
@@ -534,11 +650,14 @@ class EnginePSKK(IBus.Engine):
         self._settings_panel = None
         self._conversion_model_panel = None
         self._user_dictionary_editor = None
+        # ConversionJob queue for the conversion worker thread
         self._q = queue.Queue()
 
 
     def do_focus_in(self):
         self.register_properties(self._prop_list)
+        # The newly focused client may not show our last preedit: resend it
+        self._preedit_shown = None
         #self._update_preedit()
         # Request the initial surrounding-text in addition to the "enable" handler.
         self.get_surrounding_text()
@@ -560,7 +679,7 @@ class EnginePSKK(IBus.Engine):
             self.commit_text(IBus.Text.new_from_string(self._preedit_string))
 
         # Hide lookup table if visible
-        self._lookup_table.clear()
+        self._clear_lookup_table()
         self.hide_lookup_table()
 
         # Clear preedit display
@@ -570,6 +689,7 @@ class EnginePSKK(IBus.Engine):
             False,
             IBus.PreeditFocusMode.CLEAR
         )
+        self._preedit_shown = None
 
         # Reset henkan state
         self._bunsetsu_active = False
@@ -578,6 +698,8 @@ class EnginePSKK(IBus.Engine):
         self._preedit_string = ''
         self._preedit_hiragana = ''
         self._preedit_ascii = ''
+        self._cancel_pending_conversion()
+        self._cancel_speculation(discard=True)
 
         # Reset marker state
         self._marker_state = MarkerState.IDLE
@@ -589,6 +711,14 @@ class EnginePSKK(IBus.Engine):
         self._pure_kanchoku_held = False
         self._pure_kanchoku_first_key = None
 
+        # Save what was learned in the background
+        self._henkan_processor.flush_learning()
+
+    def do_destroy(self):
+        """Called when the engine is destroyed: save learned selections."""
+        self._henkan_processor.flush_learning(wait=True)
+        super().do_destroy()
+
 
     def _init_props(self):
         '''
@@ -647,6 +777,28 @@ class EnginePSKK(IBus.Engine):
             state=IBus.PropState.UNCHECKED,
             sub_props=None)
         self._prop_list.append(conversion_model_prop)
+        event_trace_prop = IBus.Property(
+            key='EventTrace',
+            prop_type=IBus.PropType.NORMAL,
+            label=IBus.Text.new_from_string("Dump Event Trace"),
+            icon=None,
+            tooltip=None,
+            sensitive=True,
+            visible=True,
+            state=IBus.PropState.UNCHECKED,
+            sub_props=None)
+        self._prop_list.append(event_trace_prop)
+        latency_prop = IBus.Property(
+            key='LatencyReport',
+            prop_type=IBus.PropType.NORMAL,
+            label=IBus.Text.new_from_string("Latency Report..."),
+            icon=None,
+            tooltip=None,
+            sensitive=True,
+            visible=True,
+            state=IBus.PropState.UNCHECKED,
+            sub_props=None)
+        self._prop_list.append(latency_prop)
         prop = IBus.Property(
             key='About',
             prop_type=IBus.PropType.NORMAL,
@@ -751,6 +903,12 @@ class EnginePSKK(IBus.Engine):
         '''
         self._config = util.get_config_data()[0] # the 2nd element of tuple is list of warning messages
         self._logging_level = self._load_logging_level(self._config)
+        self._compile_preedit_templates()
+        latency.configure(self._config.get('latency_stats', True))
+        tracing.configure(self._config.get('event_tracing', False),
+                          self._config.get('event_trace_capacity', tracing.DEFAULT_CAPACITY))
+        self._speculative_conversion = bool(self._config.get('speculative_conversion', False))
+        self._compile_key_bindings()
         logger.debug('config.json loaded')
         # loading layout should be part of (re-)loading config
         self._layout_data = util.get_layout_data(self._config)
@@ -759,6 +917,9 @@ class EnginePSKK(IBus.Engine):
         self._kanchoku_processor = KanchokuProcessor(self._kanchoku_layout)
         # Reload henkan processor with updated dictionary list
         self._reload_dictionaries()
+        self._henkan_processor.set_lattice_conversion(self._config.get('lattice_conversion', False))
+        self._henkan_processor.set_bunsetsu_n_best(self._config.get('bunsetsu_prediction_n_best', 3))
+        self._henkan_processor.set_learning(self._config.get('candidate_learning', True))
 
     def _reload_dictionaries(self):
         """
@@ -776,10 +937,24 @@ class EnginePSKK(IBus.Engine):
         restarting the IME - just switch to 'A' mode and back.
         2番目のケースでは、IMEを再起動せずに辞書編集を反映できる。
         'A'モードに切り替えて戻るだけでよい。
+
+        The existing processor catches up in place: unchanged files cost
+        only a stat(), user_dictionary.json edits are applied as a delta, and
+        changed base dictionaries are loaded into the next generation in the
+        background while conversions keep using the current one.
+        既存のプロセッサがその場で追従する: 変更のないファイルはstat()のみ、
+        user_dictionary.jsonの編集は差分として適用され、変更された基本辞書は
+        バックグラウンドで次の世代に読み込まれる（その間も変換は現在の世代を使用）。
         """
         dictionary_files = util.get_dictionary_files(self._config)
+        if self._henkan_processor is not None:
+            if self._henkan_processor.reload_dictionaries(dictionary_files):
+                logger.debug(f'Dictionaries reloading: {len(dictionary_files)} file(s)')
+            return
         self._henkan_processor = HenkanProcessor(dictionary_files)
-        logger.debug(f'Dictionaries reloaded: {len(dictionary_files)} file(s)')
+        # Selections learned since the last background flush must not be lost
+        atexit.register(self._henkan_processor.flush_learning, wait=True)
+        logger.debug(f'Dictionaries loading: {len(dictionary_files)} file(s)')
 
     def _load_logging_level(self, config):
         '''
@@ -866,6 +1041,45 @@ class EnginePSKK(IBus.Engine):
 
         return False  # Don't repeat this idle callback
 
+    def _show_latency_report(self):
+        """
+        Write the latency statistics to LATENCY_REPORT_FILE_NAME and show them.
+        レイテンシ統計をLATENCY_REPORT_FILE_NAMEに書き出して表示する。
+        """
+        path = os.path.join(util.get_user_config_dir(), LATENCY_REPORT_FILE_NAME)
+        stats = latency.write_report(path)
+        if stats is None:
+            secondary = f'Failed to write {path}'
+        else:
+            secondary = f'Saved to {path}'
+            if not latency.enabled:
+                secondary += '\nLatency statistics are disabled ("latency_stats" in config.json).'
+
+        dialog = Gtk.MessageDialog(
+            message_type=Gtk.MessageType.INFO,
+            buttons=Gtk.ButtonsType.CLOSE,
+            text="PSKK Latency Report")
+        dialog.format_secondary_text(secondary)
+        label = Gtk.Label()
+        label.set_selectable(True)
+        label.set_markup(f'<tt>{GLib.markup_escape_text(latency.format_report(stats))}</tt>')
+        dialog.get_message_area().pack_start(label, False, False, 0)
+        dialog.set_keep_above(True)
+        dialog.connect("response", lambda dialog, response: dialog.destroy())
+        dialog.show_all()
+
+        return False  # Don't repeat this idle callback
+
+    def _dump_event_trace(self):
+        """
+        Write the event trace ring buffer to EVENT_TRACE_FILE_NAME in the config dir.
+        イベントトレースのリングバッファを設定ディレクトリのEVENT_TRACE_FILE_NAMEに書き出す。
+        """
+        if not tracing.enabled and not tracing.snapshot():
+            logger.warning('Event tracing is disabled; set "event_tracing": true in config.json')
+            return
+        tracing.dump(os.path.join(util.get_user_config_dir(), EVENT_TRACE_FILE_NAME))
+
     def do_property_activate(self, prop_name, state):
         logger.info(f'property_activate({prop_name}, {state})')
         if prop_name == 'Settings':
@@ -880,6 +1094,13 @@ class EnginePSKK(IBus.Engine):
             # Schedule conversion model panel creation on the main loop
             GLib.idle_add(self._show_conversion_model_panel)
             return
+        elif prop_name == 'EventTrace':
+            self._dump_event_trace()
+            return
+        elif prop_name == 'LatencyReport':
+            # Schedule report dialog creation on the main loop
+            GLib.idle_add(self._show_latency_report)
+            return
         elif prop_name == 'About':
             # Schedule dialog creation on the main loop
             GLib.idle_add(self._show_about_dialog)
@@ -942,27 +1163,84 @@ class EnginePSKK(IBus.Engine):
         Returns:
             True if we handled the key, False to pass through to application
         """
+        if not (latency.enabled or tracing.enabled):
+            return self._handle_key_event(keyval, keycode, state)
+
+        # The handlers name the path they took in self._key_path
+        self._key_path = 'key.other'
+        start = time.perf_counter_ns()
+        result = self._handle_key_event(keyval, keycode, state)
+        elapsed_ns = time.perf_counter_ns() - start
+        if latency.enabled:
+            latency.add(self._key_path, elapsed_ns)
+        if tracing.enabled:
+            tracing.record('key', key=IBus.keyval_name(keyval), keycode=keycode, state=state,
+                           pressed=not (state & IBus.ModifierType.RELEASE_MASK), mode=self._mode,
+                           henkan=self._trace_henkan_state(), marker=self._marker_state.name,
+                           path=self._key_path, handled=result, elapsed_us=elapsed_ns // 1000)
+        return result
+
+    def _handle_key_event(self, keyval, keycode, state):
+        """
+        Handle a key event for do_process_key_event(), which times it.
+        キーイベントを処理する（do_process_key_event()が計時する）。
+
+        Handlers set self._key_path to the latency path ('key.marker',
+        'key.simultaneous', ...) of the branch that takes the event.
+        ハンドラはイベントを処理した分岐のレイテンシ経路をself._key_pathに設定する。
+        """
         # Determine if this is a key press or release
         is_pressed = not (state & IBus.ModifierType.RELEASE_MASK)
 
         # Check enable_hiragana_key BEFORE mode check (must work from any mode)
         key_name = IBus.keyval_name(keyval)
-        logger.debug(f'do_process_key_event: key_name={key_name}, mode={self._mode}, is_pressed={is_pressed}')
         if key_name and self._check_enable_hiragana_key(key_name, state, is_pressed):
+            self._key_path = 'key.binding'
             return True
 
         # Alphanumeric mode: pass everything through (except enable_hiragana_key above)
         if self._mode == 'A':
+            self._key_path = 'key.direct'
             return False
 
+        # A background conversion is still running for the last space-tap:
+        # Escape/BackSpace abandon it; any other key must act on its result,
+        # so it is held back and replayed by _on_conversion_ready()
+        if self._pending_conversion is not None:
+            if is_pressed and key_name in ('Escape', 'BackSpace') and not self._deferred_key_events:
+                self._key_path = 'key.conversion'
+                self._cancel_pending_conversion()
+                return True
+            self._key_path = 'key.deferred'
+            self._deferred_key_events.append((keyval, keycode, state))
+            return True
+
+        # More keys arrived: any pending speculation is for an outdated yomi
+        if self._speculative_conversion:
+            self._cancel_speculation()
+
         # Process the key event
         result = self._process_key_event(keyval, keycode, state, is_pressed)
 
         # Update SandS (Space as modifier) tracking
         self._update_sands_status(keyval, is_pressed)
 
+        # Typing may pause here: precompute the conversion of the new yomi
+        if self._speculative_conversion:
+            self._schedule_speculation()
+
         return result
 
+    def _trace_henkan_state(self):
+        """Name of the henkan state (see STATE MACHINE above), for trace events."""
+        if self._in_conversion:
+            return 'CONVERTING'
+        if self._in_forced_preedit:
+            return 'FORCED_PREEDIT'
+        if self._bunsetsu_active:
+            return 'BUNSETSU'
+        return 'IDLE'
+
     def _process_key_event(self, keyval, keycode, state, is_pressed):
         """
         Intermediate handler for key events (non-Alphanumeric mode).
@@ -981,9 +1259,6 @@ class EnginePSKK(IBus.Engine):
         Returns:
             True if we handled the key, False to pass through
         """
-        logger.debug(f'_process_key_event: keyval={keyval}, keycode={keycode}, '
-                     f'state={state}, is_pressed={is_pressed}')
-
         # Get key name for all key types (e.g., "a", "Henkan", "Alt_R", "F1")
         key_name = IBus.keyval_name(keyval)
         if not key_name:
@@ -995,6 +1270,7 @@ class EnginePSKK(IBus.Engine):
         # Must be checked before other bindings since the marker key (e.g., Space)
         # triggers a state machine that consumes subsequent key events.
         if self._handle_kanchoku_bunsetsu_marker(key_name, keyval, state, is_pressed):
+            self._key_path = 'key.marker'
             return True
 
         # =====================================================================
@@ -1003,6 +1279,7 @@ class EnginePSKK(IBus.Engine):
         # Simpler kanchoku input that doesn't involve bunsetsu marking.
         # Keys not in kanchoku layout pass through (e.g., Alt+Tab works normally).
         if self._handle_pure_kanchoku(key_name, keyval, state, is_pressed):
+            self._key_path = 'key.kanchoku'
             return True
 
         # =====================================================================
@@ -1026,6 +1303,7 @@ class EnginePSKK(IBus.Engine):
         # Check config-driven key bindings (enable/disable hiragana, conversions)
         # Called for both press and release to properly consume the entire key sequence
         if self._check_config_key_bindings(key_name, state, is_pressed):
+            self._key_path = 'key.binding'
             return True
 
         # Pass through unrecognized combo-keys (e.g. Ctrl+0, Ctrl+C, Alt+F4)
@@ -1035,13 +1313,14 @@ class EnginePSKK(IBus.Engine):
                       IBus.ModifierType.MOD1_MASK |
                       IBus.ModifierType.SUPER_MASK)
         if state & combo_mask and key_name not in modifier_key_names:
+            self._key_path = 'key.passthrough'
             # Before passing through the combo-key back to IBus, commit the preedit buffer.
             self._commit_string()
             self._in_forced_preedit = False
             self._bunsetsu_active = False
             self._in_conversion = False
             self._conversion_yomi = ''
-            self._lookup_table.clear()
+            self._clear_lookup_table()
             self.hide_lookup_table()
             return False
 
@@ -1053,37 +1332,45 @@ class EnginePSKK(IBus.Engine):
         if is_pressed:
             # Enter key - confirm conversion or commit preedit
             if keyval == IBus.KEY_Return or keyval == IBus.KEY_KP_Enter:
+                self._key_path = 'key.commit'
                 if self._in_conversion:
-                    logger.debug('Enter pressed in CONVERTING: confirming')
+                    if tracing.enabled:
+                        tracing.record('action', action='enter_confirm', key=key_name)
                     self._confirm_conversion()
                     return True
                 elif self._in_forced_preedit and self._preedit_string:
                     # Forced preedit: commit and consume Enter (Action 2)
-                    logger.debug('Enter pressed in FORCED_PREEDIT: committing')
+                    if tracing.enabled:
+                        tracing.record('action', action='enter_commit_forced_preedit', key=key_name)
                     self._commit_string()
                     self._in_forced_preedit = False
                     return True
                 elif self._bunsetsu_active and self._preedit_string:
                     # Bunsetsu mode: commit and consume Enter
-                    logger.debug('Enter pressed in BUNSETSU: committing')
+                    if tracing.enabled:
+                        tracing.record('action', action='enter_commit_bunsetsu', key=key_name)
                     self._commit_string()
                     self._bunsetsu_active = False
                     return True
                 elif self._preedit_string:
                     # IDLE mode with preedit: commit and pass Enter through
-                    logger.debug('Enter pressed in IDLE with preedit: committing and passing through')
+                    if tracing.enabled:
+                        tracing.record('action', action='enter_commit_idle', key=key_name)
                     self._commit_string()
                     return False  # Pass Enter to application
                 return False  # No preedit, pass through
 
             # Arrow keys for candidate cycling (only in CONVERTING state)
             if self._in_conversion:
+                self._key_path = 'key.conversion'
                 if keyval == IBus.KEY_Down or keyval == IBus.KEY_KP_Down:
-                    logger.debug('Down arrow in CONVERTING: next candidate')
+                    if tracing.enabled:
+                        tracing.record('action', action='next_candidate', key=key_name)
                     self._cycle_candidate()
                     return True
                 elif keyval == IBus.KEY_Up or keyval == IBus.KEY_KP_Up:
-                    logger.debug('Up arrow in CONVERTING: previous candidate')
+                    if tracing.enabled:
+                        tracing.record('action', action='previous_candidate', key=key_name)
                     self._cycle_candidate_backward()
                     return True
                 elif keyval == IBus.KEY_Right or keyval == IBus.KEY_KP_Right:
@@ -1091,7 +1378,9 @@ class EnginePSKK(IBus.Engine):
                     if self._henkan_processor.is_bunsetsu_mode():
                         self._henkan_processor.next_bunsetsu()
                         self._update_preedit()  # Update display with new selection
-                        logger.debug(f'Right arrow: moved to bunsetsu {self._henkan_processor.get_selected_bunsetsu_index()}')
+                        if tracing.enabled:
+                            tracing.record('action', action='next_bunsetsu',
+                                           bunsetsu=self._henkan_processor.get_selected_bunsetsu_index())
                         return True
                     return False  # Pass through in whole-word mode
                 elif keyval == IBus.KEY_Left or keyval == IBus.KEY_KP_Left:
@@ -1099,7 +1388,9 @@ class EnginePSKK(IBus.Engine):
                     if self._henkan_processor.is_bunsetsu_mode():
                         self._henkan_processor.previous_bunsetsu()
                         self._update_preedit()  # Update display with new selection
-                        logger.debug(f'Left arrow: moved to bunsetsu {self._henkan_processor.get_selected_bunsetsu_index()}')
+                        if tracing.enabled:
+                            tracing.record('action', action='previous_bunsetsu',
+                                           bunsetsu=self._henkan_processor.get_selected_bunsetsu_index())
                         return True
                     return False  # Pass through in whole-word mode
 
@@ -1109,6 +1400,7 @@ class EnginePSKK(IBus.Engine):
                           IBus.KEY_Up, IBus.KEY_KP_Up,
                           IBus.KEY_Down, IBus.KEY_KP_Down,
                           IBus.KEY_Home, IBus.KEY_End):
+                self._key_path = 'key.commit'
                 if self._preedit_string:
                     self._commit_string()
                 return False
@@ -1116,14 +1408,17 @@ class EnginePSKK(IBus.Engine):
             # Tab key: commit preedit before passing through to avoid
             # preedit text appearing in both old and new focused fields
             if keyval in (IBus.KEY_Tab, IBus.KEY_ISO_Left_Tab):
+                self._key_path = 'key.commit'
                 if self._preedit_string:
                     self._commit_string()
                 return False
 
             # Escape / Delete - cancel conversion or clear preedit
             if keyval == IBus.KEY_Escape or keyval == IBus.KEY_Delete:
+                self._key_path = 'key.conversion' if self._in_conversion else 'key.edit'
                 if self._in_conversion:
-                    logger.debug('Escape/Delete in CONVERTING: cancelling, reverting to yomi')
+                    if tracing.enabled:
+                        tracing.record('action', action='cancel_conversion', key=key_name)
                     self._cancel_conversion()
                     return True
                 elif self._preedit_string:
@@ -1134,9 +1429,11 @@ class EnginePSKK(IBus.Engine):
 
             # Backspace - delete character or cancel conversion
             if keyval == IBus.KEY_BackSpace:
+                self._key_path = 'key.conversion' if self._in_conversion else 'key.edit'
                 if self._in_conversion:
                     # Cancel conversion and go back to yomi
-                    logger.debug('Backspace in CONVERTING: reverting to yomi')
+                    if tracing.enabled:
+                        tracing.record('action', action='cancel_conversion', key=key_name)
                     self._cancel_conversion()
                     return True
                 elif self._preedit_string:
@@ -1165,17 +1462,20 @@ class EnginePSKK(IBus.Engine):
         # Only process printable ASCII characters (0x20 space to 0x7e tilde)
         if keyval < 0x20 or keyval > 0x7e:
             return False
+        self._key_path = 'key.simultaneous'
 
         # If in CONVERTING state and typing a new character, confirm and continue
         if is_pressed and self._in_conversion:
-            logger.debug(f'Char input in CONVERTING: confirming and adding "{chr(keyval)}"')
+            if tracing.enabled:
+                tracing.record('action', action='confirm_by_input', key=key_name, candidate=self._preedit_string)
             # Commit the selected candidate
+            self._henkan_processor.learn_selection()
             self.commit_text(IBus.Text.new_from_string(self._preedit_string))
             # Reset state - new char confirms conversion and exits forced preedit
             self._in_conversion = False
             self._in_forced_preedit = False  # Exit forced preedit mode (Action 1)
             self._conversion_yomi = ''
-            self._lookup_table.clear()
+            self._clear_lookup_table()
             self.hide_lookup_table()
             # Clear preedit for new input
             self._preedit_string = ''
@@ -1187,7 +1487,8 @@ class EnginePSKK(IBus.Engine):
         # before starting fresh input. Unlike _in_conversion, this flag does NOT
         # affect Escape/Enter/arrow behavior (they treat it as normal IDLE preedit).
         elif is_pressed and self._converted:
-            logger.debug(f'Char input after conversion: committing "{self._preedit_string}"')
+            if tracing.enabled:
+                tracing.record('action', action='commit_converted', key=key_name, preedit=self._preedit_string)
             self._commit_string()
             # Continue to process the new character below
 
@@ -1204,7 +1505,8 @@ class EnginePSKK(IBus.Engine):
             self._preedit_pending, input_char, is_pressed
         )
 
-        logger.debug(f'Processor result: output="{output}", pending="{pending}"')
+        if tracing.enabled:
+            tracing.record('simul', key=key_name, pressed=is_pressed, output=output, pending=pending)
 
         # Update hiragana buffer (source of truth for to_katakana/to_hiragana)
         # output includes accumulated hiragana via dropped_prefix mechanism
@@ -1241,10 +1543,17 @@ class EnginePSKK(IBus.Engine):
         """
         Check if the current key event matches any config-driven key binding.
 
-        Checks in order:
+        Uses the dispatch table built by _compile_key_bindings(), so an event
+        costs one dict lookup. When several actions share a binding, they are
+        tried in this order and the first one that applies wins:
         1. enable_hiragana_key - switch to hiragana mode
         2. disable_hiragana_key - switch to direct/alphanumeric mode
         3. conversion_keys - convert preedit (to_katakana, to_hiragana, etc.)
+        4. bunsetsu_prediction_cycle_key - cycle bunsetsu predictions
+        5. user_dictionary_editor_trigger - open the user dictionary editor
+        6. force_commit_key - commit preedit as-is
+        Actions marked as needing a preedit are skipped while it is empty, so
+        the key can pass through to the application.
 
         Args:
             key_name: The key name from IBus.keyval_name() (e.g., "a", "Henkan", "F1")
@@ -1254,29 +1563,140 @@ class EnginePSKK(IBus.Engine):
         Returns:
             True if key was handled (caller should return), False otherwise
         """
-        # Check enable_hiragana_key
-        if self._check_enable_hiragana_key(key_name, state, is_pressed):
-            return True
+        # On release: consume if this key was handled on press
+        if not is_pressed:
+            if key_name in self._handled_config_keys:
+                self._handled_config_keys.discard(key_name)
+                return True
+            return False
 
-        # Check disable_hiragana_key
-        if self._check_disable_hiragana_key(key_name, state, is_pressed):
-            self._commit_string()  # Commit and clear preedit before switching mode
-            return True
+        actions = self._key_binding_table.get(self._binding_table_key(key_name, state))
+        if not actions:
+            return False
 
-        # Check conversion_keys
-        if self._check_conversion_keys(key_name, state, is_pressed):
+        for action in actions:
+            if action.needs_preedit and not self._preedit_string:
+                continue
+            if tracing.enabled:
+                tracing.record('binding', action=action.name, key=key_name)
+            action.handler(*action.args)
+            self._handled_config_keys.add(key_name)
             return True
 
-        # Check bunsetsu_prediction_cycle_key
-        if self._check_bunsetsu_prediction_key(key_name, state, is_pressed):
-            return True
+        return False
 
-        # Check user_dictionary_editor_trigger
-        if self._check_user_dictionary_editor_key(key_name, state, is_pressed):
-            return True
+    def _compile_key_bindings(self):
+        """
+        Build the key binding dispatch table from the config.
+        設定からキーバインディングのディスパッチテーブルを構築。
+
+        Called from _load_configs(), so binding strings are parsed once per
+        config (re)load instead of on every key event. The table maps
+        (key name, modifier mask) to the KeyBindingActions bound to it, in
+        the priority order of _check_config_key_bindings(). Single-letter
+        key names are stored lowercased (they match case-insensitively).
+        The kanchoku/bunsetsu marker bindings and pure kanchoku trigger keys
+        are resolved here as well, into frozensets checked by membership.
+        _load_configs()から呼ばれるため、バインディング文字列はキーイベントごと
+        ではなく設定の（再）読み込みごとに一度だけ解析される。
+        """
+        self._binding_modifier_mask = (IBus.ModifierType.CONTROL_MASK | IBus.ModifierType.SHIFT_MASK |
+                                       IBus.ModifierType.MOD1_MASK | IBus.ModifierType.SUPER_MASK)
+
+        conversion_keys = self._config.get('conversion_keys', {})
+        if not isinstance(conversion_keys, dict):
+            conversion_keys = {}
+        entries = [
+            ('enable_hiragana_key', self._config.get('enable_hiragana_key', []),
+             KeyBindingAction('enable_hiragana_key', self._enable_hiragana, (), False)),
+            ('disable_hiragana_key', self._config.get('disable_hiragana_key', []),
+             KeyBindingAction('disable_hiragana_key', self._disable_hiragana, (), False)),
+        ]
+        for conversion_type, bindings in conversion_keys.items():
+            entries.append((f'conversion_keys.{conversion_type}', bindings,
+                            KeyBindingAction(f'conversion_key {conversion_type}',
+                                             self._handle_conversion, (conversion_type,), True)))
+        entries += [
+            ('bunsetsu_prediction_cycle_key', self._config.get('bunsetsu_prediction_cycle_key', []),
+             KeyBindingAction('bunsetsu_prediction_cycle_key', self._cycle_bunsetsu_prediction, (), False)),
+            ('user_dictionary_editor_trigger', self._config.get('user_dictionary_editor_trigger', []),
+             KeyBindingAction('user_dictionary_editor_trigger',
+                              self._open_user_dictionary_editor_with_preedit, (), True)),
+            ('force_commit_key', self._config.get('force_commit_key', []),
+             KeyBindingAction('force_commit_key', self._force_commit, (), True)),
+        ]
+
+        table = {}
+        for config_name, bindings, action in entries:
+            for key in self._compile_binding_set(config_name, bindings):
+                actions = table.setdefault(key, [])
+                if action not in actions:
+                    actions.append(action)
+        self._key_binding_table = {key: tuple(actions) for key, actions in table.items()}
+        self._enable_hiragana_bindings = frozenset(
+            key for key, actions in table.items()
+            if any(action.handler == self._enable_hiragana for action in actions))
+        self._kanchoku_marker_bindings = self._compile_binding_set(
+            'kanchoku_bunsetsu_marker', self._config.get('kanchoku_bunsetsu_marker', []))
+
+        # Pure kanchoku triggers match by key name alone (see _is_pure_kanchoku_trigger)
+        trigger_keys = self._config.get('kanchoku_pure_trigger_key', [])
+        if isinstance(trigger_keys, str):
+            trigger_keys = [trigger_keys]
+        if not isinstance(trigger_keys, list):
+            logger.warning(f'Ignoring invalid key bindings for kanchoku_pure_trigger_key: {trigger_keys!r}')
+            trigger_keys = []
+        self._pure_kanchoku_triggers = frozenset(
+            tk.split('+')[-1].lower() for tk in trigger_keys if isinstance(tk, str) and tk)
+        self._pure_kanchoku_trigger_memo = {}
+        logger.debug(f'Compiled {len(self._key_binding_table)} key binding(s), '
+                     f'{len(self._kanchoku_marker_bindings)} marker binding(s), '
+                     f'pure kanchoku triggers={sorted(self._pure_kanchoku_triggers)}')
+
+    def _compile_binding_set(self, config_name, bindings):
+        """
+        Parse binding strings into a frozenset of _binding_table_key() keys.
+        バインディング文字列を_binding_table_key()のキーのfrozensetに解析。
+        """
+        if isinstance(bindings, str):
+            bindings = [bindings]
+        if not isinstance(bindings, list):
+            logger.warning(f'Ignoring invalid key bindings for {config_name}: {bindings!r}')
+            return frozenset()
+        keys = set()
+        for binding in bindings:
+            main_key, modifiers = self._parse_key_binding(binding)
+            if main_key is None:
+                continue
+            if len(main_key) == 1:
+                main_key = main_key.lower()
+            keys.add((main_key, modifiers))
+        return frozenset(keys)
+
+    def _binding_table_key(self, key_name, state):
+        """(key name, modifier mask) of a key event, as stored by _compile_key_bindings()."""
+        if len(key_name) == 1:
+            key_name = key_name.lower()
+        return key_name, state & self._binding_modifier_mask
+
+    def _check_enable_hiragana_key(self, key_name, state, is_pressed):
+        """
+        Check and handle enable_hiragana_key binding.
 
-        # Check force_commit_key
-        if self._check_force_commit_key(key_name, state, is_pressed):
+        Checked before the mode check, since it must work from any mode.
+        """
+        # On release: consume if this key was handled on press
+        if not is_pressed:
+            if key_name in self._handled_config_keys:
+                self._handled_config_keys.discard(key_name)
+                return True
+            return False
+
+        if self._binding_table_key(key_name, state) in self._enable_hiragana_bindings:
+            if tracing.enabled:
+                tracing.record('binding', action='enable_hiragana_key', key=key_name)
+            self._enable_hiragana()
+            self._handled_config_keys.add(key_name)
             return True
 
         return False
@@ -1311,255 +1731,52 @@ class EnginePSKK(IBus.Engine):
 
         return main_key, modifiers
 
-    def _matches_key_binding(self, key_name, state, binding_str):
-        """
-        Check if key_name + state matches a key binding string.
-
-        Args:
-            key_name: The key name from IBus.keyval_name()
-            state: Modifier state bitmask from IBus
-            binding_str: Key binding string from config (e.g., "Ctrl+K", "Henkan")
-
-        Returns:
-            True if the input matches the binding exactly
-        """
-        main_key, required_mods = self._parse_key_binding(binding_str)
-        if main_key is None:
-            return False
-
-        # Check main key matches (case-insensitive for single letters)
-        if len(main_key) == 1 and len(key_name) == 1:
-            if main_key.lower() != key_name.lower():
-                return False
-        else:
-            # For special keys like "Henkan", exact match required
-            if main_key != key_name:
-                return False
-
-        # Check required modifiers (exact match)
-        mod_mask = (IBus.ModifierType.CONTROL_MASK | IBus.ModifierType.SHIFT_MASK |
-                    IBus.ModifierType.MOD1_MASK | IBus.ModifierType.SUPER_MASK)
-        current_mods = state & mod_mask
-
-        return current_mods == required_mods
-
-    def _matches_any_key_binding(self, key_name, state, bindings):
+    def _enable_hiragana(self):
         """
-        Check if key_name + state matches any binding in a list.
-        key_name + state がリスト内のいずれかのバインディングに一致するか確認。
-
-        Args:
-            key_name: The key name from IBus.keyval_name()
-            state: Modifier state bitmask from IBus
-            bindings: List of key binding strings (e.g., ["Ctrl+K", "Ctrl+Shift+K"])
+        enable_hiragana_key action.
 
-        Returns:
-            str or None: The matched binding string, or None if no match
+        Switches mode to hiragana ('あ').
         """
-        for binding in bindings:
-            if self._matches_key_binding(key_name, state, binding):
-                return binding
-        return None
+        self._mode = 'あ'
+        self._update_input_mode()  # Update IBus icon
 
-    def _check_enable_hiragana_key(self, key_name, state, is_pressed):
+    def _disable_hiragana(self):
         """
-        Check and handle enable_hiragana_key binding.
+        disable_hiragana_key action.
 
-        Switches mode to hiragana ('あ') when the configured key is pressed.
-        """
-        bindings = self._config.get('enable_hiragana_key', [])
-
-        # On release: consume if this key was handled on press
-        if not is_pressed:
-            if key_name in self._handled_config_keys:
-                self._handled_config_keys.discard(key_name)
-                return True
-            return False
-
-        # On press: check if any binding matches
-        matched = self._matches_any_key_binding(key_name, state, bindings)
-        if matched:
-            logger.debug(f'enable_hiragana_key matched: {matched}')
-            self._mode = 'あ'
-            self._update_input_mode()  # Update IBus icon
-            self._handled_config_keys.add(key_name)
-            return True
-
-        return False
-
-    def _check_disable_hiragana_key(self, key_name, state, is_pressed):
-        """
-        Check and handle disable_hiragana_key binding.
-
-        Switches mode to alphanumeric ('A') when the configured key is pressed.
+        Switches mode to alphanumeric ('A').
         If in CONVERTING state, commits the selected candidate first.
         If in BUNSETSU_ACTIVE state, commits the preedit as-is.
         """
-        bindings = self._config.get('disable_hiragana_key', [])
-
-        # On release: consume if this key was handled on press
-        if not is_pressed:
-            if key_name in self._handled_config_keys:
-                self._handled_config_keys.discard(key_name)
-                return True
-            return False
-
-        # On press: check if any binding matches
-        matched = self._matches_any_key_binding(key_name, state, bindings)
-        if matched:
-            logger.debug(f'disable_hiragana_key matched: {matched}')
-
-            # If in CONVERTING state, commit the selected candidate
-            if self._in_conversion:
-                logger.debug('disable_hiragana_key in CONVERTING: committing candidate')
-                self._confirm_conversion()
-            elif self._bunsetsu_active or self._preedit_string:
-                # Commit any preedit as-is (no conversion)
-                logger.debug('disable_hiragana_key with preedit: committing')
-                self._commit_string()
-
-            self._mode = 'A'
-            self._update_input_mode()  # Update IBus icon
-            self._reload_dictionaries()  # Reload dictionaries on mode switch
-            self._handled_config_keys.add(key_name)
-            return True
-
-        return False
-
-    def _check_conversion_keys(self, key_name, state, is_pressed):
-        """
-        Check and handle conversion_keys bindings.
-
-        Converts the preedit string to different character representations:
-        - to_katakana: Convert to katakana
-        - to_hiragana: Convert to hiragana
-        - to_ascii: Convert to ASCII/romaji
-        - to_zenkaku: Convert to full-width characters
-        """
-        conversion_keys = self._config.get('conversion_keys', {})
-        if not isinstance(conversion_keys, dict):
-            return False
-
-        # On release: consume if this key was handled on press
-        if not is_pressed:
-            if key_name in self._handled_config_keys:
-                self._handled_config_keys.discard(key_name)
-                return True
-            return False
-
-        # On press: check each conversion key binding
-        # When preedit is empty, let the key pass through to the application
-        # (e.g., Ctrl+L should reach the browser to select the URL bar)
-        if not self._preedit_string:
-            return False
-
-        for conversion_type, bindings in conversion_keys.items():
-            matched = self._matches_any_key_binding(key_name, state, bindings)
-            if matched:
-                logger.debug(f'conversion_key matched: {conversion_type} = {matched}')
-                self._handle_conversion(conversion_type)
-                self._handled_config_keys.add(key_name)
-                return True
-
-        return False
-
-    def _check_bunsetsu_prediction_key(self, key_name, state, is_pressed):
-        """
-        Check and handle bunsetsu_prediction_cycle_key binding.
-
-        This key cycles through N-best bunsetsu prediction candidates.
-        """
-        bindings = self._config.get('bunsetsu_prediction_cycle_key', [])
-        if not bindings:
-            return False
-
-        # On release: consume if this key was handled on press
-        if not is_pressed:
-            if key_name in self._handled_config_keys:
-                self._handled_config_keys.discard(key_name)
-                return True
-            return False
-
-        # On press: check if any binding matches
-        matched = self._matches_any_key_binding(key_name, state, bindings)
-        if matched:
-            logger.debug(f'bunsetsu_prediction_cycle_key matched: {matched}')
-            self._cycle_bunsetsu_prediction()
-            self._handled_config_keys.add(key_name)
-            return True
-
-        return False
-
-    def _check_user_dictionary_editor_key(self, key_name, state, is_pressed):
-        """
-        Check and handle user_dictionary_editor_trigger binding.
-
-        Opens the User Dictionary Editor with the current preedit as the reading.
-        Only activates when preedit is non-empty.
-        """
-        bindings = self._config.get('user_dictionary_editor_trigger', [])
-        if not bindings:
-            return False
-
-        # On release: consume if this key was handled on press
-        if not is_pressed:
-            if key_name in self._handled_config_keys:
-                self._handled_config_keys.discard(key_name)
-                return True
-            return False
-
-        # Only activate when preedit is non-empty
-        if not self._preedit_string:
-            return False
-
-        # On press: check if any binding matches
-        matched = self._matches_any_key_binding(key_name, state, bindings)
-        if matched:
-            logger.debug(f'user_dictionary_editor_trigger matched: {matched}')
-            self._open_user_dictionary_editor_with_preedit()
-            self._handled_config_keys.add(key_name)
-            return True
+        # If in CONVERTING state, commit the selected candidate
+        if self._in_conversion:
+            logger.debug('disable_hiragana_key in CONVERTING: committing candidate')
+            self._confirm_conversion()
+        elif self._bunsetsu_active or self._preedit_string:
+            # Commit any preedit as-is (no conversion)
+            logger.debug('disable_hiragana_key with preedit: committing')
+            self._commit_string()
 
-        return False
+        self._mode = 'A'
+        self._update_input_mode()  # Update IBus icon
+        self._reload_dictionaries()  # Reload dictionaries on mode switch
+        self._commit_string()  # Commit and clear preedit before switching mode
 
-    def _check_force_commit_key(self, key_name, state, is_pressed):
+    def _force_commit(self):
         """
-        Check and handle force_commit_key binding.
-        force_commit_key バインディングを確認し処理
+        force_commit_key action.
+        force_commit_key のアクション
 
         Commits the current preedit as-is (hiragana/katakana/ASCII) without
-        performing kanji conversion. If the buffer is empty, returns False
-        to pass the key through to the application.
+        performing kanji conversion. Only dispatched while the preedit is
+        non-empty; otherwise the key passes through to the application.
 
         現在のプリエディット（ひらがな/カタカナ/ASCII）を漢字変換せずに
-        そのまま確定します。バッファが空の場合は False を返し、キーを
-        アプリケーションに渡します。
+        そのまま確定します。プリエディットが空の間は呼ばれず、キーは
+        アプリケーションに渡されます。
         """
-        bindings = self._config.get('force_commit_key', [])
-        if not bindings:
-            return False
-
-        # On release: consume if this key was handled on press
-        if not is_pressed:
-            if key_name in self._handled_config_keys:
-                self._handled_config_keys.discard(key_name)
-                return True
-            return False
-
-        # If preedit is empty, pass through to application
-        if not self._preedit_string:
-            return False
-
-        # On press: check if any binding matches
-        matched = self._matches_any_key_binding(key_name, state, bindings)
-        if matched:
-            logger.debug(f'force_commit_key matched: {matched}')
-            self._commit_string()
-            self._reset_henkan_state()  # Clear conversion state flags
-            self._handled_config_keys.add(key_name)
-            return True
-
-        return False
+        self._commit_string()
+        self._reset_henkan_state()  # Clear conversion state flags
 
     def _handle_pure_kanchoku(self, key_name, keyval, state, is_pressed):
         """
@@ -1589,44 +1806,22 @@ class EnginePSKK(IBus.Engine):
         Returns:
             bool: True if key was consumed, False to pass through
         """
-        trigger_keys = self._config.get('kanchoku_pure_trigger_key', [])
-        if not trigger_keys:
+        if not self._pure_kanchoku_triggers:
             return False
 
-        # Ensure trigger_keys is a list (defensive check)
-        if isinstance(trigger_keys, str):
-            trigger_keys = [trigger_keys]
-
-        # Check if this is the trigger key itself (match by key name only, ignoring state)
-        # This is necessary because pressing a modifier key like Alt_L immediately sets
-        # MOD1_MASK in state, which would cause _matches_key_binding to fail.
-        #
-        # Also handle the case where user configures "Alt" but presses "Alt_R" or "Alt_L":
-        # Strip _L/_R suffix from key_name before comparing.
-        key_name_normalized = key_name.lower()
-        if key_name_normalized.endswith('_l') or key_name_normalized.endswith('_r'):
-            key_name_base = key_name_normalized[:-2]  # Remove _L or _R
-        else:
-            key_name_base = key_name_normalized
-
-        is_trigger = any(
-            key_name_base == tk.split('+')[-1].lower() or
-            key_name_normalized == tk.split('+')[-1].lower()
-            for tk in trigger_keys
-        )
-
-        logger.debug(f'Pure kanchoku: key={key_name} (base={key_name_base}), triggers={trigger_keys}, '
-                     f'is_trigger={is_trigger}, held={self._pure_kanchoku_held}')
+        is_trigger = self._is_pure_kanchoku_trigger(key_name)
 
         if is_trigger:
             if is_pressed:
                 self._pure_kanchoku_held = True
                 self._pure_kanchoku_first_key = None
-                logger.debug(f'Pure kanchoku trigger pressed, valid_first_keys={len(self._kanchoku_valid_first_keys)}')
+                if tracing.enabled:
+                    tracing.record('kanchoku', action='trigger_pressed', key=key_name)
             else:
                 # Released - silent reset
-                if self._pure_kanchoku_first_key:
-                    logger.debug(f'Pure kanchoku incomplete sequence, silent reset (first_key was: {self._pure_kanchoku_first_key})')
+                if tracing.enabled:
+                    tracing.record('kanchoku', action='trigger_released', key=key_name,
+                                   incomplete=self._pure_kanchoku_first_key)
                 self._pure_kanchoku_held = False
                 self._pure_kanchoku_first_key = None
             return True
@@ -1652,11 +1847,13 @@ class EnginePSKK(IBus.Engine):
             if key_char in self._kanchoku_valid_first_keys:
                 # Valid first stroke - capture it
                 self._pure_kanchoku_first_key = key_char
-                logger.debug(f'Pure kanchoku first key: {key_char}')
+                if tracing.enabled:
+                    tracing.record('kanchoku', action='first_key', key=key_char)
                 return True
             else:
                 # Not a valid first stroke - pass through
-                logger.debug(f'Pure kanchoku: {key_char} not in layout, passing through')
+                if tracing.enabled:
+                    tracing.record('kanchoku', action='pass_through', key=key_char)
                 return False
         else:
             # Second key of sequence
@@ -1667,18 +1864,41 @@ class EnginePSKK(IBus.Engine):
                 # Valid second stroke - emit kanji
                 kanji = self._kanchoku_processor._lookup_kanji(first_key, key_char)
                 if kanji and kanji != MISSING_KANCHOKU_KANJI:
-                    logger.debug(f'Pure kanchoku: {first_key}+{key_char} → {kanji}')
                     self._emit_kanchoku_output(kanji)
-                else:
-                    logger.debug(f'Pure kanchoku: {first_key}+{key_char} → no kanji found')
-            else:
+                elif tracing.enabled:
+                    tracing.record('kanchoku', action='no_kanji', keys=(first_key, key_char))
+            elif tracing.enabled:
                 # Invalid second stroke - silent reset (consume key)
-                logger.debug(f'Pure kanchoku: {key_char} not valid second for {first_key}, silent reset')
+                tracing.record('kanchoku', action='invalid_second', keys=(first_key, key_char))
 
             # Reset first key for next sequence (whether successful or not)
             self._pure_kanchoku_first_key = None
             return True
 
+    def _is_pure_kanchoku_trigger(self, key_name):
+        """
+        Check if key_name is a pure kanchoku trigger key.
+        key_nameが純粋な漢直トリガーキーか確認。
+
+        Matches by key name only, ignoring state: pressing a modifier key like
+        Alt_L immediately sets MOD1_MASK in state, which would make an exact
+        binding match fail. A trigger configured as "Alt" also matches
+        "Alt_L" and "Alt_R". The result is memoized per key name until the
+        next config load, so repeated events allocate no strings.
+
+        状態を無視してキー名のみで照合する。"Alt"と設定されたトリガーは
+        "Alt_L"や"Alt_R"にも一致する。結果は次の設定読み込みまでキー名ごとに
+        メモ化される。
+        """
+        is_trigger = self._pure_kanchoku_trigger_memo.get(key_name)
+        if is_trigger is None:
+            key_name_normalized = key_name.lower()
+            is_trigger = (key_name_normalized in self._pure_kanchoku_triggers or
+                          (key_name_normalized.endswith(('_l', '_r')) and
+                           key_name_normalized[:-2] in self._pure_kanchoku_triggers))
+            self._pure_kanchoku_trigger_memo[key_name] = is_trigger
+        return is_trigger
+
     def _open_user_dictionary_editor_with_preedit(self):
         """
         Open the User Dictionary Editor with current preedit as the reading.
@@ -1695,7 +1915,7 @@ class EnginePSKK(IBus.Engine):
 
         # Hide lookup table if visible (conversion mode)
         if self._in_conversion:
-            self._lookup_table.clear()
+            self._clear_lookup_table()
             self.hide_lookup_table()
 
         # Reset to IDLE mode (clear all state flags)
@@ -1747,14 +1967,15 @@ class EnginePSKK(IBus.Engine):
         # Update lookup table if not in bunsetsu mode (whole-word mode has lookup table)
         if not self._henkan_processor.is_bunsetsu_mode():
             # Back to whole-word mode - restore lookup table
-            self._lookup_table.set_cursor_pos(0)
-            self.update_lookup_table(self._lookup_table, True)
+            self._show_lookup_page()
         else:
             # In bunsetsu mode - hide whole-word lookup table
             self.hide_lookup_table()
 
-        logger.debug(f'_cycle_bunsetsu_prediction: bunsetsu_mode={self._henkan_processor.is_bunsetsu_mode()}, '
-                    f'surface="{self._preedit_string}"')
+        if tracing.enabled:
+            tracing.record('binding', action='cycle_bunsetsu_prediction',
+                           bunsetsu_mode=self._henkan_processor.is_bunsetsu_mode(),
+                           surface=self._preedit_string)
 
     def _handle_conversion(self, conversion_type):
         """
@@ -1798,22 +2019,19 @@ class EnginePSKK(IBus.Engine):
             self._in_conversion = False
             self._henkan_processor.reset()
             self.hide_lookup_table()
-            logger.debug(f'Exited conversion mode for {conversion_type}')
 
         # Also exit bunsetsu/forced-preedit modes - user is done with these modes
         # after explicitly converting to katakana/hiragana/etc.
-        if self._bunsetsu_active:
-            self._bunsetsu_active = False
-            logger.debug(f'Exited bunsetsu mode for {conversion_type}')
-        if self._in_forced_preedit:
-            self._in_forced_preedit = False
-            logger.debug(f'Exited forced preedit mode for {conversion_type}')
+        self._bunsetsu_active = False
+        self._in_forced_preedit = False
 
         # Mark as converted so the next character input auto-commits this preedit.
         # Escape/Enter/arrow keys ignore this flag and treat it as normal IDLE preedit.
         self._converted = True
 
-        logger.debug(f'Conversion {conversion_type}: "{original}" → "{self._preedit_string}"')
+        if tracing.enabled:
+            tracing.record('binding', action=conversion_type, original=original,
+                           preedit=self._preedit_string)
         self._update_preedit()
 
     # =========================================================================
@@ -1843,7 +2061,8 @@ class EnginePSKK(IBus.Engine):
         else:
             self._modkey_status &= ~STATUS_SPACE
 
-        logger.debug(f'SandS status: space_held={bool(self._modkey_status & STATUS_SPACE)}')
+        if tracing.enabled:
+            tracing.record('sands', space_held=is_pressed)
 
     # =========================================================================
     # KANCHOKU / BUNSETSU MARKER HANDLING
@@ -1916,12 +2135,10 @@ class EnginePSKK(IBus.Engine):
         Returns:
             bool: キーが消費された場合True、そうでなければFalse
         """
-        marker_bindings = self._config.get('kanchoku_bunsetsu_marker', [])
-        if not marker_bindings:
+        if not self._kanchoku_marker_bindings:
             return False
 
-        matched_binding = self._matches_any_key_binding(key_name, state, marker_bindings)
-        is_marker_key = matched_binding is not None
+        is_marker_key = self._binding_table_key(key_name, state) in self._kanchoku_marker_bindings
 
         # === MARKER KEY HANDLING ===
         if is_marker_key:
@@ -1994,11 +2211,9 @@ class EnginePSKK(IBus.Engine):
                 # directly when we confirm it's space+key (in MARKER_HELD key-press handler)
                 self._preedit_before_marker = self._preedit_string
                 # Note: Keep _in_conversion = True so tap can cycle candidates
-                logger.debug(f'Marker pressed in CONVERTING: candidate "{self._preedit_string}"')
             elif self._bunsetsu_active or self._in_forced_preedit:
                 # BUNSETSU_ACTIVE or FORCED_PREEDIT: save current yomi for potential implicit conversion
                 self._preedit_before_marker = self._preedit_string
-                logger.debug(f'Marker pressed in BUNSETSU/FORCED_PREEDIT: saved yomi "{self._preedit_before_marker}"')
             else:
                 # IDLE state: commit any existing preedit before starting marker sequence
                 self._commit_string()
@@ -2008,29 +2223,29 @@ class EnginePSKK(IBus.Engine):
             self._marker_first_key = None
             self._marker_keys_held.clear()
             self._marker_had_input = False
-            logger.debug('Marker pressed: entering MARKER_HELD state')
+            if tracing.enabled:
+                tracing.record('marker', action='pressed', henkan=self._trace_henkan_state(),
+                               saved=self._preedit_before_marker)
             return True
 
         # Marker released
-        logger.debug(f'Marker released in state: {self._marker_state.name}, '
-                    f'bunsetsu_active={self._bunsetsu_active}, in_conversion={self._in_conversion}')
+        if tracing.enabled:
+            tracing.record('marker', action='released', state=self._marker_state.name,
+                           henkan=self._trace_henkan_state(), had_input=self._marker_had_input)
 
         if self._marker_state == MarkerState.MARKER_HELD:
             if self._marker_had_input:
                 # Keys were pressed during this space hold (e.g. kanchoku completed
                 # and returned to MARKER_HELD). This is NOT a tap — just release cleanly.
-                logger.debug('Space released after input (not a tap), no action')
+                pass
             elif self._in_conversion:
                 # CONVERTING state: cycle to next candidate
-                logger.debug('Space tap in CONVERTING: cycling candidate')
                 self._cycle_candidate()
             elif self._bunsetsu_active or self._in_forced_preedit:
                 # BUNSETSU_ACTIVE or FORCED_PREEDIT state: trigger conversion
-                logger.debug('Space tap in BUNSETSU/FORCED_PREEDIT: triggering conversion')
                 self._trigger_conversion()
             else:
                 # IDLE state: commit preedit + output space
-                logger.debug('Space tap in IDLE: committing preedit + space')
                 self._commit_string()
                 self.commit_text(IBus.Text.new_from_string(' '))
         elif self._marker_state == MarkerState.FIRST_RELEASED:
@@ -2043,7 +2258,6 @@ class EnginePSKK(IBus.Engine):
             # First key is still held when marker released - this is bunsetsu mode
             # (User typed quickly: space down → key down → space up → key up)
             # Treat this the same as FIRST_RELEASED - activate bunsetsu mode
-            logger.debug('Marker released while first key held: treating as bunsetsu')
             self._handle_marker_release_decision()
 
         self._marker_state = MarkerState.IDLE
@@ -2133,21 +2347,18 @@ class EnginePSKK(IBus.Engine):
             # In BUNSETSU_ACTIVE or FORCED_PREEDIT: perform implicit conversion on the saved yomi
             yomi = self._preedit_before_marker
             if yomi:
-                candidates = self._henkan_processor.convert(yomi)
-                if candidates:
-                    surface = candidates[0]['surface']
-                    logger.debug(f'Implicit conversion: "{yomi}" → "{surface}"')
-                    self.commit_text(IBus.Text.new_from_string(surface))
-                else:
-                    logger.debug(f'No candidates for implicit conversion, committing yomi: "{yomi}"')
-                    self.commit_text(IBus.Text.new_from_string(yomi))
+                candidates = self._convert_yomi(yomi)
+                surface = candidates[0].surface if candidates else yomi
+                if tracing.enabled:
+                    tracing.record('marker', action='implicit_conversion', yomi=yomi, surface=surface)
+                self.commit_text(IBus.Text.new_from_string(surface))
 
         # Reset henkan state but preserve the new bunsetsu content
         self._bunsetsu_active = False
         self._in_conversion = False
         self._in_forced_preedit = False  # Exit forced preedit when starting new bunsetsu
         self._conversion_yomi = ''
-        self._lookup_table.clear()
+        self._clear_lookup_table()
         self.hide_lookup_table()
 
         # Restore the new bunsetsu content
@@ -2165,13 +2376,15 @@ class EnginePSKK(IBus.Engine):
             self._preedit_ascii = ''
             self._update_preedit()
             self._in_forced_preedit = True
-            logger.debug('Entering forced preedit mode (Case C)')
+            if tracing.enabled:
+                tracing.record('marker', action='forced_preedit')
         else:
             # Case (B): Bunsetsu marking - start new bunsetsu
             # Keep the tentative output (e.g., "い") and mark boundary
             self._mark_bunsetsu_boundary()
             self._update_preedit()
-            logger.debug(f'Bunsetsu started with "{self._preedit_string}" (Case B)')
+            if tracing.enabled:
+                tracing.record('marker', action='bunsetsu', preedit=self._preedit_string)
 
     def _handle_key_while_marker_held(self, key_name, keyval, is_pressed):
         """
@@ -2251,28 +2464,25 @@ class EnginePSKK(IBus.Engine):
                 # If in CONVERTING state, now we know it's space+key (not a tap),
                 # so commit the current candidate directly and exit conversion mode
                 if self._in_conversion:
-                    logger.debug(f'Committing candidate for new bunsetsu: "{self._preedit_string}"')
+                    self._henkan_processor.learn_selection()
                     self.commit_text(IBus.Text.new_from_string(self._preedit_string))
                     self._preedit_string = ''
                     self._preedit_hiragana = ''
                     self._preedit_ascii = ''
                     self._preedit_before_marker = ''  # Clear to prevent double commit in release handler
                     self._in_conversion = False
-                    self._lookup_table.clear()
+                    self._clear_lookup_table()
                     self.hide_lookup_table()
                 elif self._bunsetsu_active:
                     # BUNSETSU state: perform implicit conversion immediately
                     # so the converted text is committed without visual gap
                     yomi = self._preedit_string
                     if yomi:
-                        candidates = self._henkan_processor.convert(yomi)
-                        if candidates:
-                            surface = candidates[0]['surface']
-                            logger.debug(f'Immediate implicit conversion: "{yomi}" → "{surface}"')
-                            self.commit_text(IBus.Text.new_from_string(surface))
-                        else:
-                            logger.debug(f'No candidates, committing yomi: "{yomi}"')
-                            self.commit_text(IBus.Text.new_from_string(yomi))
+                        candidates = self._convert_yomi(yomi)
+                        surface = candidates[0].surface if candidates else yomi
+                        if tracing.enabled:
+                            tracing.record('marker', action='implicit_conversion', yomi=yomi, surface=surface)
+                        self.commit_text(IBus.Text.new_from_string(surface))
                     # Clear preedit for fresh start with new bunsetsu
                     self._preedit_string = ''
                     self._preedit_hiragana = ''
@@ -2289,7 +2499,6 @@ class EnginePSKK(IBus.Engine):
                     # before starting a new bunsetsu sequence. This ensures kanchoku kanji
                     # are committed and don't get mixed into the new bunsetsu.
                     if self._preedit_string:
-                        logger.debug(f'Committing prior preedit before new bunsetsu: "{self._preedit_string}"')
                         self.commit_text(IBus.Text.new_from_string(self._preedit_string))
                         self._preedit_string = ''
                         self._preedit_hiragana = ''
@@ -2299,12 +2508,12 @@ class EnginePSKK(IBus.Engine):
                 # Let simultaneous processor handle this key (tentative output)
                 self._process_simultaneous_input(keyval, is_pressed)
                 self._marker_state = MarkerState.FIRST_PRESSED
-                logger.debug(f'First key pressed: "{key_char}" → FIRST_PRESSED')
+                if tracing.enabled:
+                    tracing.record('marker', action='first_key', key=key_char)
             else:
                 # Key release while waiting for first key - this can happen when user
                 # releases a key from previous input after pressing marker (space).
                 # Process the release to finalize the character in simultaneous processor.
-                logger.debug(f'Key released in MARKER_HELD (prior input): "{key_char}"')
                 self._process_simultaneous_input(keyval, is_pressed)
                 # Update saved preedit to include the finalized character
                 self._preedit_before_marker = self._preedit_string
@@ -2323,7 +2532,8 @@ class EnginePSKK(IBus.Engine):
                 if len(self._marker_keys_held) == 0:
                     # All keys released - transition to decision point
                     self._marker_state = MarkerState.FIRST_RELEASED
-                    logger.debug('All keys released → FIRST_RELEASED (decision point)')
+                    if tracing.enabled:
+                        tracing.record('marker', action='first_released')
             return True
 
         elif self._marker_state == MarkerState.FIRST_RELEASED:
@@ -2334,11 +2544,13 @@ class EnginePSKK(IBus.Engine):
                 if self._bunsetsu_active and not self._in_forced_preedit:
                     # In normal bunsetsu mode - kanchoku is NOT allowed
                     # Ignore this key press and stay in FIRST_RELEASED state
-                    logger.debug(f'Kanchoku blocked in bunsetsu mode, ignoring key: "{key_char}"')
+                    if tracing.enabled:
+                        tracing.record('marker', action='kanchoku_blocked', key=key_char)
                     return True
 
                 # Second key pressed - this is KANCHOKU (Case A)!
-                logger.debug(f'Second key pressed: "{key_char}" → KANCHOKU')
+                if tracing.enabled:
+                    tracing.record('marker', action='kanchoku', keys=(self._marker_first_key, key_char))
                 # Undo the tentative simultaneous output
                 self._preedit_string = self._preedit_before_marker
                 # Clear hiragana/ascii buffers to prevent stale data from affecting
@@ -2365,7 +2577,8 @@ class EnginePSKK(IBus.Engine):
                     self._marker_state = MarkerState.MARKER_HELD
                     self._marker_first_key = None
                     self._preedit_before_marker = self._preedit_string
-                    logger.debug('Kanchoku complete, ready for next → MARKER_HELD')
+                    if tracing.enabled:
+                        tracing.record('marker', action='kanchoku_complete')
             return True
 
         return False
@@ -2416,7 +2629,8 @@ class EnginePSKK(IBus.Engine):
             self._preedit_pending, input_char, is_pressed
         )
 
-        logger.debug(f'Simultaneous processor: output="{output}", pending="{pending}"')
+        if tracing.enabled:
+            tracing.record('simul', key=input_char, pressed=is_pressed, output=output, pending=pending)
 
         # Update preedit with simultaneous output
         if output:
@@ -2475,7 +2689,8 @@ class EnginePSKK(IBus.Engine):
         """
         self._bunsetsu_active = True
         self._conversion_yomi = ''  # Will be populated from preedit when conversion triggers
-        logger.debug(f'Bunsetsu started. Current preedit: "{self._preedit_string}"')
+        if tracing.enabled:
+            tracing.record('marker', action='bunsetsu_started', preedit=self._preedit_string)
 
     def _emit_kanchoku_output(self, kanji):
         """
@@ -2513,7 +2728,8 @@ class EnginePSKK(IBus.Engine):
         • This is by design - users understand kanchoku bypasses conversion
           これは意図的 - ユーザーは漢直が変換をバイパスすることを理解している
         """
-        logger.debug(f'Kanchoku output: "{kanji}"')
+        if tracing.enabled:
+            tracing.record('kanchoku', action='output', kanji=kanji)
         self._preedit_string += kanji
         self._preedit_hiragana += kanji
         self._update_preedit()
@@ -2522,6 +2738,7 @@ class EnginePSKK(IBus.Engine):
     # HENKAN (KANA-KANJI CONVERSION) METHODS
     # =========================================================================
 
+    @latency.timed('engine.trigger_conversion')
     def _trigger_conversion(self):
         """
         Trigger kana-kanji conversion on the current preedit (yomi).
@@ -2571,9 +2788,18 @@ class EnginePSKK(IBus.Engine):
         traditional SKK/ATOK). It only appears on 2nd space press via _cycle_candidate.
         This provides a cleaner UX for single-candidate words.
 
+        The table is also not populated here: _show_lookup_page fills it one
+        page at a time when it is shown, so readings with hundreds of
+        candidates (かんじ, こう) only create the IBus.Text objects of the page
+        the cursor is on.
+
         ルックアップテーブルは最初の変換では表示されない（従来のSKK/ATOKとは異なる）。
         _cycle_candidate 経由で2回目のスペース押下時にのみ表示される。
         これは単一候補の単語に対してよりクリーンなUXを提供する。
+
+        テーブルはここでは埋められない: 表示時に_show_lookup_pageがカーソルの
+        あるページだけを埋めるため、候補が数百ある読み（かんじ、こう）でも
+        IBus.Textはそのページ分しか作られない。
         """
         if not self._preedit_string:
             logger.debug('_trigger_conversion: empty preedit, nothing to convert')
@@ -2583,10 +2809,25 @@ class EnginePSKK(IBus.Engine):
         self._conversion_yomi = self._preedit_hiragana if self._preedit_hiragana else self._preedit_string
         logger.debug(f'_trigger_conversion: yomi="{self._conversion_yomi}"')
 
+        # A miss in the dictionary needs the CRF: run it off the main loop
+        # (the preedit keeps showing the yomi until the result is applied)
+        if self._needs_background_conversion(self._conversion_yomi):
+            self._start_background_conversion(self._conversion_yomi)
+            return
+
         # Get candidates from HenkanProcessor
         # This will automatically enter bunsetsu mode if no dictionary match
-        candidates = self._henkan_processor.convert(self._conversion_yomi)
+        candidates = self._convert_yomi(self._conversion_yomi)
+        self._show_conversion(candidates)
+
+    def _show_conversion(self, candidates):
+        """
+        Enter CONVERTING state and display the first candidate.
+        変換中状態に入り、最初の候補を表示
 
+        Args:
+            candidates: Candidates returned by HenkanProcessor for _conversion_yomi
+        """
         if not candidates:
             # No candidates found - keep yomi as-is
             logger.debug('_trigger_conversion: no candidates found')
@@ -2605,14 +2846,10 @@ class EnginePSKK(IBus.Engine):
             logger.debug(f'_trigger_conversion: bunsetsu mode, surface="{self._preedit_string}", '
                         f'{self._henkan_processor.get_bunsetsu_count()} bunsetsu')
         else:
-            # Whole-word mode: populate and show lookup table
-            self._lookup_table.clear()
-            for candidate in candidates:
-                self._lookup_table.append_candidate(
-                    IBus.Text.new_from_string(candidate['surface'])
-                )
+            # Whole-word mode: the lookup table is filled lazily when shown
+            self._clear_lookup_table()
 
-            self._preedit_string = candidates[0]['surface']
+            self._preedit_string = candidates[0].surface
             self._update_preedit()
 
             # Don't show lookup table on first conversion
@@ -2620,6 +2857,44 @@ class EnginePSKK(IBus.Engine):
             self.hide_lookup_table()
             logger.debug(f'_trigger_conversion: {len(candidates)} candidate(s), lookup table hidden')
 
+    def _clear_lookup_table(self):
+        """Empty the lookup table and forget which page it held."""
+        self._lookup_table.clear()
+        self._lookup_page = None
+
+    def _show_lookup_page(self):
+        """
+        Show the lookup table page of the selected whole-word candidate.
+        選択中の全語候補のルックアップテーブルページを表示
+
+        The table only ever holds one page: when the selection moves to
+        another page it is refilled with that page's candidates, so a reading
+        with hundreds of candidates never creates more IBus.Text objects than
+        fit on screen. Nothing is shown for a single candidate.
+
+        テーブルは常に1ページ分のみ保持する。選択が別のページに移ると、その
+        ページの候補で埋め直されるため、候補が数百ある読みでも画面に収まる
+        以上のIBus.Textは作られない。候補が1つの場合は何も表示しない。
+        """
+        candidates = self._henkan_processor.get_candidates()
+        if len(candidates) <= 1:
+            return
+
+        index = self._henkan_processor.get_selected_index()
+        page_size = self._lookup_table.get_page_size()
+        page = index // page_size
+        start = page * page_size
+        if page != self._lookup_page:
+            self._lookup_table.clear()
+            for candidate in candidates[start:start + page_size]:
+                self._lookup_table.append_candidate(
+                    IBus.Text.new_from_string(candidate.surface)
+                )
+            self._lookup_page = page
+
+        self._lookup_table.set_cursor_pos(index - start)
+        self.update_lookup_table(self._lookup_table, True)
+
     def _cycle_candidate(self):
         """
         Cycle to the next conversion candidate.
@@ -2667,24 +2942,20 @@ class EnginePSKK(IBus.Engine):
                 # Update combined display surface
                 self._preedit_string = self._henkan_processor.get_display_surface()
                 self._update_preedit()
-                logger.debug(f'_cycle_candidate (bunsetsu): selected "{new_candidate["surface"]}" '
+                logger.debug(f'_cycle_candidate (bunsetsu): selected "{new_candidate.surface}" '
                            f'for bunsetsu {self._henkan_processor.get_selected_bunsetsu_index()}')
             else:
                 # Passthrough bunsetsu has no alternatives
                 logger.debug('_cycle_candidate (bunsetsu): passthrough bunsetsu, no alternatives')
         else:
-            # Whole-word mode: use lookup table
-            self._lookup_table.cursor_down()
-
-            cursor_pos = self._lookup_table.get_cursor_pos()
-            candidate = self._lookup_table.get_candidate(cursor_pos)
+            # Whole-word mode: move the selection, then show its page
+            candidate = self._henkan_processor.next_candidate()
             if candidate:
-                self._preedit_string = candidate.get_text()
+                self._preedit_string = candidate.surface
                 self._update_preedit()
-                # Show lookup table if multiple candidates
-                if self._lookup_table.get_number_of_candidates() > 1:
-                    self.update_lookup_table(self._lookup_table, True)
-                logger.debug(f'_cycle_candidate: selected "{self._preedit_string}" (index {cursor_pos})')
+                self._show_lookup_page()
+                logger.debug(f'_cycle_candidate: selected "{self._preedit_string}" '
+                           f'(index {self._henkan_processor.get_selected_index()})')
 
     def _cycle_candidate_backward(self):
         """
@@ -2703,24 +2974,20 @@ class EnginePSKK(IBus.Engine):
                 # Update combined display surface
                 self._preedit_string = self._henkan_processor.get_display_surface()
                 self._update_preedit()
-                logger.debug(f'_cycle_candidate_backward (bunsetsu): selected "{new_candidate["surface"]}" '
+                logger.debug(f'_cycle_candidate_backward (bunsetsu): selected "{new_candidate.surface}" '
                            f'for bunsetsu {self._henkan_processor.get_selected_bunsetsu_index()}')
             else:
                 # Passthrough bunsetsu has no alternatives
                 logger.debug('_cycle_candidate_backward (bunsetsu): passthrough bunsetsu, no alternatives')
         else:
-            # Whole-word mode: use lookup table
-            self._lookup_table.cursor_up()
-
-            cursor_pos = self._lookup_table.get_cursor_pos()
-            candidate = self._lookup_table.get_candidate(cursor_pos)
+            # Whole-word mode: move the selection, then show its page
+            candidate = self._henkan_processor.previous_candidate()
             if candidate:
-                self._preedit_string = candidate.get_text()
+                self._preedit_string = candidate.surface
                 self._update_preedit()
-                # Show lookup table if multiple candidates
-                if self._lookup_table.get_number_of_candidates() > 1:
-                    self.update_lookup_table(self._lookup_table, True)
-                logger.debug(f'_cycle_candidate_backward: selected "{self._preedit_string}" (index {cursor_pos})')
+                self._show_lookup_page()
+                logger.debug(f'_cycle_candidate_backward: selected "{self._preedit_string}" '
+                           f'(index {self._henkan_processor.get_selected_index()})')
 
     def _cancel_conversion(self):
         """
@@ -2745,7 +3012,7 @@ class EnginePSKK(IBus.Engine):
             self._preedit_hiragana = self._conversion_yomi
             self._in_conversion = False
             self._bunsetsu_active = True  # Go back to bunsetsu mode
-            self._lookup_table.clear()
+            self._clear_lookup_table()
             self.hide_lookup_table()
             self._update_preedit()
             logger.debug(f'_cancel_conversion: reverted to yomi "{self._conversion_yomi}"')
@@ -2758,6 +3025,7 @@ class EnginePSKK(IBus.Engine):
         """
         if self._in_conversion and self._preedit_string:
             logger.debug(f'_confirm_conversion: committing "{self._preedit_string}"')
+            self._henkan_processor.learn_selection()
             self.commit_text(IBus.Text.new_from_string(self._preedit_string))
 
         # Reset all henkan state
@@ -2773,29 +3041,42 @@ class EnginePSKK(IBus.Engine):
 
         This implements "Option B" behavior where space+key implicitly
         converts and commits before starting a new action.
+
+        A yomi that needs the CRF is converted on the worker like a
+        space-tap ('commit' job): the commit and the reset happen when the
+        result is applied, and keys arriving meanwhile are deferred.
+        CRFが必要な読みはスペースタップと同様にワーカーで変換する（'commit'
+        ジョブ）。確定とリセットは結果の適用時に行われ、その間のキーは保留される。
         """
         if self._in_conversion:
             # Already in conversion - commit the selected candidate
             logger.debug(f'_commit_with_implicit_conversion: committing selected "{self._preedit_string}"')
+            self._henkan_processor.learn_selection()
             self.commit_text(IBus.Text.new_from_string(self._preedit_string))
         elif self._bunsetsu_active:
             # In bunsetsu mode - perform conversion and commit first candidate
             yomi = self._preedit_hiragana if self._preedit_hiragana else self._preedit_string
             if yomi:
-                candidates = self._henkan_processor.convert(yomi)
-                if candidates:
-                    # Commit first candidate
-                    surface = candidates[0]['surface']
-                    logger.debug(f'_commit_with_implicit_conversion: converting "{yomi}" → "{surface}"')
-                    self.commit_text(IBus.Text.new_from_string(surface))
-                else:
-                    # No candidates - commit yomi as-is
-                    logger.debug(f'_commit_with_implicit_conversion: no candidates, committing yomi "{yomi}"')
-                    self.commit_text(IBus.Text.new_from_string(yomi))
+                if self._needs_background_conversion(yomi):
+                    self._start_background_conversion(yomi, kind='commit')
+                    return
+                self._commit_first_candidate(yomi, self._convert_yomi(yomi))
 
         # Reset henkan state
         self._reset_henkan_state()
 
+    def _commit_first_candidate(self, yomi, candidates):
+        """Commit the first candidate of an implicit conversion, or the yomi if none."""
+        if candidates:
+            # Commit first candidate
+            surface = candidates[0].surface
+            logger.debug(f'_commit_with_implicit_conversion: converting "{yomi}" → "{surface}"')
+            self.commit_text(IBus.Text.new_from_string(surface))
+        else:
+            # No candidates - commit yomi as-is
+            logger.debug(f'_commit_with_implicit_conversion: no candidates, committing yomi "{yomi}"')
+            self.commit_text(IBus.Text.new_from_string(yomi))
+
     def _reset_henkan_state(self):
         """
         Reset all henkan-related state variables.
@@ -2810,11 +3091,237 @@ class EnginePSKK(IBus.Engine):
         self._preedit_string = ''
         self._preedit_hiragana = ''
         self._preedit_ascii = ''
-        self._lookup_table.clear()
+        self._clear_lookup_table()
         self.hide_lookup_table()
         self._update_preedit()
+        self._cancel_pending_conversion()
+        self._cancel_speculation(discard=True)
         logger.debug('_reset_henkan_state: state cleared')
 
+    # =========================================================================
+    # BACKGROUND AND SPECULATIVE CONVERSION
+    # =========================================================================
+
+    def _convert_yomi(self, yomi):
+        """
+        Convert yomi with the HenkanProcessor, using a speculation if available.
+        HenkanProcessor で読みを変換（投機結果があればそれを使用）
+
+        A speculation is used only if it was computed for exactly this yomi
+        and against the dictionary generation / CRF model still loaded.
+        投機結果は、同じ読みに対して、現在読み込まれている辞書世代/CRFモデルで
+        計算されたものである場合にのみ使用される。
+
+        Returns:
+            list: Candidates, as returned by HenkanProcessor.convert()
+        """
+        result = self._current_speculation(yomi)
+        if result is not None:
+            logger.debug(f'_convert_yomi: speculative hit for "{yomi}"')
+            return self._henkan_processor.apply_conversion(result)
+        return self._henkan_processor.convert(yomi)
+
+    def _current_speculation(self, yomi):
+        """Return the speculated ConversionResult for yomi if still usable, else None."""
+        with self._speculation_lock:
+            result = self._speculation
+        if (result is not None and result.reading == yomi
+                and self._henkan_processor.is_result_current(result)):
+            return result
+        return None
+
+    def _needs_background_conversion(self, yomi):
+        """
+        Whether converting yomi should leave the main loop.
+        読みの変換をメインループ外で行うべきか
+
+        Not for speculation hits and whole-word dictionary hits: those are
+        applied immediately.
+        投機ヒットと全語辞書ヒットは即座に適用するため対象外。
+        """
+        if self._current_speculation(yomi) is not None:
+            return False
+        return not self._henkan_processor.can_convert_immediately(yomi)
+
+    def _start_background_conversion(self, yomi, kind='convert'):
+        """
+        Queue the conversion of yomi on the worker as the new pending request.
+        読みの変換を新しい保留リクエストとしてワーカーのキューに入れる
+
+        Args:
+            kind: 'convert' to show the result, 'commit' to commit its first
+                  candidate (see ConversionJob).
+                  結果を表示するなら'convert'、最初の候補を確定するなら'commit'。
+        """
+        self._conversion_request += 1
+        job = ConversionJob(kind, self._conversion_request, yomi)
+        self._pending_conversion = job
+        self._ensure_conversion_worker()
+        self._q.put(job)
+        logger.debug(f'_start_background_conversion: request #{job.number} for "{yomi}"')
+
+    def _on_conversion_ready(self, job):
+        """
+        GLib idle callback (main loop): apply a finished background conversion.
+        GLib アイドルコールバック（メインループ）: 完了した変換を適用
+
+        Ignored unless the job is still the pending request - it may have been
+        cancelled or superseded. The key events deferred while it ran are
+        replayed after the result is applied.
+        ジョブがまだ保留中のリクエストでなければ無視する。実行中に保留された
+        キーイベントは結果の適用後に再生する。
+        """
+        if job is self._pending_conversion and job.number == self._conversion_request:
+            self._pending_conversion = None
+            self._apply_conversion_job(job)
+            self._replay_deferred_key_events()
+        return False  # one-shot
+
+    def _replay_deferred_key_events(self):
+        """
+        Process the key events held back while a conversion was pending.
+        変換の保留中に保留されたキーイベントを処理する
+
+        They were consumed when they arrived, so one that the engine does not
+        handle now is forwarded to the client. If a replayed key starts
+        another background conversion, the keys after it are deferred again.
+        到着時に消費済みのため、今エンジンが処理しないキーはクライアントに
+        転送する。再生したキーが別のバックグラウンド変換を開始した場合、
+        それ以降のキーは再び保留される。
+        """
+        events = self._deferred_key_events
+        self._deferred_key_events = []
+        for keyval, keycode, state in events:
+            if not self.do_process_key_event(keyval, keycode, state):
+                self.forward_key_event(keyval, keycode, state)
+
+    def _cancel_pending_conversion(self):
+        """
+        Abandon the pending background conversion; the yomi stays as-is.
+        保留中のバックグラウンド変換を破棄（読みはそのまま）
+
+        Key events deferred behind it are dropped: this happens on focus-out,
+        reset, or an Escape/BackSpace that arrived before any other key.
+        その後ろに保留されたキーイベントは捨てる（フォーカスアウト、リセット、
+        または他のキーより先に届いたEscape/BackSpaceの場合）。
+        """
+        if self._pending_conversion is None:
+            return
+        logger.debug(f'_cancel_pending_conversion: request #{self._pending_conversion.number}, '
+                     f'dropping {len(self._deferred_key_events)} deferred key event(s)')
+        self._pending_conversion = None
+        self._deferred_key_events = []
+        self._conversion_request += 1
+
+    def _apply_conversion_job(self, job):
+        """Install a finished ConversionJob's result and display (or commit) it."""
+        if job.kind == 'commit':
+            candidates = None
+            if job.result is not None:
+                candidates = self._henkan_processor.apply_conversion(job.result)
+            self._commit_first_candidate(job.yomi, candidates)
+            self._reset_henkan_state()
+            return
+        if job.result is None:
+            logger.debug(f'_apply_conversion_job: no result for "{job.yomi}", keeping yomi')
+            return
+        candidates = self._henkan_processor.apply_conversion(job.result)
+        self._show_conversion(candidates)
+
+    def _schedule_speculation(self):
+        """
+        Arm the speculation timer for the current yomi after a key event.
+        キーイベント後、現在の読みに対する投機タイマーを設定
+
+        Only while the yomi is being typed (BUNSETSU_ACTIVE, not converting),
+        and only if the yomi has not been speculated already.
+        読み入力中（BUNSETSU_ACTIVE で変換中でない）かつ、その読みがまだ
+        投機されていない場合のみ。
+        """
+        if not self._bunsetsu_active or self._in_conversion or self._pending_conversion is not None:
+            return
+        yomi = self._preedit_hiragana if self._preedit_hiragana else self._preedit_string
+        if not yomi:
+            return
+        with self._speculation_lock:
+            if self._speculation is not None and self._speculation.reading == yomi:
+                return
+        delay = self._config.get('speculative_conversion_delay_ms', 150)
+        self._speculation_timer_id = GLib.timeout_add(
+            delay, self._on_speculation_timeout, self._speculation_token, yomi)
+
+    def _cancel_speculation(self, discard=False):
+        """
+        Cancel the armed timer and any queued or running speculation.
+        設定済みのタイマーと、待機中・実行中の投機をキャンセル
+
+        Args:
+            discard: Also drop the already computed result (on commit/reset).
+                     計算済みの結果も破棄する（確定/リセット時）。
+        """
+        if self._speculation_timer_id is not None:
+            GLib.source_remove(self._speculation_timer_id)
+            self._speculation_timer_id = None
+        with self._speculation_lock:
+            self._speculation_token += 1
+            if discard:
+                self._speculation = None
+
+    def _on_speculation_timeout(self, token, yomi):
+        """GLib timeout callback: typing paused, hand the yomi to the worker."""
+        self._speculation_timer_id = None
+        if token == self._speculation_token:
+            self._ensure_conversion_worker()
+            self._q.put(ConversionJob('speculate', token, yomi))
+        return False  # one-shot
+
+    def _ensure_conversion_worker(self):
+        """Start the conversion worker thread on first use."""
+        if self._conversion_worker is None:
+            self._conversion_worker = threading.Thread(
+                target=self._conversion_worker_loop, name='pskk-conversion', daemon=True)
+            self._conversion_worker.start()
+
+    def _conversion_worker_loop(self):
+        """
+        Worker thread: compute queued conversions off the GLib main loop.
+        ワーカースレッド: キューに入った変換を GLib メインループ外で計算
+
+        Only HenkanProcessor.compute_conversion() runs here; it does not touch
+        the conversion session, and nothing here touches IBus. Results of
+        'convert' and 'commit' jobs go back to the main loop through GLib.idle_add().
+        ここでは HenkanProcessor.compute_conversion() のみを実行する。これは
+        変換セッションに触れず、ここから IBus に触れることもない。
+        'convert'/'commit' ジョブの結果は GLib.idle_add() でメインループに戻される。
+        """
+        while True:
+            job = self._q.get()
+            if job.kind == 'speculate':
+                if job.number != self._speculation_token:
+                    continue  # Cancelled while queued
+            elif job is not self._pending_conversion:
+                continue  # Cancelled or superseded while queued
+
+            try:
+                result = None
+                if job.kind != 'speculate':
+                    # A speculation for the same yomi may have just finished
+                    result = self._current_speculation(job.yomi)
+                if result is None:
+                    result = self._henkan_processor.compute_conversion(job.yomi)
+            except Exception as e:
+                logger.error(f'Background conversion of "{job.yomi}" failed: {e}')
+                result = None
+            job.result = result
+
+            if job.kind != 'speculate':
+                GLib.idle_add(self._on_conversion_ready, job)
+            elif result is not None:
+                with self._speculation_lock:
+                    if job.number == self._speculation_token:
+                        self._speculation = result
+                        logger.debug(f'Speculative conversion ready: "{job.yomi}"')
+
     # =========================================================================
     # HELPER METHODS
     # =========================================================================
@@ -2851,7 +3358,8 @@ class EnginePSKK(IBus.Engine):
         • _converted: Conversion flag / 変換フラグ
         """
         if self._preedit_string:
-            logger.debug(f'Committing: "{self._preedit_string}"')
+            if tracing.enabled:
+                tracing.record('commit', text=self._preedit_string)
             # Save the text to commit before clearing buffers
             text_to_commit = self._preedit_string
             # Clear preedit display FIRST to avoid race condition:
@@ -2866,6 +3374,60 @@ class EnginePSKK(IBus.Engine):
             self._update_preedit()
             self.commit_text(IBus.Text.new_from_string(text_to_commit))
 
+    def _compile_preedit_templates(self):
+        """
+        Build the preedit attribute templates of each style from the config.
+        設定から各スタイルのプリエディット属性テンプレートを構築。
+
+        Called from _load_configs(), so the colors are parsed once per config
+        (re)load instead of on every preedit update. A template is a tuple of
+        (IBus.AttrType, value) pairs, applied by _update_preedit() to the
+        range it styles:
+        _load_configs()から呼ばれるため、色はプリエディット更新ごとではなく
+        設定の（再）読み込みごとに一度だけ解析される:
+
+            stealth   IDLE preedit in stealth mode / ステルスモードのIDLE
+            hint      IBus theme colors (use_ibus_hint_colors) / テーマ色
+            colors    configured foreground/background colors / 設定色
+            bunsetsu  non-selected bunsetsu in conversion / 非選択の文節
+            selected  selected bunsetsu in conversion / 選択中の文節
+        """
+        foreground = self._parse_hex_color(self._config.get('preedit_foreground_color', '0x000000'))
+        background = self._parse_hex_color(self._config.get('preedit_background_color', '0xd1eaff'))
+        underline = (IBus.AttrType.UNDERLINE, IBus.AttrUnderline.SINGLE)
+
+        colors = []
+        if foreground is not None:
+            colors.append((IBus.AttrType.FOREGROUND, foreground))
+        if background is not None:
+            colors.append((IBus.AttrType.BACKGROUND, background))
+        # Also add underline for better visibility
+        colors.append(underline)
+
+        selected = [(IBus.AttrType.UNDERLINE, IBus.AttrUnderline.DOUBLE)]
+        if background is not None:
+            selected.append((IBus.AttrType.BACKGROUND, background))
+
+        # AttrType.HINT with AttrPreedit.WHOLE (1) for theme-based styling
+        # requires IBus >= 1.5.33; fall back to underline without it
+        hint_type = getattr(IBus.AttrType, 'HINT', None)
+        if hint_type is None and self._config.get('use_ibus_hint_colors', False):
+            logger.warning('IBus HINT attribute is not available (IBus >= 1.5.33 required), using underline')
+
+        self._preedit_templates = {
+            # Explicit UNDERLINE_NONE overrides the default preedit underline
+            # that GTK/IBus clients add automatically
+            'stealth': ((IBus.AttrType.UNDERLINE, IBus.AttrUnderline.NONE),),
+            'hint': ((hint_type, 1),) if hint_type is not None else (underline,),
+            'colors': tuple(colors),
+            'bunsetsu': (underline,),
+            'selected': tuple(selected),
+        }
+        self._preedit_style = 'hint' if self._config.get('use_ibus_hint_colors', False) else 'colors'
+        self._preedit_stealth = self._logging_level != 'DEBUG'
+        # Styles may have changed: make the next _update_preedit() send
+        self._preedit_shown = None
+
     def _parse_hex_color(self, color_str):
         """
         Parse a hex color string to an integer value for IBus attributes.
@@ -2888,6 +3450,7 @@ class EnginePSKK(IBus.Engine):
             logger.warning(f'Failed to parse color value: {color_str}')
             return None
 
+    @latency.timed('engine.update_preedit')
     def _update_preedit(self):
         """
         Update the preedit display in the application.
@@ -2940,139 +3503,46 @@ class EnginePSKK(IBus.Engine):
 
         In DEBUG mode, underline is always shown for development visibility.
         DEBUGモードでは、開発時の可視性のため常に下線が表示される。
-        """
-        if self._preedit_string:
-            preedit_text = IBus.Text.new_from_string(self._preedit_string)
-            attrs = IBus.AttrList()
-            preedit_len = len(self._preedit_string)
-
-            # In IDLE mode (not bunsetsu, forced-preedit, or conversion) with
-            # log-level above DEBUG, render the preedit without any visual
-            # styling so it appears as if already committed.  In DEBUG mode
-            # the underline/background is kept for development visibility.
-            is_idle = (not self._bunsetsu_active
-                       and not self._in_forced_preedit
-                       and not self._in_conversion)
-            stealth = is_idle and self._logging_level != 'DEBUG'
-
-            # Check if we're in bunsetsu mode for special display handling
-            in_bunsetsu_mode = (self._in_conversion and
-                               self._henkan_processor.is_bunsetsu_mode())
-
-            if stealth:
-                # Explicitly set UNDERLINE_NONE to override the default
-                # preedit underline that GTK/IBus clients add automatically.
-                attrs.append(IBus.Attribute.new(
-                    IBus.AttrType.UNDERLINE,
-                    IBus.AttrUnderline.NONE,
-                    0,
-                    preedit_len
-                ))
-                logger.debug('Stealth preedit: no styling in IDLE mode')
-            elif in_bunsetsu_mode:
-                # Bunsetsu mode: show selected bunsetsu with double underline,
-                # non-selected bunsetsu with single underline
-                bunsetsu_segments = self._henkan_processor.get_display_surface_with_selection()
-                pos = 0
-                for surface, is_selected in bunsetsu_segments:
-                    segment_len = len(surface)
-                    if segment_len == 0:
-                        continue
-
-                    # Set underline style based on selection
-                    underline_style = (IBus.AttrUnderline.DOUBLE if is_selected
-                                      else IBus.AttrUnderline.SINGLE)
-                    attrs.append(IBus.Attribute.new(
-                        IBus.AttrType.UNDERLINE,
-                        underline_style,
-                        pos,
-                        pos + segment_len
-                    ))
-
-                    # Apply background color to selected bunsetsu for better visibility
-                    if is_selected:
-                        selected_bg = self._parse_hex_color(
-                            self._config.get('preedit_background_color', '0xd1eaff')
-                        )
-                        if selected_bg is not None:
-                            attrs.append(IBus.Attribute.new(
-                                IBus.AttrType.BACKGROUND,
-                                selected_bg,
-                                pos,
-                                pos + segment_len
-                            ))
-
-                    pos += segment_len
-
-                logger.debug(f'Bunsetsu mode preedit: {len(bunsetsu_segments)} segments, '
-                           f'selected={self._henkan_processor.get_selected_bunsetsu_index()}')
-            elif self._config.get('use_ibus_hint_colors', False):
-                # Use IBus AttrType.HINT for theme-based styling (requires IBus >= 1.5.33)
-                # AttrPreedit.WHOLE (1) indicates the entire preedit text
-                try:
-                    attrs.append(IBus.Attribute.new(
-                        IBus.AttrType.HINT,
-                        1,  # IBus.AttrPreedit.WHOLE
-                        0,
-                        preedit_len
-                    ))
-                    logger.debug('Using IBus HINT styling for preedit')
-                except Exception as e:
-                    logger.warning(f'Failed to apply HINT attribute (IBus >= 1.5.33 required): {e}')
-                    # Fall back to underline
-                    attrs.append(IBus.Attribute.new(
-                        IBus.AttrType.UNDERLINE,
-                        IBus.AttrUnderline.SINGLE,
-                        0,
-                        preedit_len
-                    ))
-            else:
-                # Use explicit foreground and background colors from config
-                fg_color = self._parse_hex_color(
-                    self._config.get('preedit_foreground_color', '0x000000')
-                )
-                bg_color = self._parse_hex_color(
-                    self._config.get('preedit_background_color', '0xd1eaff')
-                )
 
-                # Add foreground color attribute
-                if fg_color is not None:
-                    attrs.append(IBus.Attribute.new(
-                        IBus.AttrType.FOREGROUND,
-                        fg_color,
-                        0,
-                        preedit_len
-                    ))
-
-                # Add background color attribute
-                if bg_color is not None:
-                    attrs.append(IBus.Attribute.new(
-                        IBus.AttrType.BACKGROUND,
-                        bg_color,
-                        0,
-                        preedit_len
-                    ))
-
-                # Also add underline for better visibility
-                attrs.append(IBus.Attribute.new(
-                    IBus.AttrType.UNDERLINE,
-                    IBus.AttrUnderline.SINGLE,
-                    0,
-                    preedit_len
-                ))
-                # Seeing this line in the log file seemed to be just too much -- commenting out
-                #logger.debug(f'Using explicit preedit colors: fg=0x{fg_color:06x}, bg=0x{bg_color:06x}')
-
-            preedit_text.set_attributes(attrs)
-
-            # Use COMMIT mode so preedit is committed on focus change (e.g., clicking elsewhere)
-            self.update_preedit_text_with_mode(
-                preedit_text,
-                preedit_len,  # cursor at end
-                True,  # visible
-                IBus.PreeditFocusMode.COMMIT
-            )
+        ─────────────────────────────────────────────────────────────────────────
+        CACHING / キャッシュ
+        ─────────────────────────────────────────────────────────────────────────
+        The attributes of each style come from templates built at config load
+        (_compile_preedit_templates()). The text, style and bunsetsu segments
+        sent last are remembered in self._preedit_shown, and an update that
+        would send the same preedit again is skipped. The cursor is always at
+        the end and the preedit is visible iff it is non-empty, so they are
+        implied by the text. Code that changes the client's preedit by other
+        means resets self._preedit_shown to None.
+        各スタイルの属性は設定読み込み時に作られるテンプレート
+        （_compile_preedit_templates()）から得る。最後に送ったテキスト・スタイル・
+        文節をself._preedit_shownに記憶し、同じプリエディットを再送する更新は
+        スキップする。それ以外の方法でクライアントのプリエディットを変更する
+        コードはself._preedit_shownをNoneに戻す。
+        """
+        text = self._preedit_string
+        if not text:
+            preedit = None
+        elif (self._preedit_stealth and not self._bunsetsu_active
+              and not self._in_forced_preedit and not self._in_conversion):
+            # IDLE mode with log-level above DEBUG: render the preedit without
+            # any visual styling so it appears as if already committed
+            preedit = (text, 'stealth', None)
+        elif self._in_conversion and self._henkan_processor.is_bunsetsu_mode():
+            # Bunsetsu mode: selected bunsetsu with double underline and
+            # background, non-selected bunsetsu with single underline
+            preedit = (text, 'bunsetsu',
+                       tuple(self._henkan_processor.get_display_surface_with_selection()))
         else:
+            preedit = (text, self._preedit_style, None)
+
+        # Key releases and state changes that do not touch the preedit end up
+        # here too; the client already shows this preedit, skip the D-Bus call
+        if preedit == self._preedit_shown:
+            return
+        self._preedit_shown = preedit
+
+        if preedit is None:
             # Hide preedit when empty
             self.update_preedit_text_with_mode(
                 IBus.Text.new_from_string(''),
@@ -3080,4 +3550,36 @@ class EnginePSKK(IBus.Engine):
                 False,  # not visible
                 IBus.PreeditFocusMode.CLEAR
             )
+            return
+
+        _, style, segments = preedit
+        preedit_len = len(text)
+        attrs = IBus.AttrList()
+        if segments is None:
+            for attr_type, value in self._preedit_templates[style]:
+                attrs.append(IBus.Attribute.new(attr_type, value, 0, preedit_len))
+        else:
+            pos = 0
+            for surface, is_selected in segments:
+                end = pos + len(surface)
+                if end > pos:
+                    template = self._preedit_templates['selected' if is_selected else 'bunsetsu']
+                    for attr_type, value in template:
+                        attrs.append(IBus.Attribute.new(attr_type, value, pos, end))
+                pos = end
+
+        if tracing.enabled:
+            tracing.record('preedit', style=style, text=text,
+                           segments=len(segments) if segments is not None else None)
+
+        preedit_text = IBus.Text.new_from_string(text)
+        preedit_text.set_attributes(attrs)
+
+        # Use COMMIT mode so preedit is committed on focus change (e.g., clicking elsewhere)
+        self.update_preedit_text_with_mode(
+            preedit_text,
+            preedit_len,  # cursor at end
+            True,  # visible
+            IBus.PreeditFocusMode.COMMIT
+        )
 
@@ -132,6 +132,42 @@ CRFはN-best予測（複数の可能なセグメンテーション）を提供:
 Users can cycle through these predictions using the bunsetsu_cycle key.
 ユーザーはbunsetsu_cycleキーを使用してこれらの予測を循環できる。
 
+================================================================================
+LATTICE CONVERSION (optional) / ラティス変換（任意）
+================================================================================
+
+The N-best paths above come from the CRF alone: a Lookup bunsetsu that is not
+in the dictionary simply stays in kana. With lattice_conversion enabled, the
+segmentations come from a word lattice over the yomi instead:
+
+上記のN-bestはCRFのみから得られるため、辞書にないLookup文節はかなのまま
+残る。lattice_conversionを有効にすると、セグメンテーションは読み上の
+単語ラティスから得られる:
+
+    きょうはてんきがよい
+    ├─ きょう ─┬─ は ─┬─ てんき ─┬─ が ─┬─ よい     (dictionary edges)
+    ├─ きょ   │       ├─ てん    │       ...         (辞書エッジ)
+    └─ き     └─ は*  └─ ...     └─ が*              (* passthrough edges)
+
+    - Dictionary edges: every reading found by common_prefix_search() at
+      each position, scored by the CRF marginal of a bunsetsu boundary at
+      its start (and none inside), the Lookup marginal over its span, and
+      its best candidate count.
+      辞書エッジ: 各位置でcommon_prefix_search()が見つけた全ての読み。
+      先頭の文節境界（内部は非境界）のCRF周辺確率、範囲のLookup周辺確率、
+      最良候補のカウントでスコア付け。
+    - Passthrough edges: short kana spans kept as-is, scored by the
+      Passthrough marginal, so every yomi has at least one path.
+      パススルーエッジ: そのまま残す短いかな範囲。Passthrough周辺確率で
+      スコア付けされ、どの読みにも少なくとも1つのパスがある。
+
+A forward Viterbi pass over this DAG followed by a backward A* search
+yields the top segmentations one at a time, best first, in the same
+(bunsetsu_list, score) form as predict_bunsetsu() (like util.CRFPathStream).
+このDAG上の前向きViterbiと後ろ向きA*探索で、上位のセグメンテーションが
+最良から1つずつ得られる（predict_bunsetsu()と同じ(bunsetsu_list, score)
+形式、util.CRFPathStreamと同様）。
+
 ================================================================================
 CANDIDATE NAVIGATION / 候補ナビゲーション
 ================================================================================
@@ -181,8 +217,13 @@ Dictionary loading happens in a BACKGROUND THREAD to avoid blocking the UI:
          ▼
     [変換, 返還, ...]
 
-The _lock ensures thread-safe access to the dictionary during loading.
-_lockは読み込み中の辞書への安全なアクセスを保証する。
+The loaded data lives in an immutable DictionaryGeneration. Later reloads
+build the NEXT generation in the background and swap it in atomically;
+conversions keep using the previous generation until then, so the
+passthrough window only exists at the very first load.
+読み込んだデータは不変のDictionaryGenerationに格納される。以降の再読み込みは
+次の世代をバックグラウンドで構築して原子的に差し替える。それまで変換は前の
+世代を使い続けるため、パススルーになるのは最初の読み込み時のみ。
 
 ================================================================================
 DICTIONARY FORMAT / 辞書形式
@@ -218,19 +259,616 @@ Example / 例:
 Higher count = higher priority (shown first in candidate list).
 高いカウント = 高い優先度（候補リストで最初に表示）。
 
+COMPILED DICTIONARIES / コンパイル済み辞書:
+    When a JSON file has a fresh compiled counterpart (foo.json → foo.bin,
+    see compiled_dictionary.py), it is memory-mapped and queried in place
+    instead of being parsed. Candidates from all layers are merged at lookup
+    time, keeping the maximum count per surface - the same result as merging
+    the JSON files up front.
+    JSONファイルに新鮮なコンパイル済みファイル（foo.json → foo.bin、
+    compiled_dictionary.py参照）がある場合、解析せずにメモリマップして
+    その場で検索する。全レイヤーの候補は検索時にマージされ、表層形ごとに
+    最大カウントを保持する（JSONを事前にマージした場合と同じ結果）。
+
+MERGED SNAPSHOT / マージ済みスナップショット:
+    The base dictionaries (everything except user_dictionary.json) are merged
+    once and persisted as merged_dictionary.bin, keyed by a fingerprint of
+    each source file. While all fingerprints match, startup maps that single
+    file. Otherwise the sources are loaded as above and the snapshot is
+    rebuilt in the background thread, then swapped in.
+    基本辞書（user_dictionary.json以外）は一度マージされ、各ソースファイルの
+    フィンガープリントをキーとしてmerged_dictionary.binに保存される。全て
+    一致する間、起動時はその1ファイルをマップするだけ。それ以外はソースを
+    上記の通り読み込み、バックグラウンドでスナップショットを再構築して差し替える。
+
+    user_dictionary.json is kept OUT of the snapshot and loaded as a small
+    in-memory overlay: it is the file that changes at runtime, and including
+    it would invalidate the whole snapshot on every user edit. Its journal of
+    later edits (dictionary_journal.py) is replayed on top when it is loaded.
+    user_dictionary.jsonはスナップショットに含めず、小さなメモリ上の
+    オーバーレイとして読み込む: 実行時に変更されるファイルであり、含めると
+    ユーザー編集のたびにスナップショット全体が無効になるため。その後の
+    編集のジャーナル（dictionary_journal.py）は読み込み時に上から再生される。
+
+================================================================================
+LEARNING / 学習
+================================================================================
+
+Confirming a conversion teaches the processor the selected candidates
+(learn_selection()). Each selected (reading, surface) pair gets its count
+in the user overlay raised to one above its current merged count, and the
+overlay is swapped in as the next generation right away, so the very next
+lookup ranks it accordingly.
+変換の確定で選択された候補を学習する（learn_selection()）。選択された
+(読み, 表層形)の組はユーザーオーバーレイでのカウントが現在のマージ済み
+カウント+1に引き上げられ、オーバーレイはすぐ次の世代として差し替えられる
+ため、次の検索から順位に反映される。
+
+The file is written behind: learned counts are kept in memory until a
+background flush appends them to the journal of user_dictionary.json (see
+dictionary_journal.py) - a while after the first unsaved selection, on
+focus-out and at exit (flush_learning()). Nothing on the key path touches
+the disk.
+ファイルへは遅延書き込み: 学習したカウントは、バックグラウンドの
+フラッシュがuser_dictionary.jsonのジャーナル（dictionary_journal.py参照）に
+追記するまでメモリに保持される
+（最初の未保存の選択からしばらく後、フォーカスアウト時、終了時）。
+キー処理の経路がディスクに触れることはない。
+
 ================================================================================
 """
 
+from collections import OrderedDict, namedtuple
+import heapq
+import itertools
 import logging
+import math
 import os
 import threading
+import time
 
 import orjson
 
+import compiled_dictionary
+import dictionary_journal
+import latency
 import util
+from reading_index import ReadingIndex
 
 logger = logging.getLogger(__name__)
 
+# Loaded as an in-memory overlay instead of being part of the merged snapshot
+USER_DICTIONARY_FILENAME = 'user_dictionary.json'
+
+# Learning: how far a selected candidate's count is raised above the
+# reading's current top count (so one selection ranks it first), and the delay (seconds) between the first unsaved
+# selection and the background write of user_dictionary.json
+LEARNING_INCREMENT = 1
+LEARNING_FLUSH_DELAY = 30.0
+
+# Number of readings whose ConversionResult is kept in the LRU cache
+CONVERSION_CACHE_SIZE = 256
+
+# Default of bunsetsu_prediction_n_best (see default_user_config.json)
+BUNSETSU_N_BEST = 3
+
+# Safety bound on the paths drawn per bunsetsu prediction, since
+# single-bunsetsu paths are drawn but filtered out
+BUNSETSU_MAX_DRAWS_PER_PREDICTION = 4
+
+# Lattice conversion: weight of log(1 + best candidate count) per dictionary
+# edge, and longest kana span a single passthrough edge may cover
+LATTICE_COUNT_WEIGHT = 0.1
+LATTICE_MAX_PASSTHROUGH = 4
+
+# Shortest dictionary reading used when a Lookup bunsetsu that misses the
+# dictionary is split into dictionary words (single kana match far too much)
+SPLIT_MIN_READING_LENGTH = 2
+
+# Candidates of each split piece that are offered, one piece changed at a
+# time, in the candidate list of such a bunsetsu
+SPLIT_PIECE_CANDIDATES = 4
+
+# Probabilities are clamped to this before taking their log
+_LOG_FLOOR = 1e-9
+
+
+def _stat_key(path):
+    """Return (size, mtime_ns) of a file, or None if it cannot be stat()ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _source_stat(path):
+    """
+    _stat_key() of a dictionary source. For user_dictionary.json this covers
+    its journal too, since most edits only append to the journal.
+    """
+    if os.path.basename(path) == USER_DICTIONARY_FILENAME:
+        return (_stat_key(path), _stat_key(dictionary_journal.get_journal_path(path)))
+    return _stat_key(path)
+
+
+class Candidate(namedtuple('Candidate', ('surface', 'reading', 'count',
+                                           'passthrough', 'bunsetsu_mode'),
+                           defaults=(0, False, False))):
+    """
+    One conversion candidate.
+    1つの変換候補。
+
+    A tuple subclass without a per-instance __dict__, so a reading with many
+    candidates costs one small tuple per candidate instead of one dict.
+    インスタンスごとの__dict__を持たないタプルのサブクラス。候補の多い読みでも
+    候補ごとに辞書ではなく小さなタプル1つで済む。
+
+    Attributes:
+        surface: The converted text (e.g., "変換") / 変換されたテキスト
+        reading: The original reading (e.g., "へんかん") / 元の読み
+        count: Conversion priority (higher is better) / 変換優先度（高いほど良い）
+        passthrough: True if the reading is kept as-is (no dictionary match)
+                     読みをそのまま保持する場合True（辞書マッチなし）
+        bunsetsu_mode: True for the single entry standing for a bunsetsu result
+                       文節モードの結果を表す単一エントリの場合True
+
+    Dict-style access (candidate['surface'], candidate.get('passthrough'))
+    is still accepted for code written against the former candidate dicts.
+    旧候補辞書向けに書かれたコードのため、辞書形式のアクセスも受け付ける。
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        """Dict-style get() for the candidate fields. / 辞書形式のget()。"""
+        return getattr(self, key) if key in self._fields else default
+
+
+class DictionaryGeneration:
+    """
+    Immutable snapshot of the dictionary data used by conversions.
+    変換が使用する辞書データの不変スナップショット。
+
+    A generation bundles everything derived from the dictionary files. It is
+    never mutated after construction: a reload builds the NEXT generation
+    (in a background thread when files have to be read) and HenkanProcessor
+    swaps it in with a single assignment. Lookups read the current generation
+    once and need no lock; a conversion started on the previous generation
+    simply finishes on it.
+    世代は辞書ファイルから得られる全てをまとめたもの。構築後は変更されない:
+    再読み込みは次の世代を構築し（ファイル読み込みが必要ならバックグラウンド
+    スレッドで）、HenkanProcessorが1回の代入で差し替える。検索は現在の世代を
+    一度読むだけでロック不要。前の世代で始まった変換はそのまま完了する。
+
+        Generation N    ──── convert() ── convert() ── convert()
+        Generation N+1        [building in background] ──swap──► convert() ...
+
+    Attributes:
+        number: Monotonically increasing generation number (0 = empty)
+                単調増加する世代番号（0 = 空）
+        base_number: Number of the last generation that was not only
+                     learned counts on top of its predecessor; conversion
+                     results are tagged with it
+                     直前の世代に学習カウントを重ねただけではない最後の
+                     世代の番号。変換結果のタグに使われる
+        compiled_layers: Tuple of memory-mapped CompiledDictionary layers
+                         メモリマップされたCompiledDictionaryレイヤーのタプル
+        dictionary: Merged JSON-loaded base dictionaries {reading: {surface: count}}
+                    JSONから読み込んだ基本辞書のマージ結果
+        user_dictionary: Overlay loaded from user_dictionary.json
+                         user_dictionary.jsonから読み込んだオーバーレイ
+        crf_feature_materials: Dictionary-derived CRF feature materials
+                               辞書由来のCRF特徴量素材
+        dictionary_files: Source paths, in load order / 読み込み順のソースパス
+        source_stats: {path: (size, mtime_ns)} taken before the sources were read
+                      ソースを読む前に取得した{パス: (サイズ, mtime_ns)}
+        dictionary_count: Number of successfully loaded dictionary files
+                          読み込みに成功した辞書ファイル数
+        sorted_index: {reading: ((surface, count), ...)} for every reading of
+                      the JSON layers, merged across ALL layers and sorted by
+                      count at construction time
+                      JSONレイヤーの全読みについて、構築時に全レイヤーを
+                      マージしカウント順に並べたタプル
+        dictionary_index: ReadingIndex over the readings of `dictionary`
+                          `dictionary`の読みのReadingIndex
+        user_index: ReadingIndex over the readings of `user_dictionary`
+                    `user_dictionary`の読みのReadingIndex
+
+    Candidate order only changes when the dictionaries do, so the merge and
+    sort happen here, once, instead of on every lookup. Readings that live
+    only in compiled layers need no index entry: a single compiled layer is
+    stored pre-sorted, and the (rare) merge of several compiled layers is
+    memoized on first use.
+    候補の順序は辞書が変わった時にしか変わらないため、マージとソートは検索の
+    たびではなく、ここで一度だけ行う。コンパイル済みレイヤーのみにある読みは
+    索引不要（単一レイヤーは格納時にソート済み、複数レイヤーのマージは初回
+    使用時にメモ化される）。
+
+    The prefix indexes are built here as well. Compiled layers answer prefix
+    queries from their own mapped reading index, so only the JSON layers get
+    a ReadingIndex; common_prefix_search() and predictive_search() union the
+    answers of all layers.
+    接頭辞インデックスもここで構築する。コンパイル済みレイヤーは自身の
+    マップされた読みインデックスで接頭辞検索に答えるため、ReadingIndexを
+    持つのはJSONレイヤーのみ。common_prefix_search()とpredictive_search()は
+    全レイヤーの答えを合わせる。
+    """
+
+    __slots__ = ('number', 'base_number', 'compiled_layers', 'dictionary', 'user_dictionary',
+                 'crf_feature_materials', 'dictionary_files', 'source_stats',
+                 'dictionary_count', 'sorted_index', 'dictionary_index',
+                 'user_index', '_compiled_memo')
+
+    def __init__(self, number=0, compiled_layers=(), dictionary=None,
+                 user_dictionary=None, crf_feature_materials=None,
+                 dictionary_files=(), source_stats=None, dictionary_count=0,
+                 sorted_index=None, dictionary_index=None, user_index=None,
+                 base_number=None):
+        self.number = number
+        self.base_number = number if base_number is None else base_number
+        self.compiled_layers = compiled_layers
+        self.dictionary = dictionary if dictionary is not None else {}
+        self.user_dictionary = user_dictionary if user_dictionary is not None else {}
+        self.crf_feature_materials = crf_feature_materials if crf_feature_materials is not None else {}
+        self.dictionary_files = dictionary_files
+        self.source_stats = source_stats if source_stats is not None else {}
+        self.dictionary_count = dictionary_count
+        self._compiled_memo = {}
+        if sorted_index is None:
+            sorted_index = {}
+            for source in (self.dictionary, self.user_dictionary):
+                for reading in source:
+                    if reading not in sorted_index:
+                        merged = self._merge_sorted(reading)
+                        if merged:
+                            sorted_index[reading] = merged
+        self.sorted_index = sorted_index
+        self.dictionary_index = (dictionary_index if dictionary_index is not None
+                                 else ReadingIndex(self.dictionary))
+        self.user_index = (user_index if user_index is not None
+                           else ReadingIndex(self.user_dictionary))
+
+    def replace(self, number, **changes):
+        """
+        Return a new generation that shares every field except `changes`.
+        `changes`以外の全フィールドを共有する新しい世代を返す。
+
+        When only the user overlay (or the CRF materials) changes, the sorted
+        index is carried over and just the readings the edit touched are
+        merged again; any other change rebuilds it.
+        ユーザーオーバーレイ（またはCRF素材）のみが変わる場合、ソート済み索引を
+        引き継ぎ、編集で変わった読みだけを再マージする。それ以外は再構築する。
+
+        The new generation is its own base unless `base_number` is given
+        (learning keeps the base, see HenkanProcessor._learn_pairs()).
+        `base_number`を指定しない限り新しい世代は自身が基準になる
+        （学習は基準を保つ。HenkanProcessor._learn_pairs()参照）。
+        """
+        base_number = changes.pop('base_number', number)
+        fields = {name: getattr(self, name) for name in self.__slots__
+                  if not name.startswith('_')}
+        fields.update(changes)
+        fields['number'] = number
+        fields['base_number'] = base_number
+        if 'dictionary' in changes:
+            fields['dictionary_index'] = None
+        if 'user_dictionary' in changes:
+            fields['user_index'] = None
+
+        touched = ()
+        if set(changes) <= {'user_dictionary', 'crf_feature_materials', 'dictionary_files',
+                            'source_stats', 'dictionary_count'}:
+            new_user = fields['user_dictionary']
+            touched = [reading for reading in self.user_dictionary.keys() | new_user.keys()
+                       if self.user_dictionary.get(reading) != new_user.get(reading)]
+            fields['sorted_index'] = dict(self.sorted_index) if touched else self.sorted_index
+        else:
+            fields['sorted_index'] = None
+
+        generation = DictionaryGeneration(**fields)
+        for reading in touched:
+            merged = generation._merge_sorted(reading)
+            if merged:
+                generation.sorted_index[reading] = merged
+            else:
+                generation.sorted_index.pop(reading, None)
+        return generation
+
+    def _merge_sorted(self, reading):
+        """
+        Merge a reading's candidates across all layers, sorted by count.
+        全レイヤーにわたって読みの候補をマージし、カウント順に並べる。
+
+        The maximum count per surface is kept, exactly as
+        HenkanProcessor._load_dictionaries does for JSON files.
+        表層形ごとの最大カウントを保持する（_load_dictionariesと同じ）。
+
+        Returns:
+            tuple or None: ((surface, count), ...) or None if no layer has it.
+        """
+        merged = {}
+        for layer in self.compiled_layers:
+            for surface, count in layer.lookup(reading) or ():
+                existing = merged.get(surface)
+                if existing is None or count > existing:
+                    merged[surface] = count
+        for source in (self.dictionary, self.user_dictionary):
+            for surface, count in (source.get(reading) or {}).items():
+                existing = merged.get(surface)
+                if existing is None or count > existing:
+                    merged[surface] = count
+        if not merged:
+            return None
+        # Sort by count (descending) - higher count = better candidate
+        return tuple(sorted(merged.items(), key=lambda x: x[1], reverse=True))
+
+    def _prefix_sources(self):
+        """Layers answering prefix queries, in lookup order."""
+        return self.compiled_layers + (self.dictionary_index, self.user_index)
+
+    def common_prefix_search(self, text):
+        """
+        Return every reading (in any layer) that is a prefix of text.
+        textの接頭辞である（いずれかのレイヤーの）全ての読みを返す。
+
+        Args:
+            text: The text to match. / 照合するテキスト。
+
+        Returns:
+            list: Readings sorted by increasing length. / 長さの昇順の読み。
+        """
+        sources = self._prefix_sources()
+        found = set()
+        for source in sources:
+            if len(source):
+                found.update(source.common_prefix_search(text))
+        return sorted(found, key=len)
+
+    def predictive_search(self, prefix, limit=None):
+        """
+        Return the readings (in any layer) starting with prefix.
+        prefixで始まる（いずれかのレイヤーの）読みを返す。
+
+        Args:
+            prefix: The beginning of the reading. / 読みの先頭部分。
+            limit: Maximum number of readings to return (None = all).
+                   返す読みの最大数（None = 全て）。
+
+        Returns:
+            list: Readings in sorted order. / ソート順の読み。
+        """
+        found = set()
+        for source in self._prefix_sources():
+            if len(source):
+                found.update(source.predictive_search(prefix, limit))
+        result = sorted(found)
+        return result[:limit] if limit is not None else result
+
+    def longest_match_split(self, text, min_length=SPLIT_MIN_READING_LENGTH):
+        """
+        Split text into dictionary readings, covering as much as possible.
+        テキストを辞書の読みに分割し、できるだけ多くを覆う。
+
+        A DP over character positions: the edges leaving position i are the
+        readings of common_prefix_search(text[i:]) (at least min_length
+        long) plus one kana left as-is. The path with the fewest kana left
+        as-is wins, then the one with the fewest pieces, i.e. the longest
+        matches. Each position costs one prefix query, so the split is
+        linear in len(text) times the (small) number of prefixes.
+        文字位置上のDP: 位置iからのエッジはcommon_prefix_search(text[i:])の
+        読み（min_length以上）と、そのまま残すかな1文字。そのまま残るかなが
+        最も少ないパス、次に分割数が最も少ない（最長一致の）パスを選ぶ。
+
+        Args:
+            text: The yomi to split. / 分割する読み。
+            min_length: Shortest reading used as a piece. / 使う読みの最短長。
+
+        Returns:
+            list: [(piece, is_reading), ...] concatenating to text; adjacent
+                  leftover kana are merged into one piece.
+                  textに連結される[(断片, 読みかどうか), ...]。隣接する
+                  残りのかなは1つの断片にまとめられる。
+        """
+        n = len(text)
+        # best[i] = ((leftover kana, pieces), previous position, is_reading)
+        best = [None] * (n + 1)
+        best[0] = ((0, 0), None, False)
+        for i in range(n):
+            if best[i] is None:
+                continue
+            (leftover, pieces), _, _ = best[i]
+            edges = [(i + 1, (leftover + 1, pieces + 1), False)]
+            for reading in self.common_prefix_search(text[i:]):
+                if len(reading) >= min_length:
+                    edges.append((i + len(reading), (leftover, pieces + 1), True))
+            for j, cost, is_reading in edges:
+                if best[j] is None or cost < best[j][0]:
+                    best[j] = (cost, i, is_reading)
+
+        pieces = []
+        j = n
+        while j > 0:
+            _, i, is_reading = best[j]
+            if not is_reading and pieces and not pieces[-1][1]:
+                pieces[-1] = (text[i:j] + pieces[-1][0], False)
+            else:
+                pieces.append((text[i:j], is_reading))
+            j = i
+        pieces.reverse()
+        return pieces
+
+    def lookup(self, reading):
+        """
+        Look up the merged candidates of a reading across all dictionary layers.
+        全辞書レイヤーにわたって読みのマージ済み候補を検索。
+
+        A single dict get for readings of the JSON layers (pre-merged in
+        sorted_index) and for readings found in a single compiled layer
+        (stored sorted by count). No copy, no sort, no lock.
+        JSONレイヤーの読み（sorted_indexでマージ済み）と単一のコンパイル済み
+        レイヤーにある読み（カウント順に格納済み）は1回の取得のみ。コピー、
+        ソート、ロックなし。
+
+        Args:
+            reading: The reading to look up. / 検索する読み。
+
+        Returns:
+            tuple or None: ((surface, count), ...) sorted by count (descending),
+                           or None if no layer has the reading. Shared and
+                           immutable: callers must not modify it.
+                           カウント降順の((表層形, カウント), ...)、
+                           どのレイヤーにもなければNone。共有された不変値。
+        """
+        found = self.sorted_index.get(reading)
+        if found is not None:
+            return found
+
+        sources = []
+        for layer in self.compiled_layers:
+            hit = layer.lookup(reading)
+            if hit:
+                sources.append(hit)
+        if not sources:
+            return None
+        if len(sources) == 1:
+            # Single compiled layer: already sorted at compile time
+            return sources[0]
+
+        # Several compiled layers (no merged snapshot yet): merge once
+        found = self._compiled_memo.get(reading)
+        if found is None:
+            found = self._merge_sorted(reading)
+            self._compiled_memo[reading] = found
+        return found
+
+
+class BunsetsuPredictions:
+    """
+    Multi-bunsetsu predictions of one reading, produced on demand.
+    1つの読みの複数文節予測（要求時に生成）。
+
+    Most conversions only ever show prediction #1, so further predictions
+    are pulled from the source (a lazy CRF path stream, see
+    util.CRFPathStream) only when cycle_bunsetsu_prediction() reaches them.
+    Single-bunsetsu paths are skipped (they equal a whole-word lookup); up to
+    `limit` multi-bunsetsu predictions are produced, drawing at most
+    BUNSETSU_MAX_DRAWS_PER_PREDICTION paths per prediction from the source.
+    ほとんどの変換は予測#1しか表示しないため、以降の予測は
+    cycle_bunsetsu_prediction()が到達した時にのみソース（遅延CRFパス
+    ストリーム、util.CRFPathStream参照）から取り出す。単一文節のパス（全語
+    検索と同じ）は飛ばし、複数文節の予測を最大`limit`件生成する。ソースから
+    取り出すのは予測1件あたり最大BUNSETSU_MAX_DRAWS_PER_PREDICTION件。
+
+    Shared by a cached ConversionResult and the session that installed it,
+    hence the lock. / キャッシュと変換セッションで共有されるためロックを持つ。
+    """
+
+    __slots__ = ('_items', '_source', '_limit', '_draws_left', '_lock')
+
+    def __init__(self, source=(), limit=None):
+        """
+        Args:
+            source: Iterable of (bunsetsu_list, score), best first.
+                    (bunsetsu_list, score)のイテラブル（最良が先頭）。
+            limit: Maximum number of predictions produced.
+                   生成する予測の最大数。
+        """
+        self._items = []
+        self._source = iter(source)
+        self._limit = limit
+        self._draws_left = None if limit is None else limit * BUNSETSU_MAX_DRAWS_PER_PREDICTION
+        self._lock = threading.Lock()
+
+    def get(self, index):
+        """
+        Return prediction `index` as (bunsetsu_list, score), or None.
+        予測`index`を(bunsetsu_list, score)で返す。なければNone。
+        """
+        with self._lock:
+            while len(self._items) <= index and self._source is not None:
+                if self._limit is not None and (len(self._items) >= self._limit
+                                                or self._draws_left <= 0):
+                    self._source = None
+                    break
+                prediction = next(self._source, None)
+                if prediction is None:
+                    self._source = None
+                    break
+                if self._draws_left is not None:
+                    self._draws_left -= 1
+                if len(prediction[0]) >= 2:
+                    self._items.append(prediction)
+            return self._items[index] if index < len(self._items) else None
+
+    def __bool__(self):
+        return self.get(0) is not None
+
+    @property
+    def produced(self):
+        """Number of predictions produced so far. / これまでに生成した予測数。"""
+        return len(self._items)
+
+
+class ConversionResult:
+    """
+    Outcome of HenkanProcessor.compute_conversion() for one reading.
+    1つの読みに対するHenkanProcessor.compute_conversion()の結果。
+
+    Computing a conversion (dictionary lookup, CRF N-best, per-bunsetsu
+    lookups) touches no conversion session state, so it can run ahead of
+    time on a worker thread. apply_conversion() later installs the result
+    as the current conversion in O(1).
+    変換の計算（辞書検索、CRF N-best、文節ごとの検索）は変換セッションの
+    状態に触れないため、ワーカースレッドで先行して実行できる。
+    apply_conversion()が後でO(1)で現在の変換として設定する。
+
+    Attributes:
+        reading: The converted reading / 変換した読み
+        tag: (base generation number, CRF model, ...) the result was
+             computed with; None when computed before the dictionaries
+             were ready
+             計算に使った(基準世代番号, CRFモデル, ...)。辞書の準備前ならNone
+        candidates: Candidate dicts, as returned by convert()
+                    convert()が返す候補辞書のリスト
+        has_whole_word_match: True if the whole reading is in the dictionary
+                              読み全体が辞書にある場合True
+        bunsetsu_predictions: BunsetsuPredictions, or None if not computed
+                              (whole-word match)
+                              BunsetsuPredictions。未計算（全語マッチ）ならNone
+        bunsetsu_surfaces: Best surface of each bunsetsu of prediction #1
+                           (the candidate lists are looked up on navigation)
+                           予測#1の各文節の最良の表層形（候補リストは
+                           ナビゲーション時に検索）
+        learn_serial: HenkanProcessor._learn_serial when the computation
+                      started / 計算開始時のHenkanProcessor._learn_serial
+    """
+
+    __slots__ = ('reading', 'tag', 'candidates', 'has_whole_word_match',
+                 'bunsetsu_predictions', 'bunsetsu_surfaces', 'learn_serial')
+
+    def __init__(self, reading, tag, candidates, has_whole_word_match=False,
+                 bunsetsu_predictions=None, bunsetsu_surfaces=(), learn_serial=None):
+        self.reading = reading
+        self.tag = tag
+        self.candidates = candidates
+        self.has_whole_word_match = has_whole_word_match
+        self.bunsetsu_predictions = bunsetsu_predictions
+        self.bunsetsu_surfaces = bunsetsu_surfaces
+        self.learn_serial = learn_serial
+
+    @property
+    def is_bunsetsu(self):
+        """True if the result enters bunsetsu mode / 文節モードになる場合True"""
+        return bool(self.bunsetsu_surfaces)
+
 
 class HenkanProcessor:
     """
@@ -283,7 +921,7 @@ class HenkanProcessor:
     プロセッサは現在の変換の状態を維持:
 
     WHOLE-WORD MODE STATE / 全語モード状態:
-        _candidates          : List of candidate dicts
+        _candidates          : List of Candidate
                                候補辞書のリスト
         _selected_index      : Currently selected candidate index
                                現在選択されている候補のインデックス
@@ -295,6 +933,8 @@ class HenkanProcessor:
                                N-best CRF予測
         _bunsetsu_candidates : Per-bunsetsu candidate lists
                                文節ごとの候補リスト
+        _bunsetsu_surfaces   : Per-bunsetsu best surfaces
+                               文節ごとの最良の表層形
         _bunsetsu_selected_indices: Per-bunsetsu selected indices
                                     文節ごとの選択インデックス
         _selected_bunsetsu_index: Which bunsetsu is being edited
@@ -314,8 +954,12 @@ class HenkanProcessor:
           is_ready()を使用して読み込みが完了したかチェック
         - Before ready, convert() returns passthrough (input as-is)
           準備完了前、convert()はパススルー（入力をそのまま）を返す
-        - _lock protects dictionary access during loading
-          _lockは読み込み中の辞書アクセスを保護
+        - Dictionary data is an immutable DictionaryGeneration; lookups
+          read self._generation once and take no lock
+          辞書データは不変のDictionaryGeneration。検索はself._generationを
+          一度読むだけでロックを取らない
+        - _lock only serializes generation numbering and swaps
+          _lockは世代番号の採番と差し替えの直列化のみに使用
 
     ============================================================================
     """
@@ -344,21 +988,68 @@ class HenkanProcessor:
                               ファイルは順番に読み込まれる; 後のファイルは
                               新しいエントリを追加したり既存のカウントを増加できる。
         """
-        # ─── Thread Safety ───
-        # Lock for thread-safe access to _dictionary during background loading
+        # ─── Dictionary Generation ───
+        # All dictionary data lives in an immutable DictionaryGeneration.
+        # A reload builds the next generation and swaps it in with a single
+        # assignment, so lookups read self._generation without a lock.
+        self._generation = DictionaryGeneration()
+        self._generation_counter = 0   # Last generation number handed out
+        self._building_number = None   # Number of the generation being built, if any
+        # (dictionary_files, source_stats) of the newest requested generation
+        self._requested_sources = ((), {})
+        # Lock serializes generation numbering and swaps, and guards the
+        # learning state below (never taken by lookups)
         self._lock = threading.Lock()
-        self._ready = False  # Set to True when background loading completes
+        self._ready = False  # Set to True when the first generation is installed
 
-        # Merged dictionary: {reading: {candidate: {"POS": str, "cost": float}}}
-        self._dictionary = {}
+        self._crf_source_stats = (_stat_key(util.get_crf_model_path()),
+                                  _stat_key(util.get_crf_feature_materials_path()))
         self._candidates = []    # Current conversion candidates (whole-word mode)
         self._selected_index = 0 # Currently selected candidate index (whole-word mode)
-        self._dictionary_count = 0  # Number of successfully loaded dictionaries
 
         # CRF tagger for bunsetsu prediction (lazy loaded)
         self._tagger = None
-        # Pre-computed dictionary features for CRF (loaded in background)
-        self._crf_feature_materials = {}
+        # Weights of _tagger compiled once into a util.CRFModel, reused by
+        # every prediction (including cycle_bunsetsu_prediction)
+        self._crf_model = None
+        # Incremental CRF lattice for the growing yomi (util.CRFLattice),
+        # guarded by its own lock because it is mutated by every prediction
+        self._crf_lattice = None
+        self._crf_lattice_lock = threading.Lock()
+        # Bumped by _refresh_crf_sources() when the model file changes; the
+        # three fields above are dropped by the next _get_crf_lattice(), under
+        # the lock, once _crf_loaded_epoch falls behind
+        self._crf_epoch = 0
+        self._crf_loaded_epoch = 0
+        # Segment with the dictionary word lattice instead of CRF N-best
+        # paths (see LATTICE CONVERSION above); set by the engine's config
+        self._lattice_conversion = False
+        # Hard cap on the bunsetsu predictions of one conversion
+        # (bunsetsu_prediction_n_best); set by the engine's config
+        self._bunsetsu_n_best = BUNSETSU_N_BEST
+
+        # ─── Learning ───
+        # Learned user-layer counts not yet written to user_dictionary.json,
+        # {(reading, surface): count}; overlaid on every user dictionary that
+        # is (re)loaded meanwhile. Written behind by _write_learning().
+        self._learning_enabled = True
+        self._learned = {}
+        self._learning_timer = None         # threading.Timer of the next flush
+        self._learning_write_lock = threading.Lock()  # One writer at a time
+
+        # ─── Conversion Cache ───
+        # LRU of reading → ConversionResult (sorted candidates + filtered
+        # N-best predictions). Entries carry the tag they were computed with
+        # and are ignored once a new base generation or CRF model is
+        # installed. Learning keeps the base generation and instead evicts
+        # the entries whose reading contains a learned reading; results
+        # computed while a learning generation was installed
+        # (_learn_serial moved on) are not cached.
+        self._conversion_cache = OrderedDict()
+        self._conversion_cache_lock = threading.Lock()
+        self._learn_serial = 0
+        self._conversion_cache_hits = 0
+        self._conversion_cache_misses = 0
 
         # ─── Bunsetsu Mode State ───
         # Bunsetsu mode allows multi-bunsetsu conversion when:
@@ -370,51 +1061,145 @@ class HenkanProcessor:
 
         # N-best bunsetsu predictions (filtered to multi-bunsetsu only)
         # Each entry: (bunsetsu_list, score) where bunsetsu_list is [(text, label), ...]
-        self._bunsetsu_predictions = []
+        self._bunsetsu_predictions = None
         self._bunsetsu_prediction_index = 0  # Current N-best index
 
         # Per-bunsetsu candidate state (for the current bunsetsu prediction)
-        # _bunsetsu_candidates[i] = list of candidate dicts for bunsetsu i
+        # _bunsetsu_list = [(text, label), ...] of the current prediction
+        # _bunsetsu_candidates[i] = list of Candidate for bunsetsu i, or None
+        #                           until it is navigated to
+        #                           (see _bunsetsu_candidates_at)
+        # _bunsetsu_surfaces[i] = best surface of bunsetsu i, or None until
+        #                         it is displayed (see _bunsetsu_surface_at)
         # _bunsetsu_selected_indices[i] = selected candidate index for bunsetsu i
+        self._bunsetsu_list = []
         self._bunsetsu_candidates = []
+        self._bunsetsu_surfaces = []
         self._bunsetsu_selected_indices = []
         self._selected_bunsetsu_index = 0  # Which bunsetsu is selected for navigation
+        # Candidate lists looked up during this conversion, keyed by
+        # (text, is_lookup, generation number): N-best predictions mostly
+        # share bunsetsu, so cycling only looks up the new ones
+        self._bunsetsu_candidate_memo = {}
 
         # Start background loading thread
+        dictionary_files = list(dictionary_files or [])
         if dictionary_files:
-            self._dictionary_files = dictionary_files
-            thread = threading.Thread(target=self._background_load, daemon=True)
-            thread.start()
+            self._start_build(dictionary_files)
         else:
-            self._dictionary_files = []
             self._ready = True  # No files to load, immediately ready
 
-    def _background_load(self):
+    def _next_generation_number(self):
+        """Hand out the next generation number. Caller must hold _lock."""
+        self._generation_counter += 1
+        return self._generation_counter
+
+    def _start_build(self, dictionary_files):
         """
-        Background thread: load dictionaries and CRF feature materials.
+        Start building the next generation from dictionary_files off-thread.
+        dictionary_filesから次の世代をバックグラウンドで構築開始。
+
+        Conversions keep using the current generation until the new one is
+        swapped in by _install_generation().
+        新しい世代が_install_generation()で差し替えられるまで、変換は
+        現在の世代を使い続ける。
+        """
+        # Stat before reading, so that a write during loading is seen as a change
+        stats = {path: _source_stat(path) for path in dictionary_files}
+        with self._lock:
+            number = self._next_generation_number()
+            self._building_number = number
+            self._requested_sources = (tuple(dictionary_files), stats)
+        thread = threading.Thread(target=self._background_load,
+                                  args=(number, tuple(dictionary_files), stats),
+                                  daemon=True)
+        thread.start()
+
+    def _background_load(self, number, dictionary_files, source_stats):
+        """
+        Background thread: build generation `number` and swap it in.
 
         This runs in a separate thread to avoid blocking the main UI thread.
-        Sets _ready = True when complete.
+        Sets _ready = True when the generation is installed (or loading failed).
         """
+        generation = None
+        fingerprints = None
+        base_files, user_files = self._split_dictionary_files(dictionary_files)
         try:
             # Load CRF feature materials (reads JSON file)
             materials = util.load_crf_feature_materials()
 
-            # Load dictionaries (reads multiple JSON files)
-            self._load_dictionaries(self._dictionary_files)
+            layers = []
+            dictionary = {}
+            user_dictionary = {}
+            dictionary_count = 0
 
-            # Atomic assignment of materials after dictionaries are loaded
-            with self._lock:
-                self._crf_feature_materials = materials
-                self._ready = True
+            # Base dictionaries: a single mmap when the snapshot is current
+            snapshot = self._load_snapshot(base_files)
+            if snapshot is not None:
+                layers.append(snapshot)
+                dictionary_count += len(base_files)
+            else:
+                # Fingerprint BEFORE reading, so edits during the merge are caught
+                fingerprints = [compiled_dictionary.content_fingerprint(path)
+                                for path in base_files]
+                dictionary_count += self._load_dictionaries(base_files, dictionary, layers)
+
+            # User dictionary: small in-memory overlay
+            dictionary_count += self._load_user_dictionaries(user_files, user_dictionary)
+
+            generation = DictionaryGeneration(
+                number=number,
+                compiled_layers=tuple(layers),
+                dictionary=dictionary,
+                user_dictionary=user_dictionary,
+                crf_feature_materials=materials,
+                dictionary_files=dictionary_files,
+                source_stats=source_stats,
+                dictionary_count=dictionary_count,
+            )
+            self._log_load_summary(generation)
+            self._install_generation(generation)
 
             logger.info('HenkanProcessor background loading complete')
 
         except Exception as e:
             logger.error(f'HenkanProcessor background loading failed: {e}')
             # Mark as ready anyway so we don't block forever
+            self._ready = True
+        finally:
             with self._lock:
-                self._ready = True
+                if self._building_number == number:
+                    self._building_number = None
+
+        # Conversions are already served; refresh the snapshot for next time
+        if generation is not None and base_files and fingerprints is not None:
+            try:
+                self._rebuild_snapshot(generation, fingerprints)
+            except Exception as e:
+                logger.error(f'Failed to rebuild dictionary snapshot: {e}')
+
+    def _install_generation(self, generation):
+        """
+        Atomically make `generation` current, unless a newer one already is.
+        より新しい世代が既に有効でなければ、`generation`を原子的に有効にする。
+
+        Returns:
+            bool: True if the generation was installed.
+        """
+        with self._lock:
+            if generation.number <= self._generation.number:
+                logger.debug(f'Discarding stale dictionary generation {generation.number}')
+                return False
+            if self._learned:
+                # Selections learned while it was being built
+                generation = generation.replace(
+                    generation.number, base_number=generation.base_number,
+                    user_dictionary=self._overlay_learned(generation.user_dictionary))
+            self._generation = generation
+            self._ready = True
+        logger.debug(f'Dictionary generation {generation.number} installed')
+        return True
 
     def is_ready(self):
         """
@@ -423,32 +1208,234 @@ class HenkanProcessor:
         Returns:
             bool: True if dictionaries are loaded and ready for conversion
         """
+        return self._ready
+
+    @staticmethod
+    def _split_dictionary_files(dictionary_files):
+        """Split dictionary paths into (base_files, user_files), keeping order."""
+        base_files = [path for path in dictionary_files
+                      if os.path.basename(path) != USER_DICTIONARY_FILENAME]
+        user_files = [path for path in dictionary_files
+                      if os.path.basename(path) == USER_DICTIONARY_FILENAME]
+        return base_files, user_files
+
+    def reload_dictionaries(self, dictionary_files):
+        """
+        Pick up changed dictionary files without blocking conversions.
+        変換をブロックせずに変更された辞書ファイルを反映する。
+
+        Every source is stat()ed and compared with the (size, mtime) recorded
+        for the newest generation:
+        各ソースをstat()し、最新の世代に記録した(サイズ, mtime)と比較する:
+
+            ┌───────────────────────────────────────────────────────────────┐
+            │  Nothing changed           → nothing to do                    │
+            │  変更なし                   → 何もしない                       │
+            │  Only user_dictionary.json → next generation with the new     │
+            │                              overlay, sharing the base layers │
+            │  user_dictionary.jsonのみ   → 新しいオーバーレイを持つ次世代   │
+            │                              （基本レイヤーは共有）            │
+            │  Base dictionaries changed → next generation built off-thread │
+            │  基本辞書が変更             → 次世代をバックグラウンドで構築    │
+            └───────────────────────────────────────────────────────────────┘
+
+        In every case conversions keep using the current generation until
+        the next one is swapped in, so there is no passthrough window.
+        いずれの場合も次世代が差し替えられるまで変換は現在の世代を使い続ける
+        ため、パススルーになる期間はない。
+
+        A retrained CRF model or regenerated feature materials are picked up
+        as well (the tagger is lazily re-opened on the next prediction).
+        再訓練されたCRFモデルや再生成された特徴量素材も反映される
+        （タガーは次の予測時に遅延的に再オープンされる）。
+
+        Args:
+            dictionary_files: Current list from util.get_dictionary_files().
+                              util.get_dictionary_files()の現在のリスト。
+
+        Returns:
+            bool: True if a new generation was installed or is being built,
+                  False if everything was already up to date.
+                  新しい世代が有効化または構築中ならTrue、既に最新ならFalse。
+        """
+        self._refresh_crf_sources()
+
+        dictionary_files = tuple(dictionary_files)
+        stats = {path: _source_stat(path) for path in dictionary_files}
+        with self._lock:
+            requested_files, requested_stats = self._requested_sources
+            building = self._building_number is not None
+
+        if dictionary_files == requested_files and stats == requested_stats:
+            logger.debug('Dictionaries unchanged - nothing to reload')
+            return False
+
+        base_files, user_files = self._split_dictionary_files(dictionary_files)
+        requested_base, requested_user = self._split_dictionary_files(requested_files)
+        base_changed = (base_files != requested_base
+                        or any(stats[path] != requested_stats.get(path) for path in base_files))
+        if base_changed or building or not self._ready:
+            logger.info('Dictionaries changed - building next generation in background')
+            self._start_build(dictionary_files)
+            return True
+
+        # Only the user dictionary changed: re-read just that small file
+        user_dictionary = {}
+        loaded = self._load_user_dictionaries(user_files, user_dictionary)
         with self._lock:
-            return self._ready
+            current = self._generation
+            changed = sum(1 for reading in current.user_dictionary.keys() | user_dictionary.keys()
+                          if current.user_dictionary.get(reading) != user_dictionary.get(reading))
+            self._generation = current.replace(
+                self._next_generation_number(),
+                user_dictionary=self._overlay_learned(user_dictionary),
+                dictionary_files=dictionary_files,
+                source_stats=stats,
+                dictionary_count=current.dictionary_count - len(requested_user) + loaded,
+            )
+            self._requested_sources = (dictionary_files, stats)
+
+        logger.info(f'Applied user dictionary delta: {changed} reading(s) changed')
+        return True
+
+    def _refresh_crf_sources(self):
+        """Drop the CRF tagger / reload feature materials if their files changed."""
+        model_stat = _stat_key(util.get_crf_model_path())
+        materials_stat = _stat_key(util.get_crf_feature_materials_path())
+        old_model_stat, old_materials_stat = self._crf_source_stats
+        if model_stat == old_model_stat and materials_stat == old_materials_stat:
+            return
+
+        if model_stat != old_model_stat:
+            logger.info('CRF model changed - tagger will be reloaded')
+            # Worker threads may be reading the model; they drop it themselves
+            self._crf_epoch += 1
+        if materials_stat != old_materials_stat:
+            materials = util.load_crf_feature_materials()
+            with self._lock:
+                self._generation = self._generation.replace(
+                    self._next_generation_number(), crf_feature_materials=materials)
+        self._crf_source_stats = (model_stat, materials_stat)
 
-    def _load_dictionaries(self, dictionary_files):
+    def _load_snapshot(self, base_files):
+        """
+        Map the merged dictionary snapshot if it matches the base files.
+        ベースファイルに一致する場合、マージ済み辞書スナップショットをマップ。
+
+        Args:
+            base_files: Base dictionary paths, in load order.
+                        読み込み順のベース辞書パス。
+
+        Returns:
+            CompiledDictionary or None: None if the base files have to be
+                                        loaded individually.
+        """
+        if not base_files:
+            return None
+
+        snapshot = compiled_dictionary.open_snapshot(util.get_dictionary_snapshot_path(),
+                                                     base_files)
+        if snapshot is not None:
+            logger.info(f'Mapped merged dictionary snapshot: {snapshot.path} '
+                        f'({len(snapshot)} readings)')
+        return snapshot
+
+    def _rebuild_snapshot(self, generation, fingerprints):
+        """
+        Merge a generation's base layers into a new snapshot and swap it in.
+        世代の基本レイヤーを新しいスナップショットにマージして差し替える。
+
+        Runs in the background thread after loading has completed. The merged
+        result is the same as the one DictionaryGeneration.lookup computes on
+        the fly (max count per surface), so the swapped-in generation keeps
+        its number and the swap is invisible to conversions.
+        読み込み完了後にバックグラウンドスレッドで実行される。マージ結果は
+        DictionaryGeneration.lookupがその場で計算するもの（表層形ごとの最大
+        カウント）と同じなので、差し替え後も世代番号は変わらず、変換からは
+        見えない。
+
+        Args:
+            generation: The generation whose base layers were just loaded.
+                        基本レイヤーを読み込んだばかりの世代。
+            fingerprints: content_fingerprint() of each base file, taken
+                          before the files were read.
+                          ファイルを読む前に取得した各ベースファイルの
+                          content_fingerprint()。
+        """
+        merged = {}
+        sources = [layer.items() for layer in generation.compiled_layers]
+        sources.append(generation.dictionary.items())
+        for source in sources:
+            for reading, candidates in source:
+                target = merged.setdefault(reading, {})
+                for surface, count in candidates.items():
+                    existing = target.get(surface)
+                    if existing is None or count > existing:
+                        target[surface] = count
+
+        snapshot_path = util.get_dictionary_snapshot_path()
+        if not compiled_dictionary.write_snapshot(merged, snapshot_path, fingerprints):
+            return
+        del merged
+
+        snapshot = compiled_dictionary.CompiledDictionary(snapshot_path)
+        # Old layers are not closed: a lookup may still hold a reference
+        with self._lock:
+            current = self._generation
+            # A user-dictionary delta may have been applied meanwhile; it
+            # shares the same base layers and can take the snapshot as well
+            if (current.compiled_layers is generation.compiled_layers
+                    and current.dictionary is generation.dictionary):
+                self._generation = current.replace(
+                    current.number, compiled_layers=(snapshot,), dictionary={})
+                swapped = True
+            else:
+                swapped = False
+        if swapped:
+            logger.info(f'Swapped in rebuilt dictionary snapshot: {snapshot_path}')
+
+    def _load_dictionaries(self, dictionary_files, target, layers=None):
         """
         Load and merge multiple dictionary files.
 
         Each dictionary file is a JSON object mapping readings to candidates:
-            {"reading": {"candidate1": {"POS": "品詞", "cost": cost1}, ...}}
+            {"reading": {"candidate1": count1, ...}}
 
-        When merging, the entry with lower cost is kept for duplicate candidates.
+        Files with a fresh compiled counterpart are memory-mapped instead of
+        parsed when `layers` is given, and merged lazily at lookup time (see
+        DictionaryGeneration.lookup).
+        When merging, the entry with higher count is kept for duplicate candidates.
         If no files exist or all fail to load, the dictionary remains empty
         and conversions will fall back to passthrough mode.
 
         Args:
             dictionary_files: List of paths to dictionary JSON files (may be empty)
+            target: Dict to merge JSON content into
+            layers: List to append memory-mapped compiled layers to, or None
+                    to always parse the JSON
+
+        Returns:
+            int: Number of dictionary files successfully loaded
         """
+        loaded = 0
         if not dictionary_files:
-            logger.info('No dictionary files provided - conversion will use passthrough mode')
-            return
+            return loaded
 
         for file_path in dictionary_files:
             if not os.path.exists(file_path):
                 logger.warning(f'Dictionary file not found: {file_path}')
                 continue
 
+            compiled = None
+            if layers is not None:
+                compiled = compiled_dictionary.open_compiled_for(file_path)
+            if compiled is not None:
+                layers.append(compiled)
+                loaded += 1
+                logger.info(f'Mapped compiled dictionary: {compiled.path} '
+                            f'({compiled.candidate_count} candidate entries)')
+                continue
+
             try:
                 with open(file_path, 'rb') as f:
                     data = orjson.loads(f.read())
@@ -457,35 +1444,8 @@ class HenkanProcessor:
                     logger.warning(f'Invalid dictionary format (expected dict): {file_path}')
                     continue
 
-                # Merge into main dictionary
-                entries_added = 0
-                for reading, candidates in data.items():
-                    if not isinstance(candidates, dict):
-                        continue
-
-                    if reading not in self._dictionary:
-                        self._dictionary[reading] = {}
-
-                    for candidate, entry in candidates.items():
-                        # Entry format: count (int) - higher count = better candidate
-                        # For legacy format {"POS": ..., "cost": ...}, convert to count
-                        if isinstance(entry, dict):
-                            # Legacy format - convert cost to count (negate so lower cost = higher count)
-                            count = -entry.get("cost", 0)
-                        else:
-                            # New format - entry is the count directly
-                            count = entry if isinstance(entry, (int, float)) else 1
-
-                        if candidate in self._dictionary[reading]:
-                            # Keep entry with higher count (better candidate)
-                            existing_count = self._dictionary[reading][candidate]
-                            if count > existing_count:
-                                self._dictionary[reading][candidate] = count
-                        else:
-                            self._dictionary[reading][candidate] = count
-                        entries_added += 1
-
-                self._dictionary_count += 1
+                entries_added = self._merge_dictionary(data, target)
+                loaded += 1
                 logger.info(f'Loaded dictionary: {file_path} ({entries_added} candidate entries)')
 
             except orjson.JSONDecodeError as e:
@@ -493,12 +1453,82 @@ class HenkanProcessor:
             except Exception as e:
                 logger.error(f'Failed to load dictionary: {file_path} - {e}')
 
-        # Summary logging with appropriate level
-        if self._dictionary_count == 0:
+        return loaded
+
+    @staticmethod
+    def _merge_dictionary(data, target):
+        """
+        Merge the entries of one parsed dictionary file into target.
+        解析済みの辞書ファイル1つのエントリをtargetにマージする。
+
+        When merging, the entry with higher count is kept for duplicate candidates.
+
+        Returns:
+            int: Number of candidate entries merged
+        """
+        entries_added = 0
+        for reading, candidates in data.items():
+            if not isinstance(candidates, dict):
+                continue
+
+            if reading not in target:
+                target[reading] = {}
+
+            for candidate, entry in candidates.items():
+                # Entry format: count (int) - higher count = better candidate
+                # For legacy format {"POS": ..., "cost": ...}, convert to count
+                if isinstance(entry, dict):
+                    # Legacy format - convert cost to count (negate so lower cost = higher count)
+                    count = -entry.get("cost", 0)
+                else:
+                    # New format - entry is the count directly
+                    count = entry if isinstance(entry, (int, float)) else 1
+
+                if candidate in target[reading]:
+                    # Keep entry with higher count (better candidate)
+                    existing_count = target[reading][candidate]
+                    if count > existing_count:
+                        target[reading][candidate] = count
+                else:
+                    target[reading][candidate] = count
+                entries_added += 1
+        return entries_added
+
+    def _load_user_dictionaries(self, user_files, target):
+        """
+        _load_dictionaries() for user_dictionary.json, replaying its journal.
+        user_dictionary.json用の_load_dictionaries()（ジャーナルを再生する）。
+
+        dictionary_journal.load() reads the snapshot and the journal in one
+        step, so a compaction on another thread cannot come in between.
+        dictionary_journal.load()がスナップショットとジャーナルを一度に読む
+        ため、別スレッドの圧縮が間に入ることはない。
+        """
+        loaded = 0
+        for path in user_files:
+            if not os.path.exists(path):
+                logger.warning(f'Dictionary file not found: {path}')
+                continue
+            try:
+                data = dictionary_journal.load(path)
+            except (OSError, ValueError) as e:
+                logger.error(f'Failed to load dictionary: {path} - {e}')
+                continue
+            entries_added = self._merge_dictionary(data, target)
+            loaded += 1
+            logger.info(f'Loaded dictionary: {path} ({entries_added} candidate entries)')
+        return loaded
+
+    def _log_load_summary(self, generation):
+        """Summary logging with appropriate level after all layers are loaded."""
+        if generation.dictionary_count == 0:
             logger.warning('No dictionaries loaded - conversion will use passthrough mode')
         else:
-            logger.info(f'HenkanProcessor initialized with {self._dictionary_count} dictionaries, '
-                       f'{len(self._dictionary)} readings')
+            logger.info(f'HenkanProcessor generation {generation.number}: '
+                       f'{generation.dictionary_count} dictionaries, '
+                       f'{len(generation.dictionary)} JSON readings, '
+                       f'{len(generation.user_dictionary)} user readings, '
+                       f'{len(generation.compiled_layers)} compiled layers')
 
     def convert(self, reading):
         """
@@ -531,106 +1561,253 @@ class HenkanProcessor:
                      変換するかな文字列（例: "へんかん"）。
 
         Returns:
-            list: List of conversion candidates, each being a dict with:
-                  変換候補のリスト、各々は以下を持つ辞書:
-                  - 'surface': The converted text (e.g., "変換")
-                               変換されたテキスト（例: "変換"）
-                  - 'reading': The original reading (e.g., "へんかん")
-                               元の読み（例: "へんかん"）
-                  - 'count': Conversion priority (higher is better)
-                             変換優先度（高いほど良い）
+            list: List of conversion candidates, each being a Candidate with:
+                  変換候補のリスト、各々は以下を持つCandidate:
+                  - surface: The converted text (e.g., "変換")
+                             変換されたテキスト（例: "変換"）
+                  - reading: The original reading (e.g., "へんかん")
+                             元の読み（例: "へんかん"）
+                  - count: Conversion priority (higher is better)
+                           変換優先度（高いほど良い）
 
                   In bunsetsu mode, the candidates list contains a single entry
                   with the combined surface from all bunsetsu.
                   文節モードでは、候補リストには全文節からの結合サーフェスを
                   持つ単一のエントリが含まれる。
         """
-        # Reset state
-        self._candidates = []
-        self._selected_index = 0
-        self._current_yomi = reading
-        self._bunsetsu_mode = False
-        self._bunsetsu_predictions = []
-        self._bunsetsu_candidates = []
-        self._bunsetsu_selected_indices = []
-        self._selected_bunsetsu_index = 0
+        return self.apply_conversion(self.compute_conversion(reading))
+
+    @latency.timed('henkan.conversion')
+    def compute_conversion(self, reading):
+        """
+        Compute the conversion of a reading without touching session state.
+        セッション状態に触れずに読みの変換を計算。
+
+        This is the expensive half of convert(): the whole-word lookup and,
+        on a miss, the CRF N-best prediction plus the dictionary lookups of
+        every bunsetsu of prediction #1. It reads the current generation once
+        and takes only the CRF lattice lock, so it is safe to call from a
+        worker thread while the main thread keeps handling keys.
+        convert()の重い部分: 全語検索と、ミス時のCRF N-best予測および
+        予測#1の各文節の辞書検索。現在の世代を一度読み、CRFラティスの
+        ロックのみを取るため、メインスレッドがキー処理を続ける間に
+        ワーカースレッドから呼び出しても安全。
+
+        Args:
+            reading: The kana string to convert. / 変換するかな文字列。
 
+        Returns:
+            ConversionResult: To be installed with apply_conversion().
+                              apply_conversion()で設定する結果。
+        """
         # Check if background loading is complete
         if not self.is_ready():
             # Not ready yet - return passthrough
             logger.debug(f'HenkanProcessor.convert("{reading}") → not ready, passthrough')
-            self._candidates.append({
-                'surface': reading,
-                'reading': reading,
-                'cost': 0,
-                'passthrough': True
-            })
-            return self._candidates
-
-        # Lock protects dictionary access (though is_ready() already ensures loading is complete)
-        with self._lock:
-            has_match = reading in self._dictionary
-            candidates_dict = self._dictionary.get(reading, {}).copy() if has_match else {}
+            return ConversionResult(reading, None, [
+                Candidate(reading, reading, passthrough=True)])
+
+        # Read before the generation: _learn_pairs() installs first, then bumps it
+        learn_serial = self._learn_serial
+        generation = self._generation
+        tag = self._result_tag(generation)
+        cached = self._get_cached_conversion(reading, tag)
+        if cached is not None:
+            logger.debug(f'HenkanProcessor.convert("{reading}") → cached')
+            return cached
+
+        result = self._compute_uncached_conversion(reading, generation, tag)
+        result.learn_serial = learn_serial
+        self._put_cached_conversion(result)
+        return result
 
-        if has_match:
-            # Whole-word dictionary match found
-            self._has_whole_word_match = True
-            # Sort by count (descending) - higher count = better candidate
-            sorted_candidates = sorted(
-                candidates_dict.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )
-            for surface, count in sorted_candidates:
-                self._candidates.append({
-                    'surface': surface,
-                    'reading': reading,
-                    'count': count
-                })
-            logger.debug(f'HenkanProcessor.convert("{reading}") → {len(self._candidates)} candidates')
+    def _compute_uncached_conversion(self, reading, generation, tag):
+        """compute_conversion() body for a cache miss."""
+        if latency.enabled:
+            start = time.perf_counter_ns()
+            sorted_candidates = generation.lookup(reading)
+            latency.add('henkan.dict_lookup', time.perf_counter_ns() - start)
         else:
-            # No dictionary match - try bunsetsu-based conversion
-            self._has_whole_word_match = False
-            logger.debug(f'HenkanProcessor.convert("{reading}") → no match, trying bunsetsu mode')
-
-            # Get CRF predictions and filter to multi-bunsetsu only
-            predictions = self.predict_bunsetsu(reading)
-            self._bunsetsu_predictions = [
-                p for p in predictions if self._is_multi_bunsetsu(p[0])
-            ]
+            sorted_candidates = generation.lookup(reading)
 
-            if self._bunsetsu_predictions:
-                # Initialize bunsetsu mode with first prediction
-                self._init_bunsetsu_mode(0)
+        if sorted_candidates:
+            # Whole-word dictionary match found
+            candidates = [Candidate(surface, reading, count)
+                          for surface, count in sorted_candidates]
+            logger.debug(f'HenkanProcessor.convert("{reading}") → {len(candidates)} candidates')
+            return ConversionResult(reading, tag, candidates, has_whole_word_match=True)
+
+        # No dictionary match - try bunsetsu-based conversion
+        logger.debug(f'HenkanProcessor.convert("{reading}") → no match, trying bunsetsu mode')
+
+        # Get the best multi-bunsetsu prediction; further ones are produced
+        # only if the user cycles to them
+        bunsetsu_predictions = self._predict_segmentations(reading, generation)
+        first = bunsetsu_predictions.get(0)
+
+        if first is None:
+            # No bunsetsu predictions available - return reading as-is
+            logger.debug(f'HenkanProcessor.convert("{reading}") → no bunsetsu predictions, '
+                       f'returning reading')
+            return ConversionResult(reading, tag, [Candidate(reading, reading)],
+                                    bunsetsu_predictions=bunsetsu_predictions)
+
+        # Best surface of every bunsetsu of the first prediction; the full
+        # candidate lists wait until the user navigates to a bunsetsu
+        bunsetsu_surfaces = self._build_bunsetsu_surfaces(first[0], generation)
+
+        # A single candidate entry represents the bunsetsu result
+        # (the actual surface is constructed from per-bunsetsu selections)
+        surface = ''.join(bunsetsu_surfaces)
+        logger.debug(f'HenkanProcessor.convert("{reading}") → bunsetsu mode, '
+                   f'{len(first[0])} bunsetsu')
+        return ConversionResult(reading, tag, [Candidate(surface, reading, bunsetsu_mode=True)],
+                                bunsetsu_predictions=bunsetsu_predictions, bunsetsu_surfaces=bunsetsu_surfaces)
+
+    def apply_conversion(self, result):
+        """
+        Install a computed conversion as the current conversion session.
+        計算済みの変換を現在の変換セッションとして設定。
 
-                # Return a single candidate entry representing the bunsetsu result
-                # (the actual surface is constructed from per-bunsetsu selections)
-                self._candidates.append({
-                    'surface': self.get_display_surface(),
-                    'reading': reading,
-                    'cost': 0,
-                    'bunsetsu_mode': True
-                })
-                logger.debug(f'HenkanProcessor.convert("{reading}") → bunsetsu mode with '
-                           f'{len(self._bunsetsu_predictions)} predictions')
-            else:
-                # No bunsetsu predictions available - return reading as-is
-                self._candidates.append({
-                    'surface': reading,
-                    'reading': reading,
-                    'cost': 0
-                })
-                logger.debug(f'HenkanProcessor.convert("{reading}") → no bunsetsu predictions, '
-                           f'returning reading')
+        Args:
+            result: ConversionResult from compute_conversion().
+                    compute_conversion()のConversionResult。
+
+        Returns:
+            list: The candidates, same as convert(). / convert()と同じ候補。
+        """
+        self.reset()
+        self._current_yomi = result.reading
+        self._has_whole_word_match = result.has_whole_word_match
+        self._candidates = list(result.candidates)
+        self._bunsetsu_predictions = result.bunsetsu_predictions
+
+        if result.is_bunsetsu:
+            # Initialize bunsetsu mode with first prediction (surfaces already known)
+            self._bunsetsu_prediction_index = 0
+            self._bunsetsu_list = list(result.bunsetsu_predictions.get(0)[0])
+            self._bunsetsu_candidates = [None] * len(self._bunsetsu_list)
+            self._bunsetsu_surfaces = list(result.bunsetsu_surfaces)
+            self._bunsetsu_selected_indices = [0] * len(self._bunsetsu_list)
+            self._selected_bunsetsu_index = 0
+            self._bunsetsu_mode = True
 
         return self._candidates
 
+    def _get_cached_conversion(self, reading, tag):
+        """
+        Return the cached ConversionResult for reading if computed with tag.
+        tagで計算されたキャッシュ済みConversionResultがあれば返す。
+        """
+        with self._conversion_cache_lock:
+            result = self._conversion_cache.get(reading)
+            if result is None or result.tag != tag:
+                self._conversion_cache_misses += 1
+                return None
+            self._conversion_cache.move_to_end(reading)
+            self._conversion_cache_hits += 1
+            return result
+
+    def _put_cached_conversion(self, result):
+        """Store a ConversionResult, evicting the least recently used entries."""
+        with self._conversion_cache_lock:
+            if result.learn_serial != self._learn_serial:
+                # Selections were learned while it was computed: it may be stale
+                return
+            self._conversion_cache[result.reading] = result
+            self._conversion_cache.move_to_end(result.reading)
+            while len(self._conversion_cache) > CONVERSION_CACHE_SIZE:
+                self._conversion_cache.popitem(last=False)
+
+    def get_cache_stats(self):
+        """
+        Get conversion cache statistics.
+        変換キャッシュの統計を取得。
+
+        Returns:
+            dict: {'size', 'capacity', 'hits', 'misses'}
+        """
+        with self._conversion_cache_lock:
+            return {
+                'size': len(self._conversion_cache),
+                'capacity': CONVERSION_CACHE_SIZE,
+                'hits': self._conversion_cache_hits,
+                'misses': self._conversion_cache_misses,
+            }
+
+    def can_convert_immediately(self, reading):
+        """
+        Check whether converting a reading is cheap enough for the main loop.
+        読みの変換がメインループで実行できるほど軽量か確認。
+
+        Before the dictionaries are ready convert() is a passthrough, and a
+        cached reading or a whole-word hit is a single lookup. Only a miss
+        needs the CRF N-best prediction and per-bunsetsu lookups, which is
+        worth a worker thread.
+        辞書の準備前はパススルー、キャッシュ済みの読みや全語ヒットは1回の
+        検索で済む。ミス時のみCRF N-best予測と文節ごとの検索が必要になり、
+        ワーカースレッドに値する。
+
+        Args:
+            reading: The kana string to convert. / 変換するかな文字列。
+
+        Returns:
+            bool: True if convert() will not run the CRF.
+        """
+        if not self.is_ready():
+            return True
+        with self._conversion_cache_lock:
+            cached = self._conversion_cache.get(reading)
+        if cached is not None and cached.tag == self._result_tag():
+            return True
+        return self._generation.lookup(reading) is not None
+
+    def _result_tag(self, generation=None):
+        """
+        Identify the data a ConversionResult depends on.
+        ConversionResultが依存するデータを識別するタグ。
+
+        The base generation number is used, so that learning (which only
+        touches a few readings) does not invalidate every result.
+        学習（少数の読みにしか触れない）で全結果が無効にならないよう、
+        基準世代の番号を使う。
+        """
+        if generation is None:
+            generation = self._generation
+        return (generation.base_number, self._crf_epoch, self._crf_model,
+                self._lattice_conversion, self._bunsetsu_n_best)
+
+    def is_result_current(self, result):
+        """
+        Check that a precomputed result still matches the loaded data.
+        事前計算した結果が読み込み済みデータと一致するか確認。
+
+        A result goes stale when a new dictionary generation or CRF model
+        has been installed since it was computed, or when a reading it
+        contains has been learned since.
+        計算後に新しい辞書世代やCRFモデルが設定された場合、または含まれる
+        読みがその後学習された場合、結果は古くなる。
+
+        Args:
+            result: ConversionResult from compute_conversion().
+
+        Returns:
+            bool: True if the result can be applied as-is.
+        """
+        if result.tag is None or result.tag != self._result_tag():
+            return False
+        if result.learn_serial == self._learn_serial:
+            return True
+        # Learned since: still current if learning did not evict it
+        with self._conversion_cache_lock:
+            return self._conversion_cache.get(result.reading) is result
+
     def get_candidates(self):
         """
         Get the current list of conversion candidates.
 
         Returns:
-            list: List of candidate dictionaries
+            list: List of Candidate
         """
         return self._candidates
 
@@ -642,19 +1819,28 @@ class HenkanProcessor:
             index: The index of the candidate to select
 
         Returns:
-            dict or None: The selected candidate, or None if index is invalid
+            Candidate or None: The selected candidate, or None if index is invalid
         """
         if 0 <= index < len(self._candidates):
             self._selected_index = index
             return self._candidates[index]
         return None
 
+    def get_selected_index(self):
+        """
+        Get the index of the currently selected candidate.
+
+        Returns:
+            int: Index into get_candidates()
+        """
+        return self._selected_index
+
     def get_selected_candidate(self):
         """
         Get the currently selected candidate.
 
         Returns:
-            dict or None: The selected candidate, or None if no candidates
+            Candidate or None: The selected candidate, or None if no candidates
         """
         if self._candidates and 0 <= self._selected_index < len(self._candidates):
             return self._candidates[self._selected_index]
@@ -665,7 +1851,7 @@ class HenkanProcessor:
         Move to the next candidate in the list.
 
         Returns:
-            dict or None: The new selected candidate, or None if no candidates
+            Candidate or None: The new selected candidate, or None if no candidates
         """
         if self._candidates:
             self._selected_index = (self._selected_index + 1) % len(self._candidates)
@@ -677,7 +1863,7 @@ class HenkanProcessor:
         Move to the previous candidate in the list.
 
         Returns:
-            dict or None: The new selected candidate, or None if no candidates
+            Candidate or None: The new selected candidate, or None if no candidates
         """
         if self._candidates:
             self._selected_index = (self._selected_index - 1) % len(self._candidates)
@@ -698,11 +1884,14 @@ class HenkanProcessor:
         self._bunsetsu_mode = False
         self._current_yomi = ''
         self._has_whole_word_match = False
-        self._bunsetsu_predictions = []
+        self._bunsetsu_predictions = None
         self._bunsetsu_prediction_index = 0
+        self._bunsetsu_list = []
         self._bunsetsu_candidates = []
+        self._bunsetsu_surfaces = []
         self._bunsetsu_selected_indices = []
         self._selected_bunsetsu_index = 0
+        self._bunsetsu_candidate_memo = {}
 
     def get_dictionary_stats(self):
         """
@@ -711,23 +1900,257 @@ class HenkanProcessor:
         Returns:
             dict: Dictionary containing:
                   - 'dictionary_count': Number of loaded dictionary files
-                  - 'reading_count': Total number of unique readings
+                  - 'reading_count': Total number of readings (counted per
+                                     layer, so a reading present in several
+                                     compiled layers is counted once for each)
                   - 'candidate_count': Total number of candidate entries
+                  - 'generation': Number of the current dictionary generation
                   - 'ready': Whether background loading is complete
         """
-        with self._lock:
-            ready = self._ready
-            reading_count = len(self._dictionary)
-            candidate_count = sum(len(candidates) for candidates in self._dictionary.values())
-            dict_count = self._dictionary_count
+        generation = self._generation
+        reading_count = len(generation.dictionary) + len(generation.user_dictionary)
+        candidate_count = sum(len(c) for c in generation.dictionary.values())
+        candidate_count += sum(len(c) for c in generation.user_dictionary.values())
+        for layer in generation.compiled_layers:
+            reading_count += len(layer)
+            candidate_count += layer.candidate_count
 
         return {
-            'dictionary_count': dict_count,
+            'dictionary_count': generation.dictionary_count,
             'reading_count': reading_count,
             'candidate_count': candidate_count,
-            'ready': ready
+            'generation': generation.number,
+            'ready': self._ready
         }
 
+    # ─── Learning ─────────────────────────────────────────────────────────
+    # 学習
+
+    def set_learning(self, enabled):
+        """
+        Enable or disable learning of confirmed selections.
+        確定した選択の学習を有効/無効にする。
+
+        Disabling keeps (and still writes) what was already learned.
+        無効にしても、既に学習した内容は保持され書き込まれる。
+        """
+        self._learning_enabled = bool(enabled)
+
+    def learn(self, reading, surface):
+        """
+        Raise the count of one dictionary candidate (see LEARNING above).
+        1つの辞書候補のカウントを引き上げる（上記LEARNING参照）。
+
+        Args:
+            reading: The reading the candidate was selected for / 読み
+            surface: The selected surface / 選択された表層形
+
+        Returns:
+            bool: True if learned; False when learning is disabled, surface
+                  is not a dictionary candidate of reading or already ranks first.
+                  学習したらTrue。学習が無効、surfaceが読みの辞書候補でない、
+                  または既に先頭ならFalse。
+        """
+        return self._learn_pairs([(reading, surface)]) == 1
+
+    def learn_selection(self):
+        """
+        Learn the selected candidates of the current conversion.
+        現在の変換で選択されている候補を学習する。
+
+        Called by the engine when the conversion is committed. In bunsetsu
+        mode only the bunsetsu the user navigated are learned: a never
+        navigated one shows its top candidate, which learning would not
+        move. Passthrough bunsetsu and joined splits (not dictionary entries
+        themselves) are skipped.
+        変換の確定時にエンジンから呼ばれる。文節モードではユーザーが移動した
+        文節だけを学習する: 移動していない文節は先頭候補を表示しており、
+        学習しても順位は変わらない。パススルー文節と結合された分割（それ自体
+        は辞書エントリでない）はスキップする。
+
+        Returns:
+            int: Number of (reading, surface) pairs learned.
+                 学習した(読み, 表層形)の組の数。
+        """
+        if not self._learning_enabled:
+            return 0
+        selected = []
+        if self._bunsetsu_mode:
+            for i, candidates in enumerate(self._bunsetsu_candidates):
+                if candidates is None:
+                    continue
+                index = self._bunsetsu_selected_indices[i]
+                if 0 <= index < len(candidates):
+                    selected.append(candidates[index])
+        else:
+            candidate = self.get_selected_candidate()
+            if candidate is not None:
+                selected.append(candidate)
+        pairs = [(candidate.reading, candidate.surface)
+                 for candidate in selected if not candidate.passthrough]
+        return self._learn_pairs(pairs)
+
+    def _learn_pairs(self, pairs):
+        """
+        Learn (reading, surface) pairs, swapping in one new generation.
+        (読み, 表層形)の組を学習し、新しい世代を1つだけ差し替える。
+
+        A learned surface is raised above the reading's top count, so it
+        ranks first from the next conversion on. Pairs that already rank
+        first are skipped and never reach the journal.
+        学習した表層形は読みの先頭のカウントより上に引き上げられ、次の変換
+        から先頭に並ぶ。既に先頭の組はスキップし、ジャーナルにも書かない。
+
+        While a generation is being built, the counts are only recorded:
+        _install_generation() overlays them on the new generation, which
+        would otherwise be discarded as stale behind a learning generation.
+        世代の構築中はカウントを記録するだけ: _install_generation()が新しい
+        世代に重ねる（学習の世代の後ろでは古いとして破棄されてしまうため）。
+
+        Returns:
+            int: Number of pairs learned.
+        """
+        if not self._learning_enabled:
+            return 0
+        learned = 0
+        readings = set()
+        with self._lock:
+            current = self._generation
+            for reading, surface in pairs:
+                candidates = current.lookup(reading) or ()
+                if not any(candidate == surface for candidate, _ in candidates):
+                    continue
+                if candidates[0][0] == surface:
+                    continue    # Already ranks first
+                self._learned[(reading, surface)] = candidates[0][1] + LEARNING_INCREMENT
+                readings.add(reading)
+                learned += 1
+            if not learned:
+                return 0
+            if self._building_number is None:
+                self._generation = current.replace(
+                    self._next_generation_number(), base_number=current.base_number,
+                    user_dictionary=self._overlay_learned(current.user_dictionary))
+                self._evict_learned_conversions(readings)
+            if self._learning_timer is None:
+                timer = threading.Timer(LEARNING_FLUSH_DELAY, self.flush_learning, kwargs={'wait': True})
+                timer.daemon = True
+                self._learning_timer = timer
+                timer.start()
+        logger.debug(f'Learned {learned} selection(s); {len(self._learned)} unsaved')
+        return learned
+
+    def _evict_learned_conversions(self, readings):
+        """
+        Drop the cached conversions that depend on the learned readings.
+        学習した読みに依存するキャッシュ済み変換を捨てる。
+
+        A conversion depends on every reading inside its own: its bunsetsu,
+        their longest-match splits and the lattice edges are all substrings.
+        The learning generation keeps its base number, so the other entries
+        stay valid.
+        変換は自身に含まれる全ての読み（文節、その最長一致分割、ラティスの
+        エッジはすべて部分文字列）に依存する。学習の世代は基準番号を保つため、
+        他のエントリは有効なまま。
+        """
+        with self._conversion_cache_lock:
+            self._learn_serial += 1
+            stale = [cached for cached in self._conversion_cache
+                     if any(reading in cached for reading in readings)]
+            for cached in stale:
+                del self._conversion_cache[cached]
+
+    def _overlay_learned(self, user_dictionary):
+        """
+        Return user_dictionary with the unsaved learned counts applied.
+        未保存の学習カウントを適用したuser_dictionaryを返す。
+
+        Copy-on-write: only the readings that change are copied. A count
+        that is already at least as high is kept. Caller must hold _lock.
+        コピーオンライト: 変わる読みだけをコピーする。既に同じ以上の
+        カウントはそのまま。呼び出し元が_lockを保持すること。
+        """
+        if not self._learned:
+            return user_dictionary
+        merged = dict(user_dictionary)
+        for (reading, surface), count in self._learned.items():
+            candidates = merged.get(reading) or {}
+            if candidates.get(surface, count - 1) >= count:
+                continue
+            candidates = dict(candidates)
+            candidates[surface] = count
+            merged[reading] = candidates
+        return merged
+
+    def flush_learning(self, wait=False):
+        """
+        Write the unsaved learned counts to user_dictionary.json.
+        未保存の学習カウントをuser_dictionary.jsonに書き込む。
+
+        Called from the flush timer, on focus-out and at exit. The write
+        happens on a background thread unless `wait` is True.
+        フラッシュタイマー、フォーカスアウト時、終了時に呼ばれる。`wait`が
+        Trueでなければ書き込みはバックグラウンドスレッドで行われる。
+
+        Args:
+            wait: Write on the calling thread and return when done (exit).
+                  呼び出しスレッドで書き込み、完了後に戻る（終了時）。
+        """
+        with self._lock:
+            if self._learning_timer is not None:
+                self._learning_timer.cancel()
+                self._learning_timer = None
+            if not self._learned:
+                return
+        if wait:
+            self._write_learning()
+        else:
+            threading.Thread(target=self._write_learning, daemon=True).start()
+
+    def _user_dictionary_path(self):
+        """Path of the loaded user_dictionary.json, or where it will be created."""
+        for path in self._generation.dictionary_files:
+            if os.path.basename(path) == USER_DICTIONARY_FILENAME:
+                return path
+        return os.path.join(util.get_user_config_dir(), USER_DICTIONARY_FILENAME)
+
+    def _write_learning(self):
+        """
+        Append the unsaved learned counts to the user dictionary journal.
+        未保存の学習カウントをユーザー辞書のジャーナルに追記する。
+
+        Each count is recorded as a 'raise' (count = max(count, learned)), so
+        edits made meanwhile, e.g. in the user dictionary editor, are kept
+        (see dictionary_journal.py). Counts written successfully are dropped
+        from _learned unless they were raised again in the meantime.
+        各カウントは'raise'（count = max(count, 学習値)）として記録されるため、
+        その間の編集（ユーザー辞書エディタなど）は保持される
+        （dictionary_journal.py参照）。書き込めたカウントは、その間に再び
+        上がっていなければ_learnedから除かれる。
+
+        Returns:
+            bool: True if everything learned so far is on disk.
+        """
+        with self._learning_write_lock:
+            with self._lock:
+                learned = dict(self._learned)
+            if not learned:
+                return True
+
+            path = self._user_dictionary_path()
+            records = [('raise', reading, surface, count)
+                       for (reading, surface), count in learned.items()]
+            if not dictionary_journal.append(path, records):
+                logger.error(f'Failed to save learned selections: {path}')
+                return False
+
+            with self._lock:
+                for key, count in learned.items():
+                    if self._learned.get(key) == count:
+                        del self._learned[key]
+            logger.info(f'Saved {len(learned)} learned selection(s): {path}')
+            return True
+
     # ─── CRF Bunsetsu Prediction ──────────────────────────────────────────
     # CRF文節予測
 
@@ -743,17 +2166,24 @@ class HenkanProcessor:
         CRFモデルファイル（bunsetsu_boundary.crfsuite）は必要な時にのみ
         読み込まれ、全語変換のみを使用するユーザーの起動を遅らせない。
 
+        The weights are compiled into a util.CRFModel here, once, so that
+        predictions never have to call tagger.info() again.
+        重みはここで一度だけutil.CRFModelにコンパイルされ、予測のたびに
+        tagger.info()を呼ぶ必要がなくなる。
+
         Returns:
             bool: True if tagger is available, False otherwise.
                   タガーが利用可能ならTrue、それ以外はFalse。
         """
-        if self._tagger is not None:
+        if self._crf_model is not None:
             return True
 
-        self._tagger = util.load_crf_tagger()
-        return self._tagger is not None
+        if self._tagger is None:
+            self._tagger = util.load_crf_tagger()
+        self._crf_model = util.compile_crf_model(self._tagger)
+        return self._crf_model is not None
 
-    def predict_bunsetsu(self, input_text, n_best=5):
+    def predict_bunsetsu(self, input_text, n_best=None):
         """
         Predict bunsetsu segmentation using CRF N-best Viterbi.
         CRF N-best Viterbiを使用して文節セグメンテーションを予測。
@@ -780,6 +2210,20 @@ class HenkanProcessor:
             Output: [('きょう', 'B-L'), ('は', 'B-P'), ...]
             出力:   [('きょう', 'B-L'), ('は', 'B-P'), ...]
 
+        Steps 1-2 are incremental (util.CRFLattice): when input_text extends
+        the previously predicted text, only the last few positions are
+        re-featurized and the forward lattice is extended from there.
+        ステップ1-2はインクリメンタル（util.CRFLattice）: input_textが前回の
+        テキストを延長したものなら、末尾数文字だけを再計算しラティスを延長する。
+
+        Step 2 only runs the 1-best forward pass; the N best paths are then
+        enumerated best first (util.CRFPathStream). Conversions use the lazy
+        form directly (_bunsetsu_prediction_stream), so paths past #1 are
+        only computed when the user cycles to them.
+        ステップ2は1-bestの前向きパスのみを実行し、N個の最良パスはその後
+        最良から順に列挙される（util.CRFPathStream）。変換は遅延形式を直接
+        使うため、#1以降のパスはユーザーが循環した時にのみ計算される。
+
         ============================================================================
         LABEL MEANINGS / ラベルの意味
         ============================================================================
@@ -798,8 +2242,9 @@ class HenkanProcessor:
         Args:
             input_text: Hiragana input string to segment.
                         セグメント化するひらがな入力文字列。
-            n_best: Number of top predictions to return (default: 5).
-                    返すトップ予測の数（デフォルト: 5）。
+            n_best: Number of top predictions to return
+                    (default: bunsetsu_prediction_n_best).
+                    返すトップ予測の数（デフォルト: bunsetsu_prediction_n_best）。
 
         Returns:
             list: List of N-best predictions, each being a tuple of:
@@ -823,31 +2268,255 @@ class HenkanProcessor:
                 ...
             ]
         """
-        if not input_text:
-            return []
+        if n_best is None:
+            n_best = self._bunsetsu_n_best
+        return list(itertools.islice(self._bunsetsu_prediction_stream(input_text), n_best))
+
+    def set_lattice_conversion(self, enabled):
+        """
+        Choose how bunsetsu segmentations are predicted.
+        文節セグメンテーションの予測方法を選択。
+
+        Args:
+            enabled: True to use predict_lattice(), False for predict_bunsetsu().
+                     predict_lattice()を使うならTrue、predict_bunsetsu()ならFalse。
+        """
+        self._lattice_conversion = bool(enabled)
+
+    def set_bunsetsu_n_best(self, n_best):
+        """
+        Set the maximum number of bunsetsu predictions per conversion.
+        変換ごとの文節予測の最大数を設定。
+
+        Args:
+            n_best: Hard cap on the predictions cycle_bunsetsu_prediction()
+                    can reach (bunsetsu_prediction_n_best in the config).
+                    cycle_bunsetsu_prediction()が到達できる予測数の上限
+                    （設定のbunsetsu_prediction_n_best）。
+        """
+        self._bunsetsu_n_best = max(1, int(n_best))
 
+    def _predict_segmentations(self, input_text, generation=None):
+        """BunsetsuPredictions for bunsetsu mode, from the configured predictor."""
+        if self._lattice_conversion:
+            source = self._lattice_prediction_stream(input_text, generation)
+        else:
+            source = self._bunsetsu_prediction_stream(input_text)
+        return BunsetsuPredictions(source, self._bunsetsu_n_best)
+
+    def _get_crf_lattice(self, dict_materials):
+        """
+        Return the shared CRF lattice, loading the tagger if needed.
+        共有CRFラティスを返す（必要ならタガーを読み込む）。
+
+        The caller holds _crf_lattice_lock. The lattice is rebuilt when the
+        model or the feature materials change; it keeps a single path per
+        cell, since further paths are enumerated lazily (util.CRFPathStream).
+        A model file change (_crf_epoch) drops the tagger here, under the
+        lock, so no reader ever sees it half cleared.
+        モデルファイルの変更（_crf_epoch）時はここでロック下でタガーを破棄する。
+
+        Returns:
+            util.CRFLattice or None: None if the CRF tagger is unavailable.
+        """
+        epoch = self._crf_epoch
+        if self._crf_loaded_epoch != epoch:
+            self._tagger = None
+            self._crf_model = None
+            self._crf_lattice = None
+            self._crf_loaded_epoch = epoch
         if not self._load_tagger():
-            logger.debug('CRF tagger not available for bunsetsu prediction')
+            return None
+        lattice = self._crf_lattice
+        if lattice is None or not lattice.is_compatible(self._crf_model, 1, dict_materials):
+            lattice = self._crf_lattice = util.CRFLattice(self._crf_model, 1, dict_materials)
+        return lattice
+
+    def _bunsetsu_prediction_stream(self, input_text):
+        """
+        Yield CRF bunsetsu predictions of input_text lazily, best first.
+        input_textのCRF文節予測を最良から順に遅延生成する。
+
+        The forward pass runs here, under the lattice lock; the returned
+        generator only walks a snapshot of it (util.CRFLattice.paths()), so
+        it can be resumed later without the lock.
+        前向きパスはここでラティスのロック下で実行される。返されるジェネレータ
+        はそのスナップショットを辿るだけなので、後からロックなしで再開できる。
+
+        Returns:
+            iterator: (bunsetsu_list, score) tuples, as in predict_bunsetsu().
+        """
+        if not input_text:
+            return iter(())
+
+        dict_materials = self._generation.crf_feature_materials
+        with self._crf_lattice_lock:
+            lattice = self._get_crf_lattice(dict_materials)
+            if lattice is None:
+                logger.debug('CRF tagger not available for bunsetsu prediction')
+                return iter(())
+            paths = lattice.paths(input_text)
+            tokens = lattice.tokens
+
+        return ((util.labels_to_bunsetsu(tokens, labels), score) for labels, score in paths)
+
+    def predict_lattice(self, input_text, n_best=None, generation=None):
+        """
+        Predict bunsetsu segmentations with the dictionary word lattice.
+        辞書単語ラティスで文節セグメンテーションを予測。
+
+        See LATTICE CONVERSION in the module docstring. The CRF contributes
+        per-position marginals (util.CRFLattice.marginals(), reusing the
+        incremental emission), the dictionary contributes the edges.
+        モジュールdocstringのLATTICE CONVERSIONを参照。CRFは位置ごとの
+        周辺確率を、辞書はエッジを提供する。
+
+        Args:
+            input_text: Hiragana input string to segment.
+                        セグメント化するひらがな入力文字列。
+            n_best: Number of segmentations to return
+                    (default: bunsetsu_prediction_n_best).
+                    返すセグメンテーションの数
+                    （デフォルト: bunsetsu_prediction_n_best）。
+            generation: DictionaryGeneration to search (default: current).
+                        検索するDictionaryGeneration（デフォルト: 現在の世代）。
+
+        Returns:
+            list: Same as predict_bunsetsu(): [(bunsetsu_list, score), ...],
+                  best first. Empty if the CRF model is unavailable.
+                  predict_bunsetsu()と同じ形式（最良が先頭）。CRFモデルが
+                  なければ空。
+        """
+        if n_best is None:
+            n_best = self._bunsetsu_n_best
+        if n_best <= 0:
             return []
+        return list(itertools.islice(self._lattice_prediction_stream(input_text, generation), n_best))
 
-        # Run N-best Viterbi prediction
-        nbest_results = util.crf_nbest_predict(self._tagger, input_text, n_best=n_best,
-                                               dict_materials=self._crf_feature_materials)
+    def _lattice_prediction_stream(self, input_text, generation=None):
+        """
+        Yield the word lattice segmentations of input_text lazily, best first.
+        input_textの単語ラティスのセグメンテーションを最良から順に遅延生成する。
 
-        # Convert label sequences to bunsetsu lists
-        output = []
-        tokens = util.tokenize_line(input_text)
+        The DAG and its forward Viterbi scores are built here; the returned
+        generator runs a backward A* search over them (see
+        util.CRFPathStream), so each further segmentation costs only the
+        edges it expands.
+        DAGとその前向きViterbiスコアはここで作られる。返されるジェネレータは
+        その上で後ろ向きA*探索を行うため、以降のセグメンテーションは展開した
+        エッジ分のコストしかかからない。
 
-        for labels, score in nbest_results:
-            bunsetsu_list = util.labels_to_bunsetsu(tokens, labels)
-            output.append((bunsetsu_list, score))
+        Returns:
+            iterator: (bunsetsu_list, score) tuples, as in predict_lattice().
+        """
+        if not input_text:
+            return iter(())
+        if generation is None:
+            generation = self._generation
+
+        dict_materials = generation.crf_feature_materials
+        with self._crf_lattice_lock:
+            lattice = self._get_crf_lattice(dict_materials)
+            if lattice is None:
+                logger.debug('CRF tagger not available for lattice conversion')
+                return iter(())
+            marginals = lattice.marginals(input_text)
+            tokens = lattice.tokens
+            labels = lattice.model.labels
+        if not tokens:
+            return iter(())
+
+        # P(bunsetsu starts at t) and P(t belongs to a Lookup bunsetsu);
+        # a plain B/I model has no Passthrough labels
+        begin_columns = [i for i, label in enumerate(labels) if label.startswith('B')]
+        lookup_columns = [i for i, label in enumerate(labels) if not label.endswith('-P')]
+        log_begin, log_inside, log_lookup, log_passthrough = [], [], [], []
+        for row in marginals:
+            p_begin = sum(row[i] for i in begin_columns)
+            p_lookup = sum(row[i] for i in lookup_columns)
+            log_begin.append(math.log(max(p_begin, _LOG_FLOOR)))
+            log_inside.append(math.log(max(1.0 - p_begin, _LOG_FLOOR)))
+            log_lookup.append(math.log(max(p_lookup, _LOG_FLOOR)))
+            log_passthrough.append(math.log(max(1.0 - p_lookup, _LOG_FLOOR)))
+
+        # Tokens are single kana, except ASCII words: edges may only start
+        # and end on token boundaries
+        n = len(tokens)
+        offsets = [0]
+        for token in tokens:
+            offsets.append(offsets[-1] + len(token))
+        token_at_offset = {offset: t for t, offset in enumerate(offsets)}
+        text = ''.join(tokens)
+
+        # edges_to[u] = [(t, label, weight), ...] for edges spanning tokens t..u-1
+        edges_to = [[] for _ in range(n + 1)]
+        for t in range(n):
+            spans = set()
+            for reading in generation.common_prefix_search(text[offsets[t]:]):
+                u = token_at_offset.get(offsets[t] + len(reading))
+                if u is not None:
+                    spans.add(u)
+            last = max(max(spans, default=t), min(n, t + LATTICE_MAX_PASSTHROUGH))
+
+            score_lookup = log_begin[t] + log_lookup[t]
+            score_passthrough = log_begin[t] + log_passthrough[t]
+            for u in range(t + 1, last + 1):
+                if u > t + 1:
+                    score_lookup += log_inside[u - 1] + log_lookup[u - 1]
+                    score_passthrough += log_inside[u - 1] + log_passthrough[u - 1]
+                if u in spans:
+                    best = generation.lookup(text[offsets[t]:offsets[u]])
+                    count = max(best[0][1], 0) if best else 0
+                    edges_to[u].append(
+                        (t, 'B-L', score_lookup + LATTICE_COUNT_WEIGHT * math.log1p(count)))
+                if u - t <= LATTICE_MAX_PASSTHROUGH:
+                    edges_to[u].append((t, 'B-P', score_passthrough))
+
+        # Forward Viterbi over the DAG: best[u] = best score of a path 0 → u
+        best = [0.0] + [float('-inf')] * n
+        for u in range(1, n + 1):
+            for t, _, weight in edges_to[u]:
+                if best[t] + weight > best[u]:
+                    best[u] = best[t] + weight
+
+        return self._lattice_paths(best, edges_to, text, offsets)
+
+    @staticmethod
+    def _lattice_paths(best, edges_to, text, offsets):
+        """
+        Backward A* over the lattice DAG; yields (bunsetsu_list, score), best first.
+        ラティスDAG上の後ろ向きA*。(bunsetsu_list, score)を最良から順に生成する。
 
-        return output
+        A partial path covering tokens u..n-1 is ranked by best[u] plus its
+        own score, the exact score of the best complete path it can become.
+        トークンu..n-1を覆う部分パスは best[u] と自身のスコアの和（なり得る
+        最良の完全パスの正確なスコア）で順位付けされる。
+        """
+        n = len(best) - 1
+        if best[n] == float('-inf'):
+            return
+        counter = itertools.count()
+        # Entries: (-priority, tie-breaker, u, suffix score, bunsetsu linked list)
+        heap = [(-best[n], next(counter), n, 0.0, None)]
+        while heap:
+            neg_priority, _, u, suffix, path = heapq.heappop(heap)
+            if u == 0:
+                bunsetsu_list = []
+                while path is not None:
+                    bunsetsu_list.append(path[0])
+                    path = path[1]
+                yield bunsetsu_list, -neg_priority
+                continue
+            for t, label, weight in edges_to[u]:
+                if best[t] != float('-inf'):
+                    score = suffix + weight
+                    heapq.heappush(heap, (-(best[t] + score), next(counter), t, score,
+                                          ((text[offsets[t]:offsets[u]], label), path)))
 
     # ─── Bunsetsu Mode Methods ────────────────────────────────────────────
     # 文節モードメソッド
 
-    def _lookup_bunsetsu_candidates(self, bunsetsu_text):
+    def _lookup_bunsetsu_candidates(self, bunsetsu_text, generation=None):
         """
         Look up dictionary candidates for a single bunsetsu.
         単一の文節に対する辞書候補を検索。
@@ -861,60 +2530,173 @@ class HenkanProcessor:
         Args:
             bunsetsu_text: The bunsetsu yomi to look up.
                            検索する文節の読み。
+            generation: DictionaryGeneration to search (default: current).
+                        検索するDictionaryGeneration（デフォルト: 現在の世代）。
 
         Returns:
-            list: List of candidate dicts with 'surface', 'reading', 'count'.
-                  If no match found, returns list with original text as surface
-                  (marked as passthrough).
-                  'surface', 'reading', 'count'を持つ候補辞書のリスト。
-                  マッチが見つからない場合、元のテキストをsurfaceとして返す
-                  （passthroughとしてマーク）。
+            list: List of Candidate with surface, reading and count.
+                  If no match is found, the text is split into the longest
+                  dictionary words it contains (longest_match_split()): the
+                  joined best surfaces come first, then the joins with one
+                  piece changed to its next candidates (_split_candidates()),
+                  the kana last. If it contains none, returns list with
+                  original text as surface (marked as passthrough).
+                  surface, reading, countを持つCandidateのリスト。
+                  マッチが見つからない場合、テキストを含まれる最長の辞書語に
+                  分割し（longest_match_split()）、最良の表層形をつないだもの、
+                  次に1つの部分だけを次の候補に替えたもの
+                  （_split_candidates()）、最後にかなを返す。辞書語を含まなけれ
+                  ば元のテキストをsurfaceとして返す（passthroughとしてマーク）。
+        """
+        if generation is None:
+            generation = self._generation
+        sorted_candidates = generation.lookup(bunsetsu_text)
+
+        if sorted_candidates:
+            return [Candidate(surface, bunsetsu_text, count)
+                    for surface, count in sorted_candidates]
+
+        # No dictionary match - try the longest dictionary words it contains,
+        # offering the kana as the last alternative
+        pieces = generation.longest_match_split(bunsetsu_text)
+        if any(is_reading for _, is_reading in pieces):
+            surfaces = self._split_candidates(pieces, generation)
+            surfaces.append(bunsetsu_text)
+            return [Candidate(surface, bunsetsu_text) for surface in dict.fromkeys(surfaces)]
+
+        # Nothing found - return original text
+        return [Candidate(bunsetsu_text, bunsetsu_text, passthrough=True)]
+
+    @staticmethod
+    def _split_candidates(pieces, generation):
         """
-        candidates = []
+        Joined surfaces of the pieces of a split bunsetsu.
+        分割した文節の部分をつないだ表層形。
 
-        # Lock protects dictionary access
-        with self._lock:
-            has_match = bunsetsu_text in self._dictionary
-            candidates_dict = self._dictionary.get(bunsetsu_text, {}).copy() if has_match else {}
-
-        if has_match:
-            # Sort by count (descending) - higher count = better candidate
-            sorted_candidates = sorted(
-                candidates_dict.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )
-            for surface, count in sorted_candidates:
-                candidates.append({
-                    'surface': surface,
-                    'reading': bunsetsu_text,
-                    'count': count
-                })
-        else:
-            # No dictionary match - return original text
-            candidates.append({
-                'surface': bunsetsu_text,
-                'reading': bunsetsu_text,
-                'count': 0,
-                'passthrough': True
-            })
+        The best surfaces joined come first. Then each piece in turn is
+        changed to its 2nd candidate, then to its 3rd and so on, up to
+        SPLIT_PIECE_CANDIDATES, the other pieces keeping their best. So
+        きょう|てんき gives 今日天気, 京天気, 今日転機.
+        最良の表層形をつないだものが先頭。次に各部分を順に2番目の候補、
+        3番目の候補…（SPLIT_PIECE_CANDIDATESまで）に替え、他の部分は最良の
+        ままにする。きょう|てんきなら今日天気、京天気、今日転機となる。
 
-        return candidates
+        Args:
+            pieces: (text, is_reading) list from longest_match_split()
+            generation: DictionaryGeneration the readings are looked up in
 
-    def _is_multi_bunsetsu(self, bunsetsu_list):
+        Returns:
+            list: Joined surfaces / つないだ表層形のリスト
         """
-        Check if a bunsetsu prediction has multiple bunsetsu.
-
-        Single-bunsetsu predictions are skipped because they're equivalent
-        to whole-word lookup.
+        choices = [[surface for surface, _ in generation.lookup(piece)[:SPLIT_PIECE_CANDIDATES]]
+                   if is_reading else [piece]
+                   for piece, is_reading in pieces]
+        best = [surfaces[0] for surfaces in choices]
+        joined = [''.join(best)]
+        for rank in range(1, SPLIT_PIECE_CANDIDATES):
+            for i, surfaces in enumerate(choices):
+                if rank < len(surfaces):
+                    joined.append(''.join(best[:i] + [surfaces[rank]] + best[i + 1:]))
+        return joined
+
+    @latency.timed('henkan.bunsetsu_lookup')
+    def _build_bunsetsu_surfaces(self, bunsetsu_list, generation=None):
+        """
+        Look up the best surface of every bunsetsu in a prediction.
+        予測内の各文節の最良の表層形を検索。
 
         Args:
-            bunsetsu_list: List of (text, label) tuples
+            bunsetsu_list: List of (text, label) tuples from predict_bunsetsu()
+            generation: DictionaryGeneration to search (default: current)
 
         Returns:
-            bool: True if there are 2+ bunsetsu
+            tuple: One surface per bunsetsu / 文節ごとの表層形
+        """
+        surfaces = []
+        for text, label in bunsetsu_list:
+            surface = self._bunsetsu_best_surface(text, label, generation)
+            if surface is None:
+                surface = self._lookup_bunsetsu_candidates(text, generation)[0].surface
+            surfaces.append(surface)
+        return tuple(surfaces)
+
+    def _bunsetsu_best_surface(self, text, label, generation=None):
+        """
+        Surface of the first candidate of a (text, label) bunsetsu, read off
+        the pre-sorted index without building its candidate list; None if
+        the reading misses the dictionary (the split needs the full lookup).
+        (text, label)文節の最初の候補の表層形。候補リストを作らずに整列済み
+        索引から読む。辞書にない読みならNone（分割には完全な検索が必要）。
         """
-        return len(bunsetsu_list) >= 2
+        if not self._is_lookup_label(label):
+            return text
+        if generation is None:
+            generation = self._generation
+        sorted_candidates = generation.lookup(text)
+        return sorted_candidates[0][0] if sorted_candidates else None
+
+    @staticmethod
+    def _is_lookup_label(label):
+        """Whether a bunsetsu label asks for a dictionary lookup."""
+        return label.endswith('-L') or label == 'B'
+
+    def _bunsetsu_entry_candidates(self, text, label, generation=None):
+        """Candidate list of one (text, label) bunsetsu."""
+        if self._is_lookup_label(label):
+            # Lookup bunsetsu: get dictionary candidates
+            return self._lookup_bunsetsu_candidates(text, generation)
+        # Passthrough bunsetsu: keep as-is (no alternative candidates)
+        return [Candidate(text, text, passthrough=True)]
+
+    def _bunsetsu_candidates_at(self, index):
+        """
+        Candidate list of bunsetsu `index`, looked up on first use.
+        文節`index`の候補リスト（初回使用時に検索）。
+
+        Lists are memoized per (text, label kind, generation) for the rest
+        of the conversion, so a bunsetsu shared by several N-best
+        predictions is looked up once.
+        リストは変換の間(テキスト, ラベル種別, 世代)ごとにメモ化されるため、
+        複数のN-best予測が共有する文節は一度だけ検索される。
+        """
+        candidates = self._bunsetsu_candidates[index]
+        if candidates is None:
+            text, label = self._bunsetsu_list[index]
+            generation = self._generation
+            key = (text, self._is_lookup_label(label), generation.number)
+            candidates = self._bunsetsu_candidate_memo.get(key)
+            if candidates is None:
+                candidates = self._bunsetsu_entry_candidates(text, label, generation)
+                self._bunsetsu_candidate_memo[key] = candidates
+            self._bunsetsu_candidates[index] = candidates
+        return candidates
+
+    def _bunsetsu_surface_at(self, index):
+        """
+        Selected surface of bunsetsu `index`, or None.
+        文節`index`の選択中の表層形。なければNone。
+
+        A bunsetsu that was never navigated to has its first candidate
+        selected, so its surface comes from _bunsetsu_best_surface() and
+        its candidate list is not looked up just to be displayed.
+        ナビゲートされていない文節は最初の候補が選択されているため、表層形は
+        _bunsetsu_best_surface()から得て、表示のためだけに候補リストを検索しない。
+        """
+        candidates = self._bunsetsu_candidates[index]
+        if candidates is None:
+            surface = self._bunsetsu_surfaces[index]
+            if surface is not None:
+                return surface
+            text, label = self._bunsetsu_list[index]
+            surface = self._bunsetsu_best_surface(text, label)
+            if surface is not None:
+                self._bunsetsu_surfaces[index] = surface
+                return surface
+            candidates = self._bunsetsu_candidates_at(index)
+        selected_idx = self._bunsetsu_selected_indices[index]
+        if 0 <= selected_idx < len(candidates):
+            return candidates[selected_idx].surface
+        return None
 
     def _init_bunsetsu_mode(self, prediction_index):
         """
@@ -941,35 +2723,22 @@ class HenkanProcessor:
             prediction_index: Index into _bunsetsu_predictions.
                               _bunsetsu_predictionsへのインデックス。
         """
-        if not self._bunsetsu_predictions:
+        if self._bunsetsu_predictions is None or prediction_index < 0:
             return
 
-        if prediction_index < 0 or prediction_index >= len(self._bunsetsu_predictions):
+        prediction = self._bunsetsu_predictions.get(prediction_index)
+        if prediction is None:
             return
 
         self._bunsetsu_prediction_index = prediction_index
-        bunsetsu_list, score = self._bunsetsu_predictions[prediction_index]
-
-        # Look up candidates for each bunsetsu
-        self._bunsetsu_candidates = []
-        self._bunsetsu_selected_indices = []
-
-        for text, label in bunsetsu_list:
-            is_lookup = label.endswith('-L') or label == 'B'
-            if is_lookup:
-                # Lookup bunsetsu: get dictionary candidates
-                candidates = self._lookup_bunsetsu_candidates(text)
-            else:
-                # Passthrough bunsetsu: keep as-is (no alternative candidates)
-                candidates = [{
-                    'surface': text,
-                    'reading': text,
-                    'cost': 0,
-                    'passthrough': True  # Mark as passthrough
-                }]
+        bunsetsu_list, score = prediction
 
-            self._bunsetsu_candidates.append(candidates)
-            self._bunsetsu_selected_indices.append(0)  # Select first candidate
+        # Candidates are looked up lazily (_bunsetsu_candidates_at),
+        # selecting the first candidate of each bunsetsu
+        self._bunsetsu_list = list(bunsetsu_list)
+        self._bunsetsu_candidates = [None] * len(bunsetsu_list)
+        self._bunsetsu_surfaces = [None] * len(bunsetsu_list)
+        self._bunsetsu_selected_indices = [0] * len(bunsetsu_list)
 
         # Select first bunsetsu for navigation
         self._selected_bunsetsu_index = 0
@@ -1041,19 +2810,13 @@ class HenkanProcessor:
             return False
 
         # If we have no bunsetsu predictions yet, try to get them
-        if not self._bunsetsu_predictions:
-            predictions = self.predict_bunsetsu(self._current_yomi)
-            # Filter to multi-bunsetsu only
-            self._bunsetsu_predictions = [
-                p for p in predictions if self._is_multi_bunsetsu(p[0])
-            ]
-
-        # Calculate total options (whole-word match counts as option 0 if available)
-        total_options = len(self._bunsetsu_predictions)
-        if self._has_whole_word_match:
-            total_options += 1
+        if self._bunsetsu_predictions is None:
+            self._bunsetsu_predictions = self._predict_segmentations(self._current_yomi)
+            self._cache_bunsetsu_predictions(self._current_yomi, self._bunsetsu_predictions)
 
-        if total_options == 0:
+        # Predictions past the current one are produced on demand
+        has_predictions = bool(self._bunsetsu_predictions)
+        if not has_predictions and not self._has_whole_word_match:
             # No options available
             return False
 
@@ -1061,13 +2824,13 @@ class HenkanProcessor:
             # Options: -1 = whole-word, 0..n-1 = bunsetsu predictions
             if not self._bunsetsu_mode:
                 # Currently in whole-word mode, switch to bunsetsu #0
-                if self._bunsetsu_predictions:
+                if has_predictions:
                     self._init_bunsetsu_mode(0)
                     return True
             else:
                 # Currently in bunsetsu mode
                 next_idx = self._bunsetsu_prediction_index + 1
-                if next_idx >= len(self._bunsetsu_predictions):
+                if self._bunsetsu_predictions.get(next_idx) is None:
                     # Wrap around to whole-word mode
                     self._bunsetsu_mode = False
                     self._selected_index = 0
@@ -1079,21 +2842,37 @@ class HenkanProcessor:
                     return True
         else:
             # No whole-word match, only bunsetsu predictions
-            if not self._bunsetsu_predictions:
-                return False
-
             if not self._bunsetsu_mode:
                 # Not yet in bunsetsu mode, initialize
                 self._init_bunsetsu_mode(0)
                 return True
             else:
-                # Cycle through bunsetsu predictions
-                next_idx = (self._bunsetsu_prediction_index + 1) % len(self._bunsetsu_predictions)
+                # Cycle through bunsetsu predictions, wrapping after the last
+                next_idx = self._bunsetsu_prediction_index + 1
+                if self._bunsetsu_predictions.get(next_idx) is None:
+                    next_idx = 0
                 self._init_bunsetsu_mode(next_idx)
                 return True
 
         return False
 
+    def _cache_bunsetsu_predictions(self, reading, bunsetsu_predictions):
+        """
+        Attach predictions computed by cycling to the cached whole-word result.
+        循環で計算した予測をキャッシュ済みの全語結果に付加する。
+        """
+        with self._conversion_cache_lock:
+            cached = self._conversion_cache.get(reading)
+            if (cached is None or cached.tag != self._result_tag()
+                    or cached.bunsetsu_predictions is not None):
+                return
+            self._conversion_cache[reading] = ConversionResult(
+                reading, cached.tag, cached.candidates,
+                has_whole_word_match=cached.has_whole_word_match,
+                bunsetsu_predictions=bunsetsu_predictions,
+                bunsetsu_surfaces=cached.bunsetsu_surfaces,
+                learn_serial=cached.learn_serial)
+
     def select_bunsetsu(self, index):
         """
         Select a bunsetsu for candidate navigation.
@@ -1153,7 +2932,7 @@ class HenkanProcessor:
         Cycle to next candidate for the currently selected bunsetsu.
 
         Returns:
-            dict or None: The new selected candidate, or None if not applicable
+            Candidate or None: The new selected candidate, or None if not applicable
         """
         if not self._bunsetsu_mode:
             return None
@@ -1162,8 +2941,8 @@ class HenkanProcessor:
         if idx < 0 or idx >= len(self._bunsetsu_candidates):
             return None
 
-        candidates = self._bunsetsu_candidates[idx]
-        if not candidates or candidates[0].get('passthrough', False):
+        candidates = self._bunsetsu_candidates_at(idx)
+        if not candidates or candidates[0].passthrough:
             # Passthrough bunsetsu has no alternatives
             return None
 
@@ -1179,7 +2958,7 @@ class HenkanProcessor:
         Cycle to previous candidate for the currently selected bunsetsu.
 
         Returns:
-            dict or None: The new selected candidate, or None if not applicable
+            Candidate or None: The new selected candidate, or None if not applicable
         """
         if not self._bunsetsu_mode:
             return None
@@ -1188,8 +2967,8 @@ class HenkanProcessor:
         if idx < 0 or idx >= len(self._bunsetsu_candidates):
             return None
 
-        candidates = self._bunsetsu_candidates[idx]
-        if not candidates or candidates[0].get('passthrough', False):
+        candidates = self._bunsetsu_candidates_at(idx)
+        if not candidates or candidates[0].passthrough:
             # Passthrough bunsetsu has no alternatives
             return None
 
@@ -1222,16 +3001,14 @@ class HenkanProcessor:
         if not self._bunsetsu_mode:
             # Whole-word mode
             candidate = self.get_selected_candidate()
-            return candidate['surface'] if candidate else ''
+            return candidate.surface if candidate else ''
 
         # Bunsetsu mode: concatenate all selected surfaces
         parts = []
-        for i, candidates in enumerate(self._bunsetsu_candidates):
-            if not candidates:
-                continue
-            selected_idx = self._bunsetsu_selected_indices[i]
-            if 0 <= selected_idx < len(candidates):
-                parts.append(candidates[selected_idx]['surface'])
+        for i in range(len(self._bunsetsu_candidates)):
+            surface = self._bunsetsu_surface_at(i)
+            if surface is not None:
+                parts.append(surface)
 
         return ''.join(parts)
 
@@ -1263,17 +3040,14 @@ class HenkanProcessor:
         if not self._bunsetsu_mode:
             # Whole-word mode
             candidate = self.get_selected_candidate()
-            surface = candidate['surface'] if candidate else ''
+            surface = candidate.surface if candidate else ''
             return [(surface, True)]
 
         # Bunsetsu mode: return each bunsetsu with selection state
         result = []
-        for i, candidates in enumerate(self._bunsetsu_candidates):
-            if not candidates:
-                continue
-            selected_idx = self._bunsetsu_selected_indices[i]
-            if 0 <= selected_idx < len(candidates):
-                surface = candidates[selected_idx]['surface']
+        for i in range(len(self._bunsetsu_candidates)):
+            surface = self._bunsetsu_surface_at(i)
+            if surface is not None:
                 is_selected = (i == self._selected_bunsetsu_index)
                 result.append((surface, is_selected))
 
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+latency.py - Latency histograms for key handling and conversion phases
+キー処理と変換フェーズのレイテンシヒストグラム
+
+================================================================================
+WHY THIS MODULE EXISTS / このモジュールが存在する理由
+================================================================================
+
+"The IME feels laggy" can mean a slow CRF conversion, a slow dictionary
+lookup or slow preedit rendering. This module keeps a histogram of
+time.perf_counter_ns() durations per named path, so the report can tell them
+apart:
+
+「IMEが重い」は、CRF変換の遅さ、辞書検索の遅さ、プリエディット描画の遅さの
+いずれでもあり得る。このモジュールは名前付きの経路ごとにtime.perf_counter_ns()
+の所要時間のヒストグラムを保持し、レポートでそれらを区別できるようにする:
+
+    key.<path>            one key event, by the handler that took it
+                          (key.simultaneous, key.marker, key.conversion, ...)
+                          キーイベント1回（処理したハンドラ別）
+    engine.update_preedit building and sending the preedit / プリエディット描画
+    engine.trigger_conversion
+                          a space-tap conversion, up to showing its result
+                          (or handing it to the conversion worker)
+                          スペースタップの変換（結果の表示またはワーカーへの受け渡しまで）
+    henkan.conversion     computing a conversion (cache hits included)
+                          変換の計算（キャッシュヒットを含む）
+    henkan.dict_lookup    whole-word dictionary lookup of a conversion
+                          変換時の全語辞書検索
+    henkan.crf_features   CRF feature extraction and emission scoring
+                          CRF特徴抽出と発射スコア計算
+    henkan.crf_viterbi    CRF forward Viterbi / CRF前向きViterbi
+    henkan.bunsetsu_lookup best-surface lookup of every bunsetsu of a prediction
+                          予測の全文節の最良表層形の検索
+
+================================================================================
+COST / コスト
+================================================================================
+
+Recording is two perf_counter_ns() calls, a bucket index computed with
+integer operations and a counter increment under a lock. The buckets are
+log-linear (8 per power of two), so percentiles are reported with at most
+12.5% relative error and memory does not grow with the number of samples.
+Call sites are guarded by `latency.enabled`, like tracing.enabled, so a
+disabled histogram costs one attribute load.
+
+記録はperf_counter_ns()の呼び出し2回、整数演算によるバケット番号の計算、
+ロック下のカウンタ加算のみ。バケットは対数線形（2のべき乗ごとに8個）なので、
+パーセンタイルの相対誤差は最大12.5%で、メモリはサンプル数に比例して増えない。
+呼び出し側はtracing.enabledと同様に`latency.enabled`で保護されるため、
+無効時のコストは属性の読み込み1回。
+"""
+
+import datetime
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Sub-buckets per power of two (as a bit count): 3 → 8 buckets, ≤12.5% error
+SUB_BUCKET_BITS = 3
+
+# Percentiles included in reports
+PERCENTILES = (50, 95, 99)
+
+# Guard checked by call sites (read it as `latency.enabled`)
+# 呼び出し側が確認するフラグ（`latency.enabled`として参照すること）
+enabled = True
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def _bucket_index(value):
+    """Log-linear bucket of a non-negative integer; values below 16 get their own bucket."""
+    bits = value.bit_length()
+    if bits <= SUB_BUCKET_BITS + 1:
+        return value
+    shift = bits - SUB_BUCKET_BITS - 1
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _bucket_upper_bound(index):
+    """Largest value that falls into bucket index (inverse of _bucket_index)."""
+    if index < 2 << SUB_BUCKET_BITS:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    mantissa = index - (shift << SUB_BUCKET_BITS)
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations in nanoseconds.
+    ナノ秒単位の所要時間の対数線形ヒストグラム。
+
+    Not thread-safe by itself; the module functions serialize access.
+    単体ではスレッドセーフでない。モジュール関数がアクセスを直列化する。
+    """
+
+    __slots__ = ('buckets', 'count', 'total_ns', 'max_ns')
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, elapsed_ns):
+        elapsed_ns = max(0, elapsed_ns)
+        index = _bucket_index(elapsed_ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def percentile(self, p):
+        """
+        Upper bound of the bucket holding the p-th percentile (capped at max).
+        p番目のパーセンタイルを含むバケットの上限（最大値で打ち切り）。
+        """
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))  # ceil
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_bucket_upper_bound(index), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        """count, mean and percentiles in microseconds. / 件数・平均・パーセンタイル（マイクロ秒）"""
+        result = {'count': self.count,
+                  'mean_us': round(self.total_ns / self.count / 1000, 1) if self.count else 0.0}
+        for p in PERCENTILES:
+            result[f'p{p}_us'] = round(self.percentile(p) / 1000, 1)
+        result['max_us'] = round(self.max_ns / 1000, 1)
+        return result
+
+
+def configure(enable):
+    """Enable or disable recording; recorded samples are kept. / 記録の有効/無効を設定する。"""
+    global enabled
+    enabled = bool(enable)
+    logger.info(f'Latency statistics {"enabled" if enabled else "disabled"}')
+
+
+def add(name, elapsed_ns):
+    """
+    Record one duration for the path name.
+    経路nameの所要時間を1件記録する。
+
+    Like tracing.record(), this does not check `enabled`; call sites do.
+    tracing.record()と同様、`enabled`は確認しない（呼び出し側が確認する）。
+    """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = LatencyHistogram()
+        histogram.add(elapsed_ns)
+
+
+def timed(name):
+    """
+    Decorator recording each call of a function under name, while enabled.
+    有効な間、関数の各呼び出しをnameで記録するデコレータ。
+
+    Example / 例:
+        @latency.timed('henkan.conversion')
+        def compute_conversion(self, reading):
+            ...
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(name, time.perf_counter_ns() - start)
+        return wrapper
+    return decorate
+
+
+def summary():
+    """
+    Return {name: LatencyHistogram.summary()} for every recorded path.
+    記録されたすべての経路について{name: summary}を返す。
+    """
+    with _lock:
+        return {name: histogram.summary() for name, histogram in sorted(_histograms.items())}
+
+
+def reset():
+    """Discard all samples. / すべてのサンプルを捨てる。"""
+    with _lock:
+        _histograms.clear()
+
+
+def format_report(stats=None):
+    """
+    Format summary() as a fixed-width table, one path per line.
+    summary()を経路ごとに1行の固定幅の表に整形する。
+    """
+    if stats is None:
+        stats = summary()
+    if not stats:
+        return 'No latency samples recorded.'
+    width = max(len(name) for name in stats)
+    columns = [f'p{p}' for p in PERCENTILES] + ['max']
+    lines = [f'{"path":<{width}}  {"count":>7}' + ''.join(f'  {c + " ms":>9}' for c in columns)]
+    for name, entry in stats.items():
+        values = [entry[f'p{p}_us'] for p in PERCENTILES] + [entry['max_us']]
+        lines.append(f'{name:<{width}}  {entry["count"]:>7}' +
+                     ''.join(f'  {value / 1000:>9.3f}' for value in values))
+    return '\n'.join(lines)
+
+
+def write_report(path):
+    """
+    Write summary() to path as JSON.
+    summary()をJSONとしてpathに書き出す。
+
+    Returns:
+        dict or None: The statistics written, or None if the file could not
+                      be written. / 書き出した統計。書けなければNone。
+    """
+    stats = summary()
+    report = {
+        'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'bucket_error': f'{100 / (1 << SUB_BUCKET_BITS):g}%',
+        'paths': stats,
+    }
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    except OSError as e:
+        logger.error(f'Failed to write latency report: {path} - {e}')
+        return None
+    logger.info(f'Latency report written: {path}')
+    return stats
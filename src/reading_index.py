@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+reading_index.py - Sorted prefix index over dictionary readings
+辞書の読みに対するソート済み接頭辞インデックス
+
+================================================================================
+WHY THIS MODULE EXISTS / このモジュールが存在する理由
+================================================================================
+
+The dictionaries map {reading: {surface: count}}, which only answers EXACT
+matches. Several features need prefix queries over the readings instead:
+
+辞書は{読み: {表層形: カウント}}の対応で、完全一致にしか答えられない。
+いくつかの機能は読みに対する接頭辞検索を必要とする:
+
+    common_prefix_search("きょうは")   → ["き", "きょ", "きょう"]
+        All readings that are prefixes of the text (longest-match
+        segmentation, lattice construction, dictionary features).
+        テキストの接頭辞である全ての読み（最長一致分割、ラティス構築、
+        辞書特徴量）。
+
+    predictive_search("きょ")          → ["きょ", "きょう", "きょうと", ...]
+        All readings starting with the text (predictive input).
+        テキストで始まる全ての読み（予測入力）。
+
+================================================================================
+HOW IT WORKS / 仕組み
+================================================================================
+
+The readings are kept in a sorted tuple. All readings that start with a
+given prefix form one contiguous run, found with a binary search:
+
+読みはソート済みタプルに保持する。ある接頭辞で始まる読みは連続した範囲を
+成し、二分探索で見つかる:
+
+    sorted readings:  ... き  きょ  きょう  きょうと  きょく  きり ...
+                          ↑                               ↑
+                          bisect_left("き")                end of "き" run
+
+common_prefix_search() walks the text one character at a time, narrowing the
+run for text[:1], text[:2], ... Each step starts its binary search where the
+previous one ended, and the walk stops as soon as no reading starts with the
+current prefix, so a query costs O(len(text)) narrowing steps at most.
+
+common_prefix_search()はテキストを1文字ずつ進み、text[:1], text[:2], ...
+の範囲を狭めていく。各ステップの二分探索は前のステップの終点から始まり、
+現在の接頭辞で始まる読みがなくなった時点で終了するため、検索は最大でも
+O(len(text))回の絞り込みで済む。
+
+CompiledDictionary implements the same two methods directly on its mmap()ed
+reading index (sorted by UTF-8 bytes, which is code point order), so compiled
+layers need no extra memory.
+
+CompiledDictionaryは同じ2つのメソッドをmmap()された読みインデックス
+（UTF-8のバイト順 = コードポイント順）上で直接実装するため、コンパイル済み
+レイヤーには追加のメモリが不要。
+"""
+
+from bisect import bisect_left
+
+
+class ReadingIndex:
+    """
+    Immutable sorted index over a set of readings.
+    読みの集合に対する不変のソート済みインデックス。
+
+    Usage / 使用法:
+        index = ReadingIndex(dictionary)     # any iterable of readings
+        index.common_prefix_search('きょうは')  # → ['き', 'きょ', 'きょう']
+        index.predictive_search('きょ')        # → ['きょ', 'きょう', ...]
+    """
+
+    __slots__ = ('_readings',)
+
+    def __init__(self, readings=()):
+        """
+        Build the index.
+
+        Args:
+            readings: Iterable of reading strings (e.g. a {reading: ...} dict).
+                      読み文字列のイテラブル（{読み: ...}辞書など）。
+        """
+        self._readings = tuple(sorted(readings))
+
+    def __len__(self):
+        return len(self._readings)
+
+    def __contains__(self, reading):
+        readings = self._readings
+        i = bisect_left(readings, reading)
+        return i < len(readings) and readings[i] == reading
+
+    def common_prefix_search(self, text):
+        """
+        Return every reading that is a prefix of text, shortest first.
+        textの接頭辞である全ての読みを短い順に返す。
+
+        Args:
+            text: The text to match (e.g. the remaining yomi).
+                  照合するテキスト（残りの読みなど）。
+
+        Returns:
+            list: Readings r with text.startswith(r), by increasing length.
+                  text.startswith(r)となる読みrのリスト（長さの昇順）。
+        """
+        readings = self._readings
+        size = len(readings)
+        result = []
+        lo = 0
+        for end in range(1, len(text) + 1):
+            prefix = text[:end]
+            # Readings starting with prefix sort at or after those starting
+            # with the shorter prefix, so the search can resume from lo
+            lo = bisect_left(readings, prefix, lo)
+            if lo >= size or not readings[lo].startswith(prefix):
+                break
+            if readings[lo] == prefix:
+                result.append(prefix)
+        return result
+
+    def predictive_search(self, prefix, limit=None):
+        """
+        Return the readings starting with prefix, in sorted order.
+        prefixで始まる読みをソート順に返す。
+
+        Args:
+            prefix: The beginning of the reading. / 読みの先頭部分。
+            limit: Maximum number of readings to return (None = all).
+                   返す読みの最大数（None = 全て）。
+
+        Returns:
+            list: Matching readings (prefix itself first if it is a reading).
+                  マッチした読みのリスト（prefix自体が読みなら先頭）。
+        """
+        readings = self._readings
+        result = []
+        for i in range(bisect_left(readings, prefix), len(readings)):
+            reading = readings[i]
+            if not reading.startswith(prefix):
+                break
+            result.append(reading)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
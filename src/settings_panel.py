@@ -832,6 +832,41 @@ class SettingsPanel(Gtk.Window):
 
         box.pack_start(ui_frame, False, False, 0)
 
+        # Conversion preferences
+        conversion_frame = Gtk.Frame(label="Conversion")
+        conversion_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        conversion_box.set_border_width(10)
+        conversion_frame.add(conversion_box)
+
+        self.speculative_conversion_check = Gtk.CheckButton(
+            label="Convert in the background while typing pauses (speculative conversion)"
+        )
+        self.speculative_conversion_check.set_tooltip_text(
+            "When enabled, the yomi being typed is converted ahead of time so that "
+            "the conversion key only has to show the prepared result."
+        )
+        conversion_box.pack_start(self.speculative_conversion_check, False, False, 0)
+
+        self.lattice_conversion_check = Gtk.CheckButton(
+            label="Segment multi-bunsetsu conversions with a dictionary word lattice"
+        )
+        self.lattice_conversion_check.set_tooltip_text(
+            "When enabled, bunsetsu boundaries are chosen from dictionary words "
+            "weighted by the CRF model, instead of the CRF segmentations alone."
+        )
+        conversion_box.pack_start(self.lattice_conversion_check, False, False, 0)
+
+        self.candidate_learning_check = Gtk.CheckButton(
+            label="Learn confirmed candidates (rank them higher next time)"
+        )
+        self.candidate_learning_check.set_tooltip_text(
+            "When enabled, confirmed conversion candidates move up in the candidate "
+            "list. Learned counts are saved to user_dictionary.json in the background."
+        )
+        conversion_box.pack_start(self.candidate_learning_check, False, False, 0)
+
+        box.pack_start(conversion_frame, False, False, 0)
+
         return box
 
 
@@ -1655,6 +1690,15 @@ class SettingsPanel(Gtk.Window):
             # Trigger the toggle handler to update field states
             self.on_use_ibus_hint_toggled(self.use_ibus_hint_check)
 
+        # Load speculative_conversion setting
+        self.speculative_conversion_check.set_active(self.config.get("speculative_conversion", False))
+
+        # Load lattice_conversion setting
+        self.lattice_conversion_check.set_active(self.config.get("lattice_conversion", False))
+
+        # Load candidate_learning setting
+        self.candidate_learning_check.set_active(self.config.get("candidate_learning", True))
+
         # Key Configs tab - load keybindings into table
         # Clear existing rows
         for child in self.keybinding_listbox.get_children():
@@ -1914,6 +1958,15 @@ class SettingsPanel(Gtk.Window):
         # Save use_ibus_hint_colors setting
         self.config["use_ibus_hint_colors"] = self.use_ibus_hint_check.get_active()
 
+        # Save speculative_conversion setting
+        self.config["speculative_conversion"] = self.speculative_conversion_check.get_active()
+
+        # Save lattice_conversion setting
+        self.config["lattice_conversion"] = self.lattice_conversion_check.get_active()
+
+        # Save candidate_learning setting
+        self.config["candidate_learning"] = self.candidate_learning_check.get_active()
+
         # Key Configs tab - validate and collect keybindings
         keybindings_by_action, error_msg = self._validate_keybindings()
         if error_msg:
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+tracing.py - Structured event tracing for the key event path
+キーイベント処理経路のための構造化イベントトレース
+
+================================================================================
+WHY THIS MODULE EXISTS / このモジュールが存在する理由
+================================================================================
+
+The key event path (do_process_key_event, the marker state machine, preedit
+updates) runs for every key press and release. A logger.debug(f'...') call
+there formats its f-string before the logger checks the level, so every
+keystroke pays for string formatting even when DEBUG output is off, and for
+log file I/O when it is on.
+
+キーイベント処理経路（do_process_key_event、マーカー状態機械、プリエディット
+更新）はキーの押下・離上のたびに実行される。そこでのlogger.debug(f'...')は
+ロガーがレベルを確認する前にf文字列を整形するため、DEBUG出力がオフでも
+キー入力ごとに文字列整形のコストがかかり、オンならログファイルI/Oもかかる。
+
+Instead, the key path records structured events, guarded by a module flag:
+代わりに、キー処理経路はモジュールのフラグで保護された構造化イベントを記録する:
+
+    if tracing.enabled:
+        tracing.record('marker', action='pressed', state=self._marker_state.name)
+
+While tracing is disabled (the default), the cost is one attribute load and
+a branch: no event, string or dict is built. While it is enabled, events go
+to an in-memory ring buffer holding the last `capacity` events; nothing is
+formatted or written until the buffer is dumped (dump()), e.g. from the
+engine's properties menu.
+
+トレースが無効（デフォルト）の間、コストは属性の読み込みと分岐1回のみで、
+イベント・文字列・辞書は作られない。有効な間、イベントは直近`capacity`件を
+保持するメモリ上のリングバッファに入る。バッファがダンプされるまで（dump()、
+例えばエンジンのプロパティメニューから）何も整形・書き込みされない。
+
+================================================================================
+EVENT FORMAT / イベント形式
+================================================================================
+
+Each event is a (timestamp_ns, kind, fields) tuple: a time.perf_counter_ns()
+timestamp, a short event type ('key', 'marker', 'preedit', ...) and the
+keyword arguments given to record(). Durations are recorded as fields
+(e.g. elapsed_us). dump() writes one JSON object per line:
+
+各イベントは(timestamp_ns, kind, fields)のタプル: time.perf_counter_ns()の
+タイムスタンプ、短いイベント種別（'key'、'marker'、'preedit'など）、record()に
+渡したキーワード引数。所要時間はフィールドとして記録する（elapsed_usなど）。
+dump()は1行に1つのJSONオブジェクトを書き出す:
+
+    {"dumped_at": "2026-01-01T12:00:00", "perf_counter_ns": ..., "events": 2, "capacity": 4096}
+    {"t_ns": 123456789, "kind": "key", "key": "a", "pressed": true, "elapsed_us": 85}
+    {"t_ns": 123470001, "kind": "preedit", "style": "stealth", "length": 1}
+"""
+
+import collections
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Number of events kept in the ring buffer unless configured otherwise
+DEFAULT_CAPACITY = 4096
+
+# Guard checked by call sites before building an event. Read it as
+# `tracing.enabled` (not `from tracing import enabled`) so that configure()
+# takes effect.
+# イベントを作る前に呼び出し側が確認するフラグ。configure()が反映されるよう
+# `tracing.enabled`として参照すること。
+enabled = False
+
+_buffer = collections.deque(maxlen=DEFAULT_CAPACITY)
+
+# Serializes record() against snapshot(); conversion worker threads record too
+_lock = threading.Lock()
+
+
+def configure(enable, capacity=DEFAULT_CAPACITY):
+    """
+    Enable or disable tracing and set the ring buffer size.
+    トレースの有効/無効とリングバッファのサイズを設定する。
+
+    Events already recorded are kept (the oldest ones are dropped if the
+    buffer shrinks).
+    記録済みのイベントは保持される（バッファが小さくなれば古いものから捨てる）。
+
+    Args:
+        enable: True to record events / イベントを記録するならTrue
+        capacity: Maximum number of events kept / 保持するイベントの最大数
+    """
+    global enabled, _buffer
+    if not isinstance(capacity, int) or isinstance(capacity, bool) or capacity <= 0:
+        logger.warning(f'Invalid event trace capacity {capacity!r}, using {DEFAULT_CAPACITY}')
+        capacity = DEFAULT_CAPACITY
+    with _lock:
+        if _buffer.maxlen != capacity:
+            _buffer = collections.deque(_buffer, maxlen=capacity)
+        enabled = bool(enable)
+    logger.info(f'Event tracing {"enabled" if enabled else "disabled"} (capacity={capacity})')
+
+
+def record(kind, **fields):
+    """
+    Append an event to the ring buffer.
+    リングバッファにイベントを追加する。
+
+    Call sites check `tracing.enabled` first, so that the arguments are not
+    even built while tracing is off; record() itself does not check it.
+    呼び出し側が先に`tracing.enabled`を確認するため、トレースがオフの間は
+    引数すら作られない。record()自体は確認しない。
+
+    Args:
+        kind: Event type, e.g. 'key' / イベント種別
+        **fields: JSON-serializable event data / JSONにできるイベントデータ
+    """
+    event = (time.perf_counter_ns(), kind, fields)
+    with _lock:
+        _buffer.append(event)
+
+
+def snapshot():
+    """Return the buffered events, oldest first, as a list of (timestamp_ns, kind, fields)."""
+    with _lock:
+        return list(_buffer)
+
+
+def clear():
+    """Discard all buffered events. / バッファ内のイベントをすべて捨てる。"""
+    with _lock:
+        _buffer.clear()
+
+
+def dump(path):
+    """
+    Write the buffered events to path as JSON lines.
+    バッファ内のイベントをJSON Lines形式でpathに書き出す。
+
+    The first line is a header with the wall-clock time of the dump and the
+    perf_counter_ns() value at that moment, so event timestamps can be
+    related to log timestamps.
+    1行目はダンプ時の実時刻とその時点のperf_counter_ns()の値を持つヘッダーで、
+    イベントのタイムスタンプをログのタイムスタンプと対応付けられる。
+
+    Returns:
+        int or None: Number of events written, or None if the file could not
+                     be written. / 書き出したイベント数。書けなければNone。
+    """
+    events = snapshot()
+    header = {
+        'dumped_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'perf_counter_ns': time.perf_counter_ns(),
+        'events': len(events),
+        'capacity': _buffer.maxlen,
+    }
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header) + '\n')
+            for timestamp_ns, kind, fields in events:
+                line = {'t_ns': timestamp_ns, 'kind': kind}
+                line.update(fields)
+                f.write(json.dumps(line, ensure_ascii=False, default=str) + '\n')
+    except OSError as e:
+        logger.error(f'Failed to write event trace: {path} - {e}')
+        return None
+    logger.info(f'Event trace written: {path} ({len(events)} events)')
+    return len(events)
@@ -115,6 +115,12 @@ MODULE STRUCTURE / モジュール構造
         - save_user_dictionary()      → Save to JSON
         - add_entry()                 → Add a single entry
         - remove_entry()              → Remove a single entry
+        - set_entry_count()           → Change the count of an entry
+
+    Single-entry edits are appended to user_dictionary.journal instead of
+    rewriting the JSON (see dictionary_journal.py); loading replays them.
+    単一エントリの編集はJSONを書き直さずuser_dictionary.journalに追記される
+    （dictionary_journal.py参照）。読み込み時に再生される。
 
     GUI CLASS:
     GUIクラス:
@@ -137,6 +143,8 @@ import gi
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk, Gdk, GLib
 
+import dictionary_journal
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
@@ -160,10 +168,12 @@ def load_user_dictionary(path=None):
     Load user dictionary from JSON file.
     JSONファイルからユーザー辞書を読み込む。
 
-    Reads the user dictionary file and returns its contents as a nested dict.
-    Handles missing files gracefully by returning an empty dict.
-    ユーザー辞書ファイルを読み取り、内容をネストされた辞書として返す。
-    ファイルが見つからない場合は空の辞書を返して適切に処理する。
+    Reads the user dictionary file, replays its journal of later edits, and
+    returns the result as a nested dict. Handles missing files gracefully by
+    returning an empty dict.
+    ユーザー辞書ファイルを読み取り、その後の編集のジャーナルを再生し、結果を
+    ネストされた辞書として返す。ファイルが見つからない場合は空の辞書を返して
+    適切に処理する。
 
     Args:
         path: Path to dictionary file. If None, uses default location.
@@ -186,12 +196,7 @@ def load_user_dictionary(path=None):
         return {}
 
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        if not isinstance(data, dict):
-            logger.warning(f'Invalid user dictionary format, returning empty dict')
-            return {}
-        return data
+        return dictionary_journal.load(path)
     except json.JSONDecodeError as e:
         logger.error(f'Failed to parse user dictionary: {e}')
         return {}
@@ -205,10 +210,14 @@ def save_user_dictionary(data, path=None):
     Save user dictionary to JSON file.
     ユーザー辞書をJSONファイルに保存。
 
-    Writes the dictionary data to a JSON file with UTF-8 encoding.
-    Creates the parent directory if it doesn't exist.
-    辞書データをUTF-8エンコーディングでJSONファイルに書き込む。
-    親ディレクトリが存在しない場合は作成する。
+    Writes the dictionary data to a JSON file with UTF-8 encoding, replacing
+    the file atomically, and starts a new journal. Creates the parent
+    directory if it doesn't exist. For single-entry edits, add_entry(),
+    remove_entry() and set_entry_count() are much cheaper.
+    辞書データをUTF-8エンコーディングでJSONファイルに原子的に書き込み、
+    新しいジャーナルを開始する。親ディレクトリが存在しない場合は作成する。
+    単一エントリの編集にはadd_entry()、remove_entry()、set_entry_count()の
+    方がはるかに軽い。
 
     Args:
         data: Dictionary data to save (nested dict format).
@@ -223,17 +232,11 @@ def save_user_dictionary(data, path=None):
     if path is None:
         path = get_user_dictionary_path()
 
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-
-    try:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    if dictionary_journal.write_snapshot(path, data):
         logger.info(f'Saved user dictionary: {path}')
         return True
-    except Exception as e:
-        logger.error(f'Failed to save user dictionary: {e}')
-        return False
+    logger.error(f'Failed to save user dictionary: {path}')
+    return False
 
 
 def add_entry(reading, candidate, count=1, data=None, path=None):
@@ -250,6 +253,11 @@ def add_entry(reading, candidate, count=1, data=None, path=None):
     creating a duplicate.
     エントリが既に存在する場合、重複を作成せずにカウントが増加される。
 
+    The edit is appended to the journal, so passing `data` makes the call
+    O(1) no matter how large the dictionary is.
+    編集はジャーナルに追記されるため、`data`を渡せば辞書の大きさに関係なく
+    O(1)で呼び出せる。
+
     Args:
         reading: The kana reading (e.g., "あい").
                  かなの読み（例: "あい"）。
@@ -291,7 +299,8 @@ def add_entry(reading, candidate, count=1, data=None, path=None):
         logger.info(f'Added entry: {reading} → {candidate} (count: {count})')
 
     # Save immediately
-    success = save_user_dictionary(data, path)
+    success = dictionary_journal.append(path or get_user_dictionary_path(),
+                                        [('add', reading, candidate, count)])
     return success, data
 
 
@@ -333,7 +342,41 @@ def remove_entry(reading, candidate, data=None, path=None):
     if not data[reading]:
         del data[reading]
 
-    success = save_user_dictionary(data, path)
+    success = dictionary_journal.append(path or get_user_dictionary_path(),
+                                        [('remove', reading, candidate)])
+    return success, data
+
+
+def set_entry_count(reading, candidate, count, data=None, path=None):
+    """
+    Change the count of an existing user dictionary entry.
+    既存のユーザー辞書エントリのカウントを変更。
+
+    Args:
+        reading: The kana reading.
+                 かなの読み。
+        candidate: The kanji candidate.
+                   漢字の候補。
+        count: The new count. / 新しいカウント。
+        data: Existing dictionary data. If None, will be loaded from file.
+              既存の辞書データ。Noneの場合はファイルから読み込む。
+        path: Path to dictionary file. If None, uses default location.
+              辞書ファイルへのパス。Noneの場合はデフォルトの場所を使用。
+
+    Returns:
+        tuple: (success: bool, data: dict) - Success flag and updated data.
+               (成功: bool, データ: dict) - 成功フラグと更新されたデータ。
+    """
+    if data is None:
+        data = load_user_dictionary(path)
+
+    if reading not in data or candidate not in data[reading]:
+        logger.warning(f'Entry not found: {reading} → {candidate}')
+        return False, data
+
+    data[reading][candidate] = count
+    success = dictionary_journal.append(path or get_user_dictionary_path(),
+                                        [('set', reading, candidate, count)])
     return success, data
 
 
@@ -810,12 +853,11 @@ class UserDictionaryEditor(Gtk.Window):
         reading = self.store.get_value(store_iter, 0)
         candidate = self.store.get_value(store_iter, 1)
 
-        # Update the data structure
+        # Update the data structure and save to file
         if reading in self.data and candidate in self.data[reading]:
-            self.data[reading][candidate] = new_count
-
-            # Save to file
-            if save_user_dictionary(self.data, self.dictionary_path):
+            success, self.data = set_entry_count(reading, candidate, new_count,
+                                                 data=self.data, path=self.dictionary_path)
+            if success:
                 # Update the store (display)
                 self.store.set_value(store_iter, 2, new_count)
                 self.modified = True
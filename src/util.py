@@ -53,10 +53,27 @@ MODULE ORGANIZATION / モジュール構成
 
    CRF 系列ラベリングのための N-best ビタビ復号の実装。
 
+   - CRFModel / compile_crf_model(): Model weights compiled once into a
+                                     feature→weight-row table and a dense
+                                     transition matrix
+                                     特徴量→重み行テーブルと密な遷移行列に
+                                     一度だけコンパイルしたモデル重み
    - crf_compute_emission_scores(): Compute emission scores from features
                                     特徴量から発射スコアを計算
    - crf_nbest_viterbi(): N-best Viterbi algorithm
                           N-best ビタビアルゴリズム
+   - crf_nbest_viterbi_numpy(): Vectorized N-best Viterbi (NumPy, optional)
+                                ベクトル化 N-best ビタビ（NumPy、任意）
+   - CRFLattice: Incremental N-best predictor reusing the lattice as the
+                 input grows
+                 入力の伸長に合わせてラティスを再利用するインクリメンタル予測器
+   - CRFPathStream: Lazy k-best label sequences (backward A* over the
+                    forward Viterbi scores)
+                    遅延 k-best ラベル列（前向き Viterbi スコア上の後ろ向き A*）
+   - crf_marginals() / crf_marginals_numpy(): Per-position label marginals
+                                              (forward-backward)
+                                              位置ごとのラベル周辺確率
+                                              （前向き後ろ向きアルゴリズム）
    - crf_nbest_predict(): Main entry point for N-best prediction
                           N-best 予測のメインエントリポイント
    - labels_to_bunsetsu(): Convert CRF labels to bunsetsu segments
@@ -84,6 +101,8 @@ MODULE ORGANIZATION / モジュール構成
 
    - get_dictionary_files(): Get list of active dictionary files
                              有効な辞書ファイルのリストを取得
+   - get_dictionary_snapshot_path(): Path of the merged dictionary snapshot
+                                     マージ済み辞書スナップショットのパス
    - parse_skk_dictionary_line(): Parse SKK dictionary format
                                   SKK辞書形式の解析
    - convert_skk_to_json(): Convert SKK to JSON format
@@ -96,6 +115,11 @@ MODULE ORGANIZATION / モジュール構成
                                      substring matching
                                      部分文字列マッチングで拡張辞書を生成
 
+   Each generate_*_dictionary() also compiles its output into the
+   memory-mapped format of compiled_dictionary.py (*.bin next to *.json).
+   各generate_*_dictionary()は出力をcompiled_dictionary.pyのメモリマップ
+   形式（*.jsonの隣の*.bin）にもコンパイルする。
+
 ================================================================================
 KEY CONCEPTS FOR PORTING / 移植時の重要概念
 ================================================================================
@@ -142,16 +166,29 @@ KANCHOKU / 漢直:
 """
 
 import codecs
+import heapq
 import json
 import math
 import os
+import time
 from gi.repository import GLib
 import logging
 
+import compiled_dictionary
 import katsuyou
+import latency
 
 logger = logging.getLogger(__name__)
 
+# NumPy is optional: when present, CRF emission scoring and N-best Viterbi run
+# vectorized; otherwise the pure-Python implementations are used.
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Character Classification and Tokenization / 文字分類とトークン化
@@ -692,6 +729,168 @@ def add_features_per_line(line_or_tokens, dict_materials=None):
 #
 # ─────────────────────────────────────────────────────────────────────────────
 
+class CRFModel:
+    """Compiled view of a CRF model's weights for repeated prediction.
+    繰り返し予測用にコンパイルしたCRFモデルの重み。
+
+    pycrfsuite exposes the weights only through tagger.info(), which dumps the
+    entire model into fresh Python dicts keyed by (feature, label) tuples.
+    Doing that on every prediction dominates the cost of bunsetsu conversion,
+    so the weights are reorganized ONCE into:
+    pycrfsuiteは重みをtagger.info()経由でのみ公開し、モデル全体を
+    (特徴量, ラベル)タプルをキーとする新しいPython辞書に書き出す。予測の
+    たびにこれを行うと文節変換のコストの大半を占めるため、重みを一度だけ
+    以下に再編成する:
+
+        feature_weights: {"char:き": (w_B-L, w_I-L, w_B-P, w_I-P), ...}
+                         one row per feature string, one column per label
+                         特徴量文字列ごとに1行、ラベルごとに1列
+        transitions:     transitions[from_idx][to_idx] (dense matrix)
+                         密な遷移行列
+
+    Attributes:
+        labels: List of label strings, in column order
+        label_index: {label: column index}
+        feature_weights: {feature_string: tuple of per-label weights}
+        transitions: 2D list, transitions[from_idx][to_idx] = weight
+        feature_ids: {feature_string: row index into weight_matrix}
+                     (None when NumPy is unavailable)
+        weight_matrix: np.ndarray (n_features × n_labels), or None
+        transition_matrix: np.ndarray (n_labels × n_labels), or None
+
+    When NumPy is available the same weights are also kept as arrays, so a
+    prediction maps feature strings to integer IDs, gathers their rows and
+    sums them per position in a single array operation.
+    NumPy が利用可能な場合は同じ重みを配列としても保持し、特徴量文字列を
+    整数IDに変換して行を集め、位置ごとの合計を1回の配列演算で求める。
+    """
+
+    __slots__ = ('labels', 'label_index', 'feature_weights', 'transitions',
+                 'feature_ids', 'weight_matrix', 'transition_matrix')
+
+    def __init__(self, labels, state_features, transitions):
+        """
+        Args:
+            labels: List of label strings (e.g., ['B-L', 'I-L', 'B-P', 'I-P'])
+            state_features: Dict of (feature_string, label) → weight
+            transitions: Dict of (from_label, to_label) → weight
+        """
+        self.labels = list(labels)
+        self.label_index = {label: i for i, label in enumerate(self.labels)}
+        n_labels = len(self.labels)
+
+        rows = {}
+        for (feat_str, label), weight in state_features.items():
+            label_idx = self.label_index.get(label)
+            if label_idx is None:
+                continue
+            row = rows.get(feat_str)
+            if row is None:
+                row = rows[feat_str] = [0.0] * n_labels
+            row[label_idx] += weight
+        self.feature_weights = {feat_str: tuple(row) for feat_str, row in rows.items()}
+
+        self.transitions = [
+            [transitions.get((from_label, to_label), 0.0) for to_label in self.labels]
+            for from_label in self.labels
+        ]
+
+        self.feature_ids = None
+        self.weight_matrix = None
+        self.transition_matrix = None
+        if np is not None:
+            self.feature_ids = {feat_str: i for i, feat_str in enumerate(self.feature_weights)}
+            self.weight_matrix = np.array(
+                list(self.feature_weights.values()), dtype=np.float64
+            ).reshape(len(self.feature_weights), n_labels)
+            self.transition_matrix = np.array(
+                self.transitions, dtype=np.float64
+            ).reshape(n_labels, n_labels)
+
+    @classmethod
+    def from_tagger(cls, tagger):
+        """Build a CRFModel from an opened pycrfsuite.Tagger (reads tagger.info() once)."""
+        info = tagger.info()
+        return cls(tagger.labels(), info.state_features, info.transitions)
+
+    def emission_scores(self, features):
+        """Compute emission[t][label_idx] from per-position feature dicts.
+
+        Same result as crf_compute_emission_scores(), but each feature costs a
+        single dict lookup instead of one per label.
+
+        Args:
+            features: List of feature dicts (one per position), from add_features_per_line()
+
+        Returns:
+            2D list: emission[t][label_idx] = score for label at position t
+        """
+        n_labels = len(self.labels)
+        feature_weights = self.feature_weights
+        emission = []
+        for feat_dict in features:
+            scores = [0.0] * n_labels
+            for key, value in feat_dict.items():
+                row = feature_weights.get(f"{key}:{value}")
+                if row is not None:
+                    for i in range(n_labels):
+                        scores[i] += row[i]
+            emission.append(scores)
+        return emission
+
+    def emission_array(self, features):
+        """Vectorized emission_scores(): returns an (n_positions × n_labels) array.
+
+        Every known feature string is mapped to its integer ID, the matching
+        rows are gathered from weight_matrix in one fancy-indexing step, and
+        np.add.at() accumulates them into their positions.
+
+        Requires NumPy (weight_matrix is not None).
+
+        Args:
+            features: List of feature dicts (one per position), from add_features_per_line()
+
+        Returns:
+            np.ndarray: emission[t, label_idx] = score for label at position t
+        """
+        feature_ids = self.feature_ids
+        positions = []
+        ids = []
+        for t, feat_dict in enumerate(features):
+            for key, value in feat_dict.items():
+                feat_id = feature_ids.get(f"{key}:{value}")
+                if feat_id is not None:
+                    positions.append(t)
+                    ids.append(feat_id)
+
+        emission = np.zeros((len(features), len(self.labels)), dtype=np.float64)
+        if ids:
+            np.add.at(emission, np.array(positions, dtype=np.intp),
+                      self.weight_matrix[np.array(ids, dtype=np.intp)])
+        return emission
+
+
+def compile_crf_model(tagger):
+    """Compile an opened pycrfsuite.Tagger into a reusable CRFModel.
+
+    Args:
+        tagger: pycrfsuite.Tagger with model already opened, or None
+
+    Returns:
+        CRFModel, or None if tagger is None or its weights cannot be read.
+    """
+    if tagger is None:
+        return None
+    try:
+        model = CRFModel.from_tagger(tagger)
+    except Exception as e:
+        logger.error(f'Failed to compile CRF model: {e}')
+        return None
+    logger.info(f'Compiled CRF model: {len(model.feature_weights)} features, '
+                f'{len(model.labels)} labels')
+    return model
+
+
 def crf_compute_emission_scores(features, state_features, labels):
     """Compute emission scores for each position and label.
 
@@ -722,60 +921,54 @@ def crf_compute_emission_scores(features, state_features, labels):
     return emission
 
 
-def crf_nbest_viterbi(emission, transitions, labels, n_best=5):
-    """Run N-best Viterbi algorithm to find top-N label sequences.
-
-    Args:
-        emission: 2D list emission[t][label_idx] = emission score
-        transitions: Dict of (from_label, to_label) → weight
-        labels: List of label strings
-        n_best: Number of best sequences to return
-
-    Returns:
-        List of (labels_list, score) tuples, sorted by score descending.
-        Each labels_list is a list of label strings for each position.
-    """
-    n_positions = len(emission)
-    n_labels = len(labels)
+def _dense_transitions(transitions, labels):
+    """Return transitions as a dense matrix trans[from_idx][to_idx]."""
+    if not isinstance(transitions, dict):
+        # A CRFModel already holds it as a dense matrix
+        return transitions
+    return [[transitions.get((from_label, to_label), 0.0) for to_label in labels]
+            for from_label in labels]
 
-    if n_positions == 0:
-        return []
 
-    # Build transition matrix: trans[from_idx][to_idx] = score
-    trans = [[0.0] * n_labels for _ in range(n_labels)]
-    for i, from_label in enumerate(labels):
-        for j, to_label in enumerate(labels):
-            trans[i][j] = transitions.get((from_label, to_label), 0.0)
+def _nbest_viterbi_init(emission_row):
+    """DP cells for t=0: emission score only, no transition."""
+    return [[(score, None)] for score in emission_row]
 
-    # DP table: dp[t][label_idx] = list of (score, backpointer) tuples
-    # where backpointer = (prev_label_idx, prev_rank) or None for t=0
-    # We keep top N entries per cell
-    dp = [[[] for _ in range(n_labels)] for _ in range(n_positions)]
 
-    # Initialize t=0: emission score only, no transition
-    for label_idx in range(n_labels):
-        score = emission[0][label_idx]
-        dp[0][label_idx].append((score, None))
+def _nbest_viterbi_step(prev_cells, trans, emission_row, n_best):
+    """Extend the N-best DP by one position (pure Python).
 
-    # Forward pass
-    for t in range(1, n_positions):
-        for curr_label in range(n_labels):
-            # Collect all candidates from previous position
-            candidates = []
-            for prev_label in range(n_labels):
-                for rank, (prev_score, _) in enumerate(dp[t-1][prev_label]):
-                    # Score = previous path score + transition + emission
-                    score = prev_score + trans[prev_label][curr_label] + emission[t][curr_label]
-                    candidates.append((score, (prev_label, rank)))
-
-            # Sort by score descending and keep top N
-            candidates.sort(key=lambda x: x[0], reverse=True)
-            dp[t][curr_label] = candidates[:n_best]
+    Args:
+        prev_cells: DP cells at t-1: prev_cells[label_idx] = list of (score, backpointer)
+        trans: Dense transition matrix trans[from_idx][to_idx]
+        emission_row: Emission scores at t, one per label
+        n_best: Number of paths to keep per cell
 
+    Returns:
+        DP cells at t, where backpointer = (prev_label_idx, prev_rank)
+    """
+    cells = []
+    for curr_label, emission_score in enumerate(emission_row):
+        # Collect all candidates from previous position
+        candidates = []
+        for prev_label, prev_cell in enumerate(prev_cells):
+            trans_score = trans[prev_label][curr_label]
+            for rank, (prev_score, _) in enumerate(prev_cell):
+                # Score = previous path score + transition + emission
+                candidates.append((prev_score + trans_score + emission_score, (prev_label, rank)))
+
+        # Sort by score descending and keep top N
+        candidates.sort(key=lambda x: x[0], reverse=True)
+        cells.append(candidates[:n_best])
+    return cells
+
+
+def _nbest_viterbi_backtrack(dp, labels, n_best):
+    """Recover the N best label sequences from a completed DP table."""
     # Collect final candidates from all labels at last position
     final_candidates = []
-    for label_idx in range(n_labels):
-        for rank, (score, backptr) in enumerate(dp[n_positions-1][label_idx]):
+    for label_idx, cell in enumerate(dp[-1]):
+        for rank, (score, _) in enumerate(cell):
             final_candidates.append((score, label_idx, rank))
 
     # Sort by score descending and keep top N
@@ -790,7 +983,7 @@ def crf_nbest_viterbi(emission, transitions, labels, n_best=5):
         curr_label = final_label
         curr_rank = final_rank
 
-        for t in range(n_positions - 1, 0, -1):
+        for t in range(len(dp) - 1, 0, -1):
             _, backptr = dp[t][curr_label][curr_rank]
             if backptr is None:
                 break
@@ -809,13 +1002,505 @@ def crf_nbest_viterbi(emission, transitions, labels, n_best=5):
     return results
 
 
+def crf_nbest_viterbi(emission, transitions, labels, n_best=5):
+    """Run N-best Viterbi algorithm to find top-N label sequences.
+
+    Args:
+        emission: 2D list emission[t][label_idx] = emission score
+        transitions: Dict of (from_label, to_label) → weight, or a dense
+                     matrix transitions[from_idx][to_idx] (CRFModel.transitions)
+        labels: List of label strings
+        n_best: Number of best sequences to return
+
+    Returns:
+        List of (labels_list, score) tuples, sorted by score descending.
+        Each labels_list is a list of label strings for each position.
+    """
+    if len(emission) == 0:
+        return []
+
+    # Build transition matrix: trans[from_idx][to_idx] = score
+    trans = _dense_transitions(transitions, labels)
+
+    # DP table: dp[t][label_idx] = list of (score, backpointer) tuples
+    # where backpointer = (prev_label_idx, prev_rank) or None for t=0
+    # We keep top N entries per cell
+    dp = [_nbest_viterbi_init(emission[0])]
+
+    # Forward pass
+    for t in range(1, len(emission)):
+        dp.append(_nbest_viterbi_step(dp[t-1], trans, emission[t], n_best))
+
+    return _nbest_viterbi_backtrack(dp, labels, n_best)
+
+
+# Above this many (prev_label × rank) candidates per cell, crf_nbest_viterbi_numpy()
+# switches from a full column sort to np.argpartition() partial selection.
+_VITERBI_PARTIAL_SELECT_MIN = 128
+
+
+def _nbest_viterbi_init_numpy(emission_row, k):
+    """Score array for t=0: each label has a single path, the rest are -inf."""
+    scores = np.full((len(emission_row), k), -np.inf)
+    scores[:, 0] = emission_row
+    return scores
+
+
+def _nbest_viterbi_step_numpy(scores, transition_matrix, emission_row, k):
+    """Extend the N-best DP by one position (NumPy).
+
+    Args:
+        scores: (n_labels × k) path scores at t-1, -inf for missing paths
+        transition_matrix: (n_labels × n_labels) array, [from_idx, to_idx]
+        emission_row: Emission scores at t, one per label
+        k: Number of paths to keep per cell
+
+    Returns:
+        tuple: (scores, backptr) at t, both (n_labels × k); backptr holds
+               flat indices prev_label * k + prev_rank
+    """
+    n_labels = scores.shape[0]
+    # cand[prev_label * k + rank, curr_label]
+    cand = (scores[:, :, None] + transition_matrix[:, None, :]).reshape(n_labels * k, n_labels)
+    cand += emission_row
+    neg = -cand
+    if cand.shape[0] > _VITERBI_PARTIAL_SELECT_MIN:
+        # Wide beam: partial selection, then sort only the N survivors
+        top = np.argpartition(neg, k - 1, axis=0)[:k]
+        order = np.argsort(np.take_along_axis(neg, top, axis=0), axis=0, kind='stable')
+        top = np.take_along_axis(top, order, axis=0)
+    else:
+        # Narrow beam: one stable column sort is cheaper than the extra calls
+        top = np.argsort(neg, axis=0, kind='stable')[:k]
+    return np.take_along_axis(cand, top, axis=0).T.copy(), top.T.copy()
+
+
+def _nbest_viterbi_backtrack_numpy(scores, backptrs, labels, k):
+    """Recover the N best label sequences from the final scores and backpointers.
+
+    Args:
+        scores: (n_labels × k) path scores at the last position
+        backptrs: List of backpointer arrays for positions 1..n-1
+        labels: List of label strings
+        k: Number of best sequences to return
+    """
+    flat = scores.ravel()
+    n_final = min(k, flat.size)
+    final = np.argpartition(-flat, n_final - 1)[:n_final]
+    final = final[np.argsort(-flat[final], kind='stable')]
+
+    results = []
+    for flat_idx in final:
+        final_score = flat[flat_idx]
+        if not np.isfinite(final_score):
+            break
+        curr_label, curr_rank = divmod(int(flat_idx), k)
+        path = [curr_label]
+        for backptr in reversed(backptrs):
+            curr_label, curr_rank = divmod(int(backptr[curr_label, curr_rank]), k)
+            path.append(curr_label)
+        path.reverse()
+        results.append(([labels[idx] for idx in path], float(final_score)))
+
+    return results
+
+
+def crf_nbest_viterbi_numpy(emission, transition_matrix, labels, n_best=5):
+    """Vectorized N-best Viterbi; same results as crf_nbest_viterbi().
+
+    The k-best forward pass keeps, for every (position, label) cell, the N
+    best path scores in an (n_labels × N) array (missing paths are -inf).
+    At each step all (prev_label, rank) → curr_label extensions are formed by
+    broadcasting, and the N best per label are chosen with array operations
+    (np.argpartition() followed by a sort of only those N entries when the
+    beam is wide) instead of fully sorting a Python list of every candidate.
+
+    各 (位置, ラベル) セルについて上位 N 個のパススコアを
+    (n_labels × N) 配列で保持し（存在しないパスは -inf）、各ステップで
+    ブロードキャストにより全ての拡張を作り、配列演算で上位 N 個を選ぶ
+    （ビームが広い場合は np.argpartition() で部分選択してから N 個だけを並べ替える）。
+
+    Requires NumPy.
+
+    Args:
+        emission: np.ndarray (n_positions × n_labels), from CRFModel.emission_array()
+        transition_matrix: np.ndarray (n_labels × n_labels), [from_idx, to_idx]
+        labels: List of label strings
+        n_best: Number of best sequences to return
+
+    Returns:
+        List of (labels_list, score) tuples, sorted by score descending.
+        Each labels_list is a list of label strings for each position.
+    """
+    if len(emission) == 0 or n_best <= 0:
+        return []
+
+    scores = _nbest_viterbi_init_numpy(emission[0], n_best)
+    backptrs = []
+    for t in range(1, len(emission)):
+        scores, backptr = _nbest_viterbi_step_numpy(scores, transition_matrix, emission[t], n_best)
+        backptrs.append(backptr)
+
+    return _nbest_viterbi_backtrack_numpy(scores, backptrs, labels, n_best)
+
+
+class CRFLattice:
+    """Incremental N-best CRF predictor for a yomi that grows at the end.
+    末尾に伸びていく読みのためのインクリメンタルN-best CRF予測器。
+
+    While the user types in BUNSETSU state, each prediction is for the
+    previous yomi plus a few characters. The features at position t depend
+    only on the tokens t-2..t+2 (char / bigram / trigram windows; the
+    dictionary-derived features look at the token itself), and the forward
+    DP at t depends only on the DP at t-1 and the emission at t. So when the
+    new token sequence shares its first c tokens with the previous one,
+    everything before position c-2 is still valid: only features, emission
+    rows and DP cells from there on are recomputed, and the lattice is
+    extended. Prediction cost scales with the characters added, not with the
+    sentence length.
+
+    文節モードでの入力中、各予測は直前の読みに数文字を加えたものになる。
+    位置tの特徴量はトークンt-2..t+2のみに依存し、前向きDPはt-1のDPと
+    tの発射スコアのみに依存する。そのため新しいトークン列が前回と先頭c個を
+    共有する場合、位置c-2より前はそのまま有効であり、そこから先だけを
+    再計算してラティスを延長する。
+
+    Not thread-safe: callers serialize access (HenkanProcessor holds a lock).
+
+    Attributes:
+        model: CRFModel the lattice was built for
+        n_best: Number of paths kept per cell
+        dict_materials: Feature materials passed to add_features_per_line()
+        tokens: Tokens of the last predicted input
+        reused_positions: Positions reused from the previous call (for stats)
+    """
+
+    # Features at t look at most this many tokens to the right
+    FEATURE_WINDOW = 2
+
+    def __init__(self, model, n_best=5, dict_materials=None):
+        self.model = model
+        self.n_best = n_best
+        self.dict_materials = dict_materials
+        self._vectorized = model.weight_matrix is not None
+        self.reused_positions = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the cached lattice; the next predict() starts from scratch."""
+        self.tokens = []
+        self._features = []
+        self._emission = []
+        # Python: DP cells per position. NumPy: score arrays per position.
+        self._states = []
+        # NumPy only: backpointer arrays for positions 1..n-1
+        self._backptrs = []
+        # paths() only: per-position best prefix scores and emission rows as
+        # tuples, converted once per position and shared by every snapshot
+        self._viterbi_rows = []
+        self._emission_rows = []
+
+    def is_compatible(self, model, n_best, dict_materials):
+        """Whether this lattice can be reused for the given prediction settings."""
+        return (self.model is model and self.n_best == n_best
+                and self.dict_materials is dict_materials)
+
+    def _update(self, tokens):
+        """Bring features and emission up to date for tokens.
+
+        Forward DP cells past the reused prefix are dropped; predict()
+        extends them again from len(self._states).
+        """
+        # Longest common token prefix with the previous input
+        common = 0
+        limit = min(len(tokens), len(self.tokens))
+        while common < limit and tokens[common] == self.tokens[common]:
+            common += 1
+        start = max(0, common - self.FEATURE_WINDOW)
+        self.reused_positions = start
+
+        # Features: the right-context features of the tail changed, so rebuild
+        # from `start`, giving add_features_per_line() the left context it needs
+        context = max(0, start - self.FEATURE_WINDOW)
+        timing = latency.enabled
+        if timing:
+            started = time.perf_counter_ns()
+        tail_features = add_features_per_line(tokens[context:], self.dict_materials)[start - context:]
+        self._features[start:] = tail_features
+
+        if self._vectorized:
+            tail_emission = list(self.model.emission_array(tail_features))
+        else:
+            tail_emission = self.model.emission_scores(tail_features)
+        self._emission[start:] = tail_emission
+        if timing:
+            latency.add('henkan.crf_features', time.perf_counter_ns() - started)
+        self.tokens = tokens
+
+        del self._states[start:]
+        del self._viterbi_rows[start:]
+        del self._emission_rows[start:]
+        if self._vectorized:
+            del self._backptrs[max(0, start - 1):]
+
+    def _extend(self, tokens):
+        """Update for tokens and extend the forward DP past the cells still valid."""
+        self._update(tokens)
+        if not latency.enabled:
+            self._forward(len(tokens))
+            return
+        started = time.perf_counter_ns()
+        self._forward(len(tokens))
+        latency.add('henkan.crf_viterbi', time.perf_counter_ns() - started)
+
+    def _forward(self, length):
+        """Extend the forward DP cells up to position length - 1."""
+        if self._vectorized:
+            for t in range(len(self._states), length):
+                if t == 0:
+                    self._states.append(_nbest_viterbi_init_numpy(self._emission[0], self.n_best))
+                    continue
+                scores, backptr = _nbest_viterbi_step_numpy(
+                    self._states[t - 1], self.model.transition_matrix, self._emission[t], self.n_best)
+                self._states.append(scores)
+                self._backptrs.append(backptr)
+            return
+
+        for t in range(len(self._states), length):
+            if t == 0:
+                self._states.append(_nbest_viterbi_init(self._emission[0]))
+                continue
+            self._states.append(_nbest_viterbi_step(
+                self._states[t - 1], self.model.transitions, self._emission[t], self.n_best))
+
+    def predict(self, input_text):
+        """Predict the N best label sequences for input_text, reusing the lattice.
+
+        Returns:
+            Same as crf_nbest_predict(): list of (labels_list, score) tuples.
+        """
+        tokens = tokenize_line(input_text)
+        if not tokens or self.n_best <= 0:
+            self.reset()
+            return []
+        self._extend(tokens)
+        if self._vectorized:
+            return _nbest_viterbi_backtrack_numpy(
+                self._states[-1], self._backptrs, self.model.labels, self.n_best)
+        return _nbest_viterbi_backtrack(self._states, self.model.labels, self.n_best)
+
+    def paths(self, input_text):
+        """Enumerate the label sequences of input_text lazily, best first.
+
+        Only the forward DP is run (a lattice with n_best=1 is enough); the
+        returned CRFPathStream produces the 1st, 2nd, ... best sequences on
+        demand. It holds a snapshot of the lattice, so it stays valid after
+        the lattice moves on to other input.
+
+        The rows the stream reads are converted once per position and kept
+        until that position changes, like the DP cells; a snapshot only
+        copies the references to them.
+        ストリームが読む行は位置ごとに一度だけ変換され、DPセルと同様にその
+        位置が変わるまで保持される。スナップショットはその参照をコピーするだけ。
+
+        Returns:
+            CRFPathStream yielding (labels_list, score) tuples.
+        """
+        tokens = tokenize_line(input_text)
+        if not tokens:
+            self.reset()
+            return CRFPathStream((), (), self.model.transitions, self.model.labels)
+        self._extend(tokens)
+        for t in range(len(self._viterbi_rows), len(tokens)):
+            if self._vectorized:
+                self._viterbi_rows.append(tuple(self._states[t].max(axis=1).tolist()))
+                self._emission_rows.append(tuple(self._emission[t].tolist()))
+            else:
+                self._viterbi_rows.append(tuple(max(score for score, _ in cell)
+                                                for cell in self._states[t]))
+                self._emission_rows.append(tuple(self._emission[t]))
+        return CRFPathStream(tuple(self._viterbi_rows), tuple(self._emission_rows),
+                             self.model.transitions, self.model.labels)
+
+    def marginals(self, input_text):
+        """Per-position label marginals for input_text, reusing the emission.
+
+        Returns:
+            Same as crf_marginals(): marginals[t][label_idx]; [] for empty input.
+        """
+        tokens = tokenize_line(input_text)
+        if not tokens:
+            self.reset()
+            return []
+        self._update(tokens)
+        if self._vectorized:
+            return crf_marginals_numpy(np.array(self._emission), self.model.transition_matrix).tolist()
+        return crf_marginals(self._emission, self.model.transitions)
+
+
+class CRFPathStream:
+    """Lazy k-best label sequences: forward Viterbi plus backward A* search.
+    遅延k-bestラベル列: 前向きViterbiと後ろ向きA*探索。
+
+    The forward Viterbi pass gives viterbi[t][j], the EXACT best score of
+    any prefix ending with label j at position t. Searching backwards from
+    the last position, a partial path covering positions t..n-1 is ranked by
+    viterbi[t][j] plus its own (suffix) score, i.e. by the best complete
+    path it can still become. With this exact heuristic the A* search pops
+    complete paths in descending score order, one next() at a time, so the
+    2nd, 3rd, ... best paths cost nothing until somebody asks for them.
+
+    前向きViterbiは viterbi[t][j]（位置tでラベルjに終わる接頭辞の正確な
+    最良スコア）を与える。最終位置から後ろ向きに探索し、位置t..n-1を覆う
+    部分パスを viterbi[t][j] と自身（接尾辞）のスコアの和、つまり
+    なり得る最良の完全パスで順位付けする。この正確なヒューリスティックに
+    より、A*は完全パスをスコア降順に1つずつ取り出すため、2番目以降の
+    パスは要求されるまでコストがかからない。
+
+    Iterating yields (labels_list, score) tuples, like crf_nbest_viterbi().
+    Not thread-safe.
+    """
+
+    __slots__ = ('_viterbi', '_emission', '_transitions', '_labels', '_heap', '_counter')
+
+    def __init__(self, viterbi, emission, transitions, labels):
+        """
+        Args:
+            viterbi: viterbi[t][label_idx], best prefix scores (2D sequence)
+            emission: emission[t][label_idx] (2D sequence)
+            transitions: Dense transition matrix trans[from_idx][to_idx]
+            labels: List of label strings
+        """
+        self._viterbi = viterbi
+        self._emission = emission
+        self._transitions = transitions
+        self._labels = labels
+        self._counter = 0
+        # Entries: (-priority, tie-breaker, t, label_idx, suffix score, path)
+        # where path is the linked list (label_idx, rest) of positions t+1..
+        self._heap = []
+        if emission:
+            for j, score in enumerate(viterbi[-1]):
+                if score != float('-inf'):
+                    self._push(score, len(emission) - 1, j, 0.0, None)
+
+    def _push(self, priority, t, label_idx, suffix, path):
+        self._counter += 1
+        heapq.heappush(self._heap, (-priority, self._counter, t, label_idx, suffix, path))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        heap = self._heap
+        while heap:
+            neg_priority, _, t, j, suffix, path = heapq.heappop(heap)
+            path = (j, path)
+            if t == 0:
+                sequence = []
+                while path is not None:
+                    sequence.append(self._labels[path[0]])
+                    path = path[1]
+                return sequence, -neg_priority
+
+            suffix += self._emission[t][j]
+            prev = self._viterbi[t - 1]
+            for i, prefix in enumerate(prev):
+                if prefix != float('-inf'):
+                    score = suffix + self._transitions[i][j]
+                    self._push(prefix + score, t - 1, i, score, path)
+        raise StopIteration
+
+
+def _logsumexp(values):
+    """log(sum(exp(v) for v in values)) without overflow."""
+    peak = max(values)
+    if peak == float('-inf'):
+        return peak
+    return peak + math.log(sum(math.exp(v - peak) for v in values))
+
+
+def crf_marginals(emission, transitions):
+    """Compute per-position label marginals with the forward-backward algorithm.
+
+    Where Viterbi gives the single best label sequence, the marginal
+    P(label at t | input) sums over ALL sequences. It tells how confident the
+    model is about each position, e.g. how likely a bunsetsu starts there,
+    which the lattice decoder in henkan.py combines with dictionary counts.
+
+    Viterbi が最良のラベル列を1つ与えるのに対し、周辺確率
+    P(位置tのラベル | 入力) は全ての系列について和を取る。各位置に対する
+    モデルの確信度（そこで文節が始まる確からしさなど）を表し、henkan.py の
+    ラティスデコーダが辞書カウントと組み合わせる。
+
+    Args:
+        emission: 2D list, emission[t][label_idx]
+        transitions: Dense transition matrix trans[from_idx][to_idx]
+
+    Returns:
+        2D list: marginals[t][label_idx], each row summing to 1
+    """
+    if len(emission) == 0:
+        return []
+    n_labels = len(emission[0])
+    labels = range(n_labels)
+
+    alpha = [list(emission[0])]
+    for t in range(1, len(emission)):
+        prev = alpha[-1]
+        alpha.append([_logsumexp([prev[i] + transitions[i][j] for i in labels]) + emission[t][j]
+                      for j in labels])
+
+    beta = [[0.0] * n_labels]
+    for t in range(len(emission) - 1, 0, -1):
+        nxt = beta[0]
+        beta.insert(0, [_logsumexp([transitions[i][j] + emission[t][j] + nxt[j] for j in labels])
+                        for i in labels])
+
+    log_z = _logsumexp(alpha[-1])
+    return [[math.exp(a[j] + b[j] - log_z) for j in labels] for a, b in zip(alpha, beta)]
+
+
+def crf_marginals_numpy(emission, transition_matrix):
+    """Vectorized crf_marginals(). Requires NumPy.
+
+    Args:
+        emission: np.ndarray (n_positions × n_labels)
+        transition_matrix: np.ndarray (n_labels × n_labels), [from_idx, to_idx]
+
+    Returns:
+        np.ndarray (n_positions × n_labels) of marginals
+    """
+    n = len(emission)
+    if n == 0:
+        return np.zeros((0, transition_matrix.shape[0]))
+
+    def logsumexp(a, axis):
+        peak = np.max(a, axis=axis, keepdims=True)
+        peak = np.where(np.isfinite(peak), peak, 0.0)
+        return np.squeeze(peak, axis=axis) + np.log(np.sum(np.exp(a - peak), axis=axis))
+
+    alpha = np.empty_like(emission)
+    beta = np.zeros_like(emission)
+    alpha[0] = emission[0]
+    for t in range(1, n):
+        alpha[t] = logsumexp(alpha[t - 1][:, None] + transition_matrix, axis=0) + emission[t]
+    for t in range(n - 1, 0, -1):
+        beta[t - 1] = logsumexp(transition_matrix + (emission[t] + beta[t])[None, :], axis=1)
+
+    log_z = logsumexp(alpha[-1], axis=0)
+    return np.exp(alpha + beta - log_z)
+
+
 def crf_nbest_predict(tagger, input_text, n_best=5, dict_materials=None):
     """Run N-best CRF prediction on input text.
 
     This is the main entry point for N-best bunsetsu prediction.
 
     Args:
-        tagger: pycrfsuite.Tagger with model already opened
+        tagger: CRFModel from compile_crf_model() (preferred: compiled once
+                and reused), or a pycrfsuite.Tagger with model already opened
+                (compiled on the fly for this call)
         input_text: Input string (hiragana text to segment)
         n_best: Number of best sequences to return
         dict_materials: Optional dict from load_crf_feature_materials().
@@ -828,24 +1513,24 @@ def crf_nbest_predict(tagger, input_text, n_best=5, dict_materials=None):
 
         Returns empty list if input is empty or has no tokens.
     """
-    # Get model information
-    info = tagger.info()
-    labels = tagger.labels()
-    state_features = info.state_features
-    transitions = info.transitions
-
     # Tokenize and extract features
     tokens = tokenize_line(input_text)
     if not tokens:
         return []
 
-    features = add_features_per_line(input_text, dict_materials)
+    # Get model information
+    model = tagger if isinstance(tagger, CRFModel) else CRFModel.from_tagger(tagger)
 
-    # Compute emission scores
-    emission = crf_compute_emission_scores(features, state_features, labels)
+    features = add_features_per_line(tokens, dict_materials)
 
-    # Run N-best Viterbi
-    results = crf_nbest_viterbi(emission, transitions, labels, n_best)
+    if model.weight_matrix is not None:
+        # Vectorized path (NumPy available)
+        emission = model.emission_array(features)
+        results = crf_nbest_viterbi_numpy(emission, model.transition_matrix, model.labels, n_best)
+    else:
+        # Pure-Python fallback
+        emission = model.emission_scores(features)
+        results = crf_nbest_viterbi(emission, model.transitions, model.labels, n_best)
 
     return results
 
@@ -1196,6 +1881,22 @@ def get_user_dictionaries_dir():
     return os.path.join(get_user_config_dir(), 'dictionaries')
 
 
+def get_dictionary_snapshot_path():
+    """
+    Return the path of the merged dictionary snapshot.
+    マージ済み辞書スナップショットのパスを返す。
+
+    HenkanProcessor persists the already-merged system, imported and extended
+    dictionaries here (see compiled_dictionary.write_snapshot), so that the
+    merge only has to be redone when one of the source files changes.
+    HenkanProcessorはマージ済みのシステム・インポート・拡張辞書をここに保存し、
+    ソースファイルのいずれかが変更された時のみマージをやり直す。
+
+    Typically: $HOME/.config/ibus-pskk/merged_dictionary.bin
+    """
+    return os.path.join(get_user_config_dir(), 'merged_dictionary.bin')
+
+
 def get_dictionary_files(config=None):
     """
     Obtain the list of JSON dictionary file paths to be used for kana-kanji conversion.
@@ -1257,6 +1958,15 @@ def get_dictionary_files(config=None):
     return dictionary_files
 
 
+def get_crf_feature_materials_path():
+    """Return the canonical path to the CRF feature materials file.
+
+    Returns:
+        str: Path to crf_feature_materials.json in the user config directory
+    """
+    return os.path.join(get_user_config_dir(), 'crf_feature_materials.json')
+
+
 def generate_crf_feature_materials(output_path=None):
     """Pre-compute dictionary-derived CRF feature materials and save as JSON.
 
@@ -1280,8 +1990,7 @@ def generate_crf_feature_materials(output_path=None):
         str: Path to the written JSON file, or None on failure.
     """
     if output_path is None:
-        output_path = os.path.join(get_user_config_dir(),
-                                   'crf_feature_materials.json')
+        output_path = get_crf_feature_materials_path()
 
     # Load and merge all dictionaries (same logic as HenkanProcessor)
     dictionary_files = get_dictionary_files()
@@ -1364,8 +2073,7 @@ def load_crf_feature_materials(path=None):
               the file is missing or invalid.
     """
     if path is None:
-        path = os.path.join(get_user_config_dir(),
-                            'crf_feature_materials.json')
+        path = get_crf_feature_materials_path()
     if not os.path.exists(path):
         logger.debug(f'CRF feature materials not found: {path}')
         return {}
@@ -1750,6 +2458,8 @@ def generate_system_dictionary(output_path=None, source_weights=None):
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(merged_dictionary, f, ensure_ascii=False, indent=2)
         logger.info(f'Generated system dictionary: {output_path}')
+        # Compile alongside the JSON so HenkanProcessor can mmap it
+        compiled_dictionary.compile_json_dictionary(output_path, merged_dictionary)
         logger.info(f'Stats: {stats["files_processed"]} files, {stats["total_readings"]} readings, '
                    f'{stats["total_candidates"]} candidates, '
                    f'{stats["okurigana_entries_expanded"]} okurigana entries expanded')
@@ -1881,6 +2591,8 @@ def generate_user_dictionary(output_path=None, source_weights=None):
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(merged_dictionary, f, ensure_ascii=False, indent=2)
         logger.info(f'Generated user dictionary: {output_path}')
+        # Compile alongside the JSON so HenkanProcessor can mmap it
+        compiled_dictionary.compile_json_dictionary(output_path, merged_dictionary)
         logger.info(f'Stats: {stats["files_processed"]} files, {stats["total_readings"]} readings, {stats["total_candidates"]} candidates')
         return True, output_path, stats
     except Exception as e:
@@ -2122,6 +2834,8 @@ def generate_extended_dictionary(config=None, source_paths=None):
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(extended_dict, f, ensure_ascii=False, indent=2)
         logger.info(f'Generated extended dictionary: {output_path}')
+        # Compile alongside the JSON so HenkanProcessor can mmap it
+        compiled_dictionary.compile_json_dictionary(output_path, extended_dict)
         return True, output_path, stats
     except Exception as e:
         logger.error(f'Failed to write extended dictionary: {e}')
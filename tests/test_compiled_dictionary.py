@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled (memory-mapped) dictionary format.
+
+Tests cover:
+- Round-trip of readings and candidates through compile/open
+- Candidate ordering (count descending) and legacy cost entries
+- Freshness check against the source JSON fingerprint
+- Rejection of invalid files
+- Merged snapshots keyed by source fingerprints
+- Prefix queries over the mapped reading index
+"""
+
+import json
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+import compiled_dictionary
+from compiled_dictionary import CompiledDictionary
+
+
+SAMPLE = {
+    'へんかん': {'返還': 50, '変換': 100, '編纂': 10},
+    'きょう': {'今日': 200, '京': 80},
+    'a': {'A': 1},
+    'あい': {'愛': 5, '相': 3.5},
+}
+
+
+@pytest.fixture
+def compiled_path(tmp_path):
+    path = str(tmp_path / 'sample.bin')
+    assert compiled_dictionary.compile_dictionary(SAMPLE, path, metadata={'k': 'v'})
+    return path
+
+
+class TestCompileAndLookup:
+    """Tests for compile_dictionary() and CompiledDictionary lookups."""
+
+    def test_lookup_returns_candidates_sorted_by_count(self, compiled_path):
+        with CompiledDictionary(compiled_path) as d:
+            assert d.lookup('へんかん') == (('変換', 100), ('返還', 50), ('編纂', 10))
+
+    def test_missing_reading(self, compiled_path):
+        with CompiledDictionary(compiled_path) as d:
+            assert d.lookup('ない') is None
+            assert 'ない' not in d
+            assert d.get('ない', {}) == {}
+
+    def test_contains_and_len(self, compiled_path):
+        with CompiledDictionary(compiled_path) as d:
+            assert len(d) == 4
+            assert d.candidate_count == 8
+            for reading in SAMPLE:
+                assert reading in d
+
+    def test_float_and_int_counts_preserved(self, compiled_path):
+        with CompiledDictionary(compiled_path) as d:
+            counts = d.get('あい')
+            assert counts == {'愛': 5, '相': 3.5}
+            assert isinstance(counts['愛'], int)
+
+    def test_items_round_trip(self, compiled_path):
+        with CompiledDictionary(compiled_path) as d:
+            assert dict(d.items()) == SAMPLE
+            readings = list(d.readings())
+            assert readings == sorted(readings, key=lambda r: r.encode('utf-8'))
+
+    def test_metadata(self, compiled_path):
+        with CompiledDictionary(compiled_path) as d:
+            assert d.metadata == {'k': 'v'}
+
+    def test_legacy_cost_entries(self, tmp_path):
+        path = str(tmp_path / 'legacy.bin')
+        legacy = {'か': {'可': {'POS': '名詞', 'cost': 10}, '化': {'POS': '名詞', 'cost': 2}}}
+        assert compiled_dictionary.compile_dictionary(legacy, path)
+        with CompiledDictionary(path) as d:
+            assert d.lookup('か') == (('化', -2), ('可', -10))
+
+    def test_empty_dictionary(self, tmp_path):
+        path = str(tmp_path / 'empty.bin')
+        assert compiled_dictionary.compile_dictionary({}, path)
+        with CompiledDictionary(path) as d:
+            assert len(d) == 0
+            assert d.lookup('あ') is None
+
+
+class TestPrefixSearch:
+    """Tests for common_prefix_search() and predictive_search()."""
+
+    READINGS = {'き': {'木': 1}, 'きょ': {'居': 1}, 'きょう': {'今日': 1},
+                'きょうと': {'京都': 1}, 'きり': {'霧': 1}}
+
+    @pytest.fixture
+    def prefix_path(self, tmp_path):
+        path = str(tmp_path / 'prefix.bin')
+        assert compiled_dictionary.compile_dictionary(self.READINGS, path)
+        return path
+
+    def test_common_prefix_search(self, prefix_path):
+        with CompiledDictionary(prefix_path) as d:
+            assert d.common_prefix_search('きょうは') == ['き', 'きょ', 'きょう']
+            assert d.common_prefix_search('あ') == []
+
+    def test_predictive_search(self, prefix_path):
+        with CompiledDictionary(prefix_path) as d:
+            assert d.predictive_search('きょ') == ['きょ', 'きょう', 'きょうと']
+            assert d.predictive_search('き', limit=2) == ['き', 'きょ']
+            assert d.predictive_search('ん') == []
+
+
+class TestInvalidFiles:
+    """Tests for rejection of files that are not compiled dictionaries."""
+
+    def test_bad_magic(self, tmp_path):
+        path = tmp_path / 'bad.bin'
+        path.write_bytes(b'\0' * 64)
+        with pytest.raises(ValueError):
+            CompiledDictionary(str(path))
+
+    def test_too_small(self, tmp_path):
+        path = tmp_path / 'small.bin'
+        path.write_bytes(b'PSKK')
+        with pytest.raises(ValueError):
+            CompiledDictionary(str(path))
+
+
+class TestFreshness:
+    """Tests for compile_json_dictionary() and open_compiled_for()."""
+
+    def _write_json(self, path, data):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def test_compiled_path_sibling(self):
+        assert compiled_dictionary.get_compiled_path('/x/system_dictionary.json') == \
+            '/x/system_dictionary.bin'
+
+    def test_fresh_compiled_file_is_opened(self, tmp_path):
+        json_path = str(tmp_path / 'dict.json')
+        self._write_json(json_path, SAMPLE)
+        assert compiled_dictionary.compile_json_dictionary(json_path)
+
+        compiled = compiled_dictionary.open_compiled_for(json_path)
+        assert compiled is not None
+        assert compiled.lookup('きょう') == (('今日', 200), ('京', 80))
+        compiled.close()
+
+    def test_stale_compiled_file_is_ignored(self, tmp_path):
+        json_path = str(tmp_path / 'dict.json')
+        self._write_json(json_path, SAMPLE)
+        assert compiled_dictionary.compile_json_dictionary(json_path)
+
+        self._write_json(json_path, {'きょう': {'京': 1}})
+        st = os.stat(json_path)
+        os.utime(json_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert compiled_dictionary.open_compiled_for(json_path) is None
+
+    def test_missing_compiled_file(self, tmp_path):
+        json_path = str(tmp_path / 'dict.json')
+        self._write_json(json_path, SAMPLE)
+        assert compiled_dictionary.open_compiled_for(json_path) is None
+
+
+class TestSnapshot:
+    """Tests for write_snapshot() and open_snapshot()."""
+
+    def _sources(self, tmp_path):
+        paths = []
+        for name, data in (('a.json', {'か': {'可': 1}}), ('b.json', {'か': {'化': 2}})):
+            path = str(tmp_path / name)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            paths.append(path)
+        return paths
+
+    def _write(self, tmp_path, paths):
+        snapshot_path = str(tmp_path / 'merged.bin')
+        fingerprints = [compiled_dictionary.content_fingerprint(p) for p in paths]
+        merged = {'か': {'化': 2, '可': 1}}
+        assert compiled_dictionary.write_snapshot(merged, snapshot_path, fingerprints)
+        return snapshot_path
+
+    def test_matching_snapshot_is_opened(self, tmp_path):
+        paths = self._sources(tmp_path)
+        snapshot_path = self._write(tmp_path, paths)
+
+        snapshot = compiled_dictionary.open_snapshot(snapshot_path, paths)
+        assert snapshot is not None
+        assert snapshot.lookup('か') == (('化', 2), ('可', 1))
+        snapshot.close()
+
+    def test_touched_but_identical_source_still_matches(self, tmp_path):
+        paths = self._sources(tmp_path)
+        snapshot_path = self._write(tmp_path, paths)
+
+        st = os.stat(paths[0])
+        os.utime(paths[0], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        snapshot = compiled_dictionary.open_snapshot(snapshot_path, paths)
+        assert snapshot is not None
+        snapshot.close()
+
+    def test_modified_source_invalidates(self, tmp_path):
+        paths = self._sources(tmp_path)
+        snapshot_path = self._write(tmp_path, paths)
+
+        with open(paths[1], 'w', encoding='utf-8') as f:
+            json.dump({'か': {'化': 3}}, f, ensure_ascii=False)
+        st = os.stat(paths[1])
+        os.utime(paths[1], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert compiled_dictionary.open_snapshot(snapshot_path, paths) is None
+
+    def test_different_source_list_invalidates(self, tmp_path):
+        paths = self._sources(tmp_path)
+        snapshot_path = self._write(tmp_path, paths)
+
+        assert compiled_dictionary.open_snapshot(snapshot_path, paths[:1]) is None
+        assert compiled_dictionary.open_snapshot(snapshot_path, paths[::-1]) is None
+
+    def test_missing_fingerprint_is_not_written(self, tmp_path):
+        snapshot_path = str(tmp_path / 'merged.bin')
+        assert not compiled_dictionary.write_snapshot({}, snapshot_path, [None])
+        assert not os.path.exists(snapshot_path)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the append-only user dictionary journal.
+
+Tests cover:
+- Replaying add/set/raise/remove records on top of the snapshot
+- Torn and malformed journal lines
+- Stale journals left by an interrupted compaction
+- Compaction past the size threshold and full snapshot writes
+- Loads not torn by a concurrent compaction
+"""
+
+import json
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+import dictionary_journal
+
+
+@pytest.fixture
+def dictionary_path(tmp_path):
+    path = tmp_path / 'user_dictionary.json'
+    path.write_text(json.dumps({'たなか': {'田中': 3}}, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+class TestReplay:
+    """Tests for append() and load()."""
+
+    def test_records_are_replayed_on_snapshot(self, dictionary_path):
+        assert dictionary_journal.append(dictionary_path, [
+            ('add', 'たなか', '田中', 2),
+            ('add', 'きょう', '京', 1),
+            ('set', 'きょう', '京', 5),
+            ('raise', 'きょう', '京', 4),
+            ('raise', 'きょう', '今日', 7),
+            ('remove', 'たなか', '田中'),
+        ])
+        assert dictionary_journal.load(dictionary_path) == {'きょう': {'京': 5, '今日': 7}}
+        # The snapshot itself is not rewritten
+        with open(dictionary_path, encoding='utf-8') as f:
+            assert json.load(f) == {'たなか': {'田中': 3}}
+
+    def test_missing_snapshot_is_created(self, tmp_path):
+        path = str(tmp_path / 'new' / 'user_dictionary.json')
+        assert dictionary_journal.load(path) == {}
+        assert dictionary_journal.append(path, [('add', 'あめ', '雨', 1)])
+        assert os.path.exists(path)
+        assert dictionary_journal.load(path) == {'あめ': {'雨': 1}}
+
+    def test_torn_and_malformed_lines_are_skipped(self, dictionary_path):
+        dictionary_journal.append(dictionary_path, [('add', 'あめ', '雨', 1)])
+        with open(dictionary_journal.get_journal_path(dictionary_path), 'a', encoding='utf-8') as f:
+            f.write('["bogus", "あめ", "飴", 1]\n["add", "あめ", "飴"\n')
+        assert dictionary_journal.load(dictionary_path) == {'たなか': {'田中': 3}, 'あめ': {'雨': 1}}
+
+
+class TestCompaction:
+    """Tests for compact(), write_snapshot() and stale journals."""
+
+    def test_compaction_past_threshold(self, dictionary_path):
+        journal_path = dictionary_journal.get_journal_path(dictionary_path)
+        with patch('dictionary_journal.COMPACT_THRESHOLD', 200):
+            for i in range(10):
+                dictionary_journal.append(dictionary_path, [('add', 'たなか', '田中', 1)])
+                assert not os.path.exists(journal_path) or os.path.getsize(journal_path) <= 200
+        assert dictionary_journal.load(dictionary_path) == {'たなか': {'田中': 13}}
+
+    def test_write_snapshot_starts_new_journal(self, dictionary_path):
+        dictionary_journal.append(dictionary_path, [('add', 'あめ', '雨', 1)])
+        assert dictionary_journal.write_snapshot(dictionary_path, {'かさ': {'傘': 1}})
+        assert not os.path.exists(dictionary_journal.get_journal_path(dictionary_path))
+        assert dictionary_journal.load(dictionary_path) == {'かさ': {'傘': 1}}
+
+    def test_stale_journal_is_not_applied_twice(self, dictionary_path):
+        journal_path = dictionary_journal.get_journal_path(dictionary_path)
+        dictionary_journal.append(dictionary_path, [('add', 'たなか', '田中', 1)])
+        with open(journal_path, encoding='utf-8') as f:
+            journal = f.read()
+        dictionary_journal.compact(dictionary_path)
+        # Compaction interrupted before the journal was removed
+        with open(journal_path, 'w', encoding='utf-8') as f:
+            f.write(journal)
+        assert dictionary_journal.load(dictionary_path) == {'たなか': {'田中': 4}}
+        assert not os.path.exists(journal_path)
+
+    def test_compaction_waits_for_load(self, dictionary_path):
+        dictionary_journal.append(dictionary_path, [('add', 'あめ', '雨', 1)])
+        real_load = json.load
+        compactors = []
+
+        def load_then_compact(f):
+            data = real_load(f)
+            if not compactors:
+                # Compaction starts between reading the snapshot and the journal
+                compactors.append(threading.Thread(
+                    target=dictionary_journal.compact, args=(dictionary_path,)))
+                compactors[0].start()
+                compactors[0].join(0.2)
+            return data
+
+        with patch('dictionary_journal.json.load', side_effect=load_then_compact):
+            data = dictionary_journal.load(dictionary_path)
+            compactors[0].join()
+        assert data == {'たなか': {'田中': 3}, 'あめ': {'雨': 1}}
+        assert dictionary_journal.load(dictionary_path) == data
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
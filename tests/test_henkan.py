@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+# tests/test_henkan.py - Unit tests for henkan.py
+
+import itertools
+import json
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import dictionary_journal
+import henkan
+import util
+
+
+SAMPLE_DICTIONARY = {
+    'きょう': {'今日': 10, '京': 3},
+    'てんき': {'天気': 5, '転機': 2},
+}
+
+
+@pytest.fixture
+def processor(tmp_path):
+    """HenkanProcessor over a small dictionary, with config dir in tmp_path"""
+    dict_path = tmp_path / 'sample.json'
+    dict_path.write_text(json.dumps(SAMPLE_DICTIONARY, ensure_ascii=False), encoding='utf-8')
+
+    with patch('util.get_user_config_dir', return_value=str(tmp_path)), \
+            patch('util.load_crf_tagger', return_value=None):
+        proc = henkan.HenkanProcessor([str(dict_path)])
+        deadline = time.time() + 5
+        while not proc.is_ready() and time.time() < deadline:
+            time.sleep(0.01)
+        assert proc.is_ready()
+        yield proc
+
+
+class TestConversionCache:
+    """Test suite for the LRU conversion result cache"""
+
+    def test_repeated_conversion_hits_cache(self, processor):
+        first = processor.convert('きょう')
+        second = processor.convert('きょう')
+        assert [c['surface'] for c in first] == ['今日', '京']
+        assert first == second
+        stats = processor.get_cache_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['size'] == 1
+
+    def test_new_generation_invalidates(self, processor):
+        processor.convert('きょう')
+        processor._install_generation(
+            processor._generation.replace(processor._generation.number + 1,
+                                          user_dictionary={'きょう': {'強': 100}}))
+        assert processor.convert('きょう')[0]['surface'] == '強'
+        assert processor.get_cache_stats()['hits'] == 0
+
+    def test_lru_eviction(self, processor):
+        with patch('henkan.CONVERSION_CACHE_SIZE', 2):
+            processor.convert('きょう')
+            processor.convert('てんき')
+            processor.convert('きょう')      # refresh きょう
+            processor.convert('あめ')        # evicts てんき
+            assert list(processor._conversion_cache) == ['きょう', 'あめ']
+
+    def test_learning_keeps_other_readings_cached(self, processor):
+        processor.convert('きょう')
+        processor.convert('てんき')
+        processor.learn('てんき', '転機')
+        assert processor.convert('きょう')[0]['surface'] == '今日'
+        assert processor.get_cache_stats()['hits'] == 1
+        processor.convert('てんき')
+        assert processor.get_cache_stats()['hits'] == 1
+
+    def test_learning_evicts_readings_containing_it(self, processor):
+        result = processor.compute_conversion('きょうは')
+        processor.compute_conversion('てんき')
+        assert processor.learn('きょう', '京')
+        assert list(processor._conversion_cache) == ['てんき']
+        assert not processor.is_result_current(result)
+        assert processor.is_result_current(processor.compute_conversion('てんき'))
+
+    def test_result_computed_across_learning_is_not_cached(self, processor):
+        learn_serial = processor._learn_serial
+        assert processor.learn('きょう', '京')
+        result = processor._compute_uncached_conversion(
+            'てんき', processor._generation, processor._result_tag())
+        result.learn_serial = learn_serial
+        processor._put_cached_conversion(result)
+        assert 'てんき' not in processor._conversion_cache
+
+    def test_cached_reading_converts_immediately(self, processor):
+        assert processor.can_convert_immediately('きょう')
+        assert not processor.can_convert_immediately('あめ')
+        processor.convert('あめ')
+        assert processor.can_convert_immediately('あめ')
+
+
+class TestIncrementalReload:
+    """Test suite for reload_dictionaries() on mode switch"""
+
+    @staticmethod
+    def _wait_for_generation(processor, number):
+        deadline = time.time() + 5
+        while processor._generation.number < number and time.time() < deadline:
+            time.sleep(0.01)
+        assert processor._generation.number >= number
+
+    def test_unchanged_sources_are_a_no_op(self, processor):
+        generation = processor._generation
+        with patch.object(processor, '_start_build') as start_build:
+            assert not processor.reload_dictionaries(generation.dictionary_files)
+        start_build.assert_not_called()
+        assert processor._generation is generation
+
+    def test_user_dictionary_change_applies_delta(self, processor, tmp_path):
+        generation = processor._generation
+        user_path = tmp_path / henkan.USER_DICTIONARY_FILENAME
+        user_path.write_text(json.dumps({'あめ': {'雨': 2}}, ensure_ascii=False), encoding='utf-8')
+        files = list(generation.dictionary_files) + [str(user_path)]
+        with patch.object(processor, '_start_build') as start_build:
+            assert processor.reload_dictionaries(files)
+        start_build.assert_not_called()
+        current = processor._generation
+        assert current.number > generation.number
+        # Base layers are shared, only the overlay is new
+        assert current.dictionary is generation.dictionary
+        assert current.compiled_layers is generation.compiled_layers
+        assert current.lookup('あめ') == (('雨', 2),)
+        assert current.lookup('きょう') == generation.lookup('きょう')
+        assert not processor.reload_dictionaries(files)
+
+    def test_base_change_builds_next_generation(self, processor, tmp_path):
+        generation = processor._generation
+        dict_path = tmp_path / 'sample.json'
+        dict_path.write_text(json.dumps({'あめ': {'雨': 7, '飴': 1}}, ensure_ascii=False), encoding='utf-8')
+        assert processor.reload_dictionaries(generation.dictionary_files)
+        # The current generation keeps serving conversions meanwhile
+        assert processor.is_ready()
+        self._wait_for_generation(processor, generation.number + 1)
+        assert processor._generation.lookup('あめ') == (('雨', 7), ('飴', 1))
+        assert processor._generation.lookup('きょう') is None
+
+    def test_stale_generation_is_discarded(self, processor, tmp_path):
+        generation = processor._generation
+        with processor._lock:
+            stale_number = processor._next_generation_number()
+        dict_path = tmp_path / 'sample.json'
+        dict_path.write_text(json.dumps({'あめ': {'雨': 7}}, ensure_ascii=False), encoding='utf-8')
+        assert processor.reload_dictionaries(generation.dictionary_files)
+        self._wait_for_generation(processor, stale_number + 1)
+        # The slower, older build finishes last
+        stale = henkan.DictionaryGeneration(number=stale_number, dictionary=SAMPLE_DICTIONARY)
+        assert not processor._install_generation(stale)
+        assert processor._generation.lookup('あめ') == (('雨', 7),)
+
+
+class TestSortedIndex:
+    """Test suite for the pre-sorted candidate index of DictionaryGeneration"""
+
+    def test_lookup_returns_presorted_tuple(self):
+        generation = henkan.DictionaryGeneration(
+            dictionary={'きょう': {'京': 3, '今日': 10}},
+            user_dictionary={'きょう': {'強': 5, '京': 7}})
+        assert generation.lookup('きょう') == (('今日', 10), ('京', 7), ('強', 5))
+        assert generation.lookup('きょう') is generation.lookup('きょう')
+        assert generation.lookup('あめ') is None
+
+    def test_user_edit_updates_only_touched_readings(self):
+        generation = henkan.DictionaryGeneration(dictionary=SAMPLE_DICTIONARY)
+        tenki = generation.lookup('てんき')
+        updated = generation.replace(1, user_dictionary={'きょう': {'強': 100}})
+        assert updated.lookup('きょう')[0] == ('強', 100)
+        assert updated.lookup('てんき') is tenki
+        # The previous generation is left untouched
+        assert generation.lookup('きょう')[0] == ('今日', 10)
+
+    def test_removed_user_entry_falls_back_to_base(self):
+        generation = henkan.DictionaryGeneration(user_dictionary={'あめ': {'雨': 1}})
+        assert generation.lookup('あめ') == (('雨', 1),)
+        assert generation.replace(1, user_dictionary={}).lookup('あめ') is None
+
+    def test_unrelated_change_shares_index(self):
+        generation = henkan.DictionaryGeneration(dictionary=SAMPLE_DICTIONARY)
+        updated = generation.replace(1, crf_feature_materials={'x': 1})
+        assert updated.sorted_index is generation.sorted_index
+
+    def test_prefix_search_unions_layers(self):
+        generation = henkan.DictionaryGeneration(
+            dictionary=SAMPLE_DICTIONARY, user_dictionary={'きょ': {'居': 1}})
+        assert generation.common_prefix_search('きょうは') == ['きょ', 'きょう']
+        assert generation.predictive_search('きょ') == ['きょ', 'きょう']
+        updated = generation.replace(1, user_dictionary={})
+        assert updated.dictionary_index is generation.dictionary_index
+        assert updated.common_prefix_search('きょうは') == ['きょう']
+
+
+class TestCandidate:
+    """Test suite for the Candidate tuple and its dict-style shim"""
+
+    def test_defaults_and_attributes(self):
+        candidate = henkan.Candidate('今日', 'きょう', 10)
+        assert candidate.surface == '今日'
+        assert candidate.count == 10
+        assert not candidate.passthrough
+        assert not candidate.bunsetsu_mode
+        assert not hasattr(candidate, '__dict__')
+
+    def test_dict_style_access(self):
+        candidate = henkan.Candidate('あめ', 'あめ', passthrough=True)
+        assert candidate['surface'] == 'あめ'
+        assert candidate[0] == 'あめ'
+        assert candidate.get('passthrough') is True
+        assert candidate.get('cost', 0) == 0
+        assert candidate.get('index') is None
+        with pytest.raises(KeyError):
+            candidate['cost']
+
+    def test_convert_returns_candidates(self, processor):
+        candidates = processor.convert('きょう')
+        assert candidates == [henkan.Candidate('今日', 'きょう', 10),
+                              henkan.Candidate('京', 'きょう', 3)]
+        passthrough = processor._lookup_bunsetsu_candidates('あめ')
+        assert passthrough == [henkan.Candidate('あめ', 'あめ', 0, True)]
+
+
+class TestLongestMatchSplit:
+    """Test suite for splitting Lookup bunsetsu that miss the dictionary"""
+
+    def test_split_prefers_longest_readings(self):
+        generation = henkan.DictionaryGeneration(dictionary={
+            'きょう': {'今日': 1}, 'きょ': {'巨': 1}, 'てんき': {'天気': 1}, 'てん': {'点': 1}})
+        assert generation.longest_match_split('きょうてんき') == [('きょう', True), ('てんき', True)]
+
+    def test_leftover_kana_are_merged(self):
+        generation = henkan.DictionaryGeneration(dictionary=SAMPLE_DICTIONARY)
+        assert generation.longest_match_split('あのきょうのね') == [
+            ('あの', False), ('きょう', True), ('のね', False)]
+        assert generation.longest_match_split('あめ') == [('あめ', False)]
+
+    def test_single_kana_readings_are_ignored(self):
+        generation = henkan.DictionaryGeneration(dictionary={'き': {'木': 1}})
+        assert generation.longest_match_split('きき') == [('きき', False)]
+
+    def test_missed_bunsetsu_offers_split_then_kana(self, processor):
+        candidates = processor._lookup_bunsetsu_candidates('きょうてんき')
+        assert [c.surface for c in candidates] == ['今日天気', '京天気', '今日転機', 'きょうてんき']
+        assert not candidates[0].passthrough
+
+    def test_other_candidate_of_one_piece_can_be_chosen(self, processor):
+        predictions = [([('きょうてんき', 'B-L'), ('は', 'B-P')], -1.0)]
+        with patch.object(processor, '_bunsetsu_prediction_stream',
+                          side_effect=lambda text: iter(predictions)):
+            processor.convert('きょうてんきは')
+            assert processor.get_display_surface() == '今日天気は'
+            processor.next_bunsetsu_candidate()
+            processor.next_bunsetsu_candidate()
+            assert processor.get_display_surface() == '今日転機は'
+
+
+class TestBunsetsuCandidateMemo:
+    """Test suite for lazy, memoized per-bunsetsu candidate lists"""
+
+    PREDICTIONS = [
+        ([('きょう', 'B-L'), ('は', 'B-P'), ('てんき', 'B-L')], -1.0),
+        ([('きょう', 'B-L'), ('はてんき', 'B-L')], -2.0),
+        ([('きょうは', 'B-L'), ('てんき', 'B-L')], -3.0),
+    ]
+
+    def test_cycling_looks_up_only_new_bunsetsu(self, processor):
+        with patch.object(processor, '_bunsetsu_prediction_stream',
+                          side_effect=lambda text: iter(self.PREDICTIONS)), \
+                patch.object(processor, '_lookup_bunsetsu_candidates',
+                             wraps=processor._lookup_bunsetsu_candidates) as lookup:
+            processor.convert('きょうはてんき')
+            assert processor.get_display_surface() == '今日は天気'
+            assert lookup.call_count == 0
+
+            processor.cycle_bunsetsu_prediction()
+            assert processor.get_bunsetsu_count() == 2
+            assert processor.get_display_surface() == '今日は天気'  # は|てんき split
+            processor.cycle_bunsetsu_prediction()
+            processor.get_display_surface()
+            processor.cycle_bunsetsu_prediction()
+            assert processor.get_display_surface() == '今日は天気'
+            # Only the bunsetsu that miss the dictionary need their lists (split)
+            looked_up = [call.args[0] for call in lookup.call_args_list]
+            assert looked_up == ['はてんき', 'きょうは']
+
+            processor.next_bunsetsu_candidate()
+            processor.next_bunsetsu_candidate()
+            assert [call.args[0] for call in lookup.call_args_list][2:] == ['きょう']
+
+    def test_candidates_are_materialized_lazily(self, processor):
+        with patch.object(processor, '_bunsetsu_prediction_stream',
+                          side_effect=lambda text: iter(self.PREDICTIONS)):
+            processor.convert('きょうはてんき')
+            processor.get_display_surface_with_selection()
+            assert processor._bunsetsu_candidates == [None, None, None]
+            processor.next_bunsetsu_candidate()
+            assert processor.get_display_surface_with_selection() == [
+                ('京', True), ('は', False), ('天気', False)]
+            assert processor._bunsetsu_candidates[0] is not None
+            assert processor._bunsetsu_candidates[2] is None
+
+    def test_unnavigated_bunsetsu_are_not_learned(self, processor):
+        with patch.object(processor, '_bunsetsu_prediction_stream',
+                          side_effect=lambda text: iter(self.PREDICTIONS)):
+            processor.convert('きょうはてんき')
+            assert processor.learn_selection() == 0
+            assert processor._learned == {}
+
+
+class TestBunsetsuPredictions:
+    """Test suite for lazily produced, capped bunsetsu predictions"""
+
+    def test_source_is_drawn_on_demand(self):
+        drawn = []
+
+        def source():
+            for i in range(10):
+                drawn.append(i)
+                yield ([('きょう', 'B-L'), ('は', 'B-P')], -float(i))
+
+        predictions = henkan.BunsetsuPredictions(source(), limit=3)
+        assert predictions.get(0)[1] == 0.0
+        assert drawn == [0]
+        assert predictions.get(2)[1] == -2.0
+        assert predictions.get(3) is None
+        assert drawn == [0, 1, 2]
+
+    def test_single_bunsetsu_does_not_count_toward_limit(self):
+        single = ([('きょうは', 'B-L')], -1.0)
+        multi = ([('きょう', 'B-L'), ('は', 'B-P')], -2.0)
+        predictions = henkan.BunsetsuPredictions([single, multi, single, multi, multi], limit=2)
+        assert predictions.get(0) == multi
+        assert predictions.get(1) == multi
+        assert predictions.get(2) is None
+        assert predictions.produced == 2
+        assert not henkan.BunsetsuPredictions([single])
+
+    def test_draws_are_bounded(self):
+        single = ([('きょうは', 'B-L')], -1.0)
+        with patch('henkan.BUNSETSU_MAX_DRAWS_PER_PREDICTION', 3):
+            predictions = henkan.BunsetsuPredictions(itertools.repeat(single), limit=2)
+        assert predictions.get(0) is None
+
+    def test_n_best_caps_cycling(self, processor):
+        predictions = TestBunsetsuCandidateMemo.PREDICTIONS
+        processor.set_bunsetsu_n_best(2)
+        with patch.object(processor, '_bunsetsu_prediction_stream',
+                          side_effect=lambda text: iter(predictions)):
+            processor.convert('きょうはてんき')
+            assert processor.get_bunsetsu_count() == 3
+            processor.cycle_bunsetsu_prediction()
+            assert processor.get_bunsetsu_count() == 2
+            processor.cycle_bunsetsu_prediction()
+            assert processor.get_bunsetsu_count() == 3
+
+
+class TestLearning:
+    """Test suite for learning confirmed selections and writing them behind"""
+
+    def test_one_selection_ranks_first(self, processor):
+        assert processor.learn('きょう', '京')
+        assert processor._generation.lookup('きょう') == (('京', 11), ('今日', 10))
+        assert [c['surface'] for c in processor.convert('きょう')] == ['京', '今日']
+
+    def test_top_candidate_is_not_learned(self, processor):
+        number = processor._generation.number
+        assert not processor.learn('きょう', '今日')
+        assert processor._generation.number == number
+        assert processor._learned == {}
+
+    def test_only_dictionary_candidates_are_learned(self, processor):
+        number = processor._generation.number
+        assert not processor.learn('きょう', '強')
+        assert not processor.learn('あめ', '雨')
+        processor.set_learning(False)
+        assert not processor.learn('きょう', '京')
+        assert processor._generation.number == number
+
+    def test_selection_skips_passthrough_bunsetsu(self, processor):
+        with patch.object(processor, '_bunsetsu_prediction_stream',
+                          side_effect=lambda text: iter(TestBunsetsuCandidateMemo.PREDICTIONS)):
+            processor.convert('きょうはてんき')
+            processor.next_bunsetsu()
+            processor.next_bunsetsu()
+            processor.next_bunsetsu_candidate()
+            assert processor.learn_selection() == 1
+        assert processor._learned == {('てんき', '転機'): 6}
+
+    def test_flush_merges_into_user_dictionary(self, processor, tmp_path):
+        user_path = tmp_path / henkan.USER_DICTIONARY_FILENAME
+        user_path.write_text(json.dumps({'あめ': {'雨': 2}}, ensure_ascii=False), encoding='utf-8')
+        processor.learn('てんき', '転機')
+        processor.flush_learning(wait=True)
+        assert dictionary_journal.load(str(user_path)) == {'あめ': {'雨': 2}, 'てんき': {'転機': 6}}
+        assert processor._learned == {}
+
+    def test_unsaved_counts_survive_reload(self, processor, tmp_path):
+        processor.learn('きょう', '京')
+        user_path = tmp_path / henkan.USER_DICTIONARY_FILENAME
+        user_path.write_text(json.dumps({'あめ': {'雨': 2}}, ensure_ascii=False), encoding='utf-8')
+        processor.reload_dictionaries(list(processor._generation.dictionary_files) + [str(user_path)])
+        assert processor._generation.lookup('きょう')[0] == ('京', 11)
+        assert processor._generation.lookup('あめ') == (('雨', 2),)
+
+    def test_journal_edits_are_reloaded(self, processor, tmp_path):
+        user_path = str(tmp_path / henkan.USER_DICTIONARY_FILENAME)
+        files = list(processor._generation.dictionary_files) + [user_path]
+        dictionary_journal.append(user_path, [('add', 'あめ', '雨', 2)])
+        processor.reload_dictionaries(files)
+        assert processor._generation.lookup('あめ') == (('雨', 2),)
+        dictionary_journal.append(user_path, [('remove', 'あめ', '雨')])
+        assert processor.reload_dictionaries(files)
+        assert processor._generation.lookup('あめ') is None
+
+    def test_timer_writes_behind(self, processor, tmp_path):
+        with patch('henkan.LEARNING_FLUSH_DELAY', 0.01):
+            processor.learn('きょう', '京')
+        user_path = tmp_path / henkan.USER_DICTIONARY_FILENAME
+        deadline = time.time() + 5
+        while processor._learned and time.time() < deadline:
+            time.sleep(0.01)
+        assert dictionary_journal.load(str(user_path)) == {'きょう': {'京': 11}}
+
+
+class TestLatticeConversion:
+    """Test suite for the dictionary word lattice decoder"""
+
+    @pytest.fixture
+    def lattice_processor(self, processor):
+        processor._crf_model = util.CRFModel(
+            ['B-L', 'I-L', 'B-P', 'I-P'],
+            {('char:は', 'B-P'): 3.0, ('char:て', 'B-L'): 1.0,
+             ('char:ょ', 'I-L'): 1.0, ('char:う', 'I-L'): 1.0, ('char:ん', 'I-L'): 1.0},
+            {('B-L', 'I-L'): 1.0, ('I-L', 'I-L'): 1.0, ('I-L', 'B-P'): 1.0, ('B-P', 'B-L'): 1.0})
+        processor._install_generation(processor._generation.replace(
+            processor._generation.number + 1, user_dictionary={'てん': {'点': 3}}))
+        return processor
+
+    def test_best_path_uses_dictionary_words(self, lattice_processor):
+        predictions = lattice_processor.predict_lattice('きょうはてんき', n_best=3)
+        assert predictions[0][0] == [('きょう', 'B-L'), ('は', 'B-P'), ('てんき', 'B-L')]
+        scores = [score for _, score in predictions]
+        assert scores == sorted(scores, reverse=True)
+        assert len({tuple(p) for p, _ in predictions}) == len(predictions)
+
+    def test_segmentations_are_produced_lazily(self, lattice_processor):
+        stream = lattice_processor._lattice_prediction_stream('きょうはてんき')
+        assert list(itertools.islice(stream, 3)) == lattice_processor.predict_lattice(
+            'きょうはてんき', n_best=3)
+
+    def test_unknown_yomi_is_covered_by_passthrough(self, lattice_processor):
+        bunsetsu_list, _ = lattice_processor.predict_lattice('きょうはあめ', n_best=1)[0]
+        assert ''.join(text for text, _ in bunsetsu_list) == 'きょうはあめ'
+        assert bunsetsu_list[0] == ('きょう', 'B-L')
+
+    def test_enabled_conversion_uses_lattice(self, lattice_processor):
+        lattice_processor.set_lattice_conversion(True)
+        lattice_processor.convert('きょうはてんき')
+        assert lattice_processor.get_display_surface() == '今日は天気'
+
+    def test_no_model_returns_empty(self, processor):
+        assert processor.predict_lattice('きょうはてんき') == []
+
+    def test_model_change_is_dropped_by_next_prediction(self, lattice_processor):
+        model = lattice_processor._crf_model
+        lattice_processor._crf_source_stats = ('stale', lattice_processor._crf_source_stats[1])
+        lattice_processor._refresh_crf_sources()
+        # Not cleared by the caller's thread, only under the lattice lock
+        assert lattice_processor._crf_model is model
+        assert lattice_processor.predict_lattice('きょうはてんき') == []
+        assert lattice_processor._crf_model is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
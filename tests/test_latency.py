@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the latency histograms.
+
+Tests cover:
+- Log-linear bucket bounds
+- Percentiles, mean and max of a histogram
+- The timed() decorator and the enabled guard
+- Report formatting and the JSON report file
+"""
+
+import json
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+import latency
+from latency import LatencyHistogram
+
+
+@pytest.fixture(autouse=True)
+def reset_latency():
+    latency.reset()
+    latency.configure(True)
+    yield
+    latency.reset()
+    latency.configure(True)
+
+
+class TestBuckets:
+    """Tests for _bucket_index() and _bucket_upper_bound()."""
+
+    def test_bucket_bounds_cover_value_within_error(self):
+        for value in list(range(2000)) + [10 ** 6, 123456789, 2 ** 40 + 5]:
+            index = latency._bucket_index(value)
+            upper = latency._bucket_upper_bound(index)
+            assert value <= upper <= value * 1.125 + 1
+            if index:
+                assert latency._bucket_upper_bound(index - 1) < value
+
+
+class TestLatencyHistogram:
+    """Tests for LatencyHistogram."""
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for us in range(1, 101):
+            histogram.add(us * 1000)
+        for p, expected in ((50, 50000), (95, 95000), (99, 99000)):
+            assert expected <= histogram.percentile(p) <= expected * 1.125
+        assert histogram.percentile(100) == 100000
+
+    def test_summary(self):
+        histogram = LatencyHistogram()
+        histogram.add(2000)
+        histogram.add(4000)
+        summary = histogram.summary()
+        assert summary['count'] == 2
+        assert summary['mean_us'] == 3.0
+        assert summary['max_us'] == 4.0
+        assert summary['p50_us'] <= 2.25
+
+    def test_empty(self):
+        assert LatencyHistogram().summary() == {
+            'count': 0, 'mean_us': 0.0, 'p50_us': 0.0, 'p95_us': 0.0, 'p99_us': 0.0, 'max_us': 0.0}
+
+
+class TestRecording:
+    """Tests for add(), timed() and summary()."""
+
+    def test_add_per_path(self):
+        latency.add('key.marker', 1000)
+        latency.add('key.marker', 3000)
+        latency.add('henkan.crf_viterbi', 500)
+        stats = latency.summary()
+        assert list(stats) == ['henkan.crf_viterbi', 'key.marker']
+        assert stats['key.marker']['count'] == 2
+
+    def test_timed_records_calls(self):
+        @latency.timed('test.func')
+        def func(x):
+            return x * 2
+
+        assert func(21) == 42
+        assert latency.summary()['test.func']['count'] == 1
+
+    def test_timed_records_raising_calls(self):
+        @latency.timed('test.raises')
+        def func():
+            raise ValueError
+
+        with pytest.raises(ValueError):
+            func()
+        assert latency.summary()['test.raises']['count'] == 1
+
+    def test_disabled_timed_does_not_record(self):
+        @latency.timed('test.func')
+        def func():
+            return 1
+
+        latency.configure(False)
+        assert func() == 1
+        assert latency.summary() == {}
+
+
+class TestReport:
+    """Tests for format_report() and write_report()."""
+
+    def test_format_report(self):
+        assert latency.format_report() == 'No latency samples recorded.'
+        latency.add('key.simultaneous', 1500000)
+        lines = latency.format_report().splitlines()
+        assert lines[0].split() == ['path', 'count', 'p50', 'ms', 'p95', 'ms', 'p99', 'ms', 'max', 'ms']
+        assert lines[1].split()[:2] == ['key.simultaneous', '1']
+        assert lines[1].split()[-1] == '1.500'
+
+    def test_write_report(self, tmp_path):
+        latency.add('henkan.conversion', 2000000)
+        path = str(tmp_path / 'latency_report.json')
+        stats = latency.write_report(path)
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+        assert report['paths'] == stats
+        assert report['paths']['henkan.conversion']['max_us'] == 2000.0
+
+    def test_write_report_failure(self, tmp_path):
+        blocker = tmp_path / 'file'
+        blocker.write_text('')
+        assert latency.write_report(str(blocker / 'latency_report.json')) is None
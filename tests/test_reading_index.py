@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the sorted reading prefix index.
+
+Tests cover:
+- common_prefix_search() over readings that are prefixes of the text
+- predictive_search() over readings starting with a prefix, with limit
+- Early termination when no reading shares the prefix
+"""
+
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from reading_index import ReadingIndex
+
+
+READINGS = ['き', 'きょ', 'きょう', 'きょうと', 'きょく', 'きり', 'は', 'はし']
+
+
+@pytest.fixture
+def index():
+    return ReadingIndex(reversed(READINGS))
+
+
+class TestCommonPrefixSearch:
+    """Tests for ReadingIndex.common_prefix_search()."""
+
+    def test_all_prefixes_shortest_first(self, index):
+        assert index.common_prefix_search('きょうは') == ['き', 'きょ', 'きょう']
+
+    def test_whole_text_is_reading(self, index):
+        assert index.common_prefix_search('きょうと') == ['き', 'きょ', 'きょう', 'きょうと']
+
+    def test_no_prefix(self, index):
+        assert index.common_prefix_search('あめ') == []
+        assert index.common_prefix_search('') == []
+
+    def test_gap_in_prefixes(self, index):
+        # 'はしら' is not a reading, but 'は' and 'はし' are
+        assert index.common_prefix_search('はしら') == ['は', 'はし']
+
+
+class TestPredictiveSearch:
+    """Tests for ReadingIndex.predictive_search()."""
+
+    def test_readings_starting_with_prefix(self, index):
+        assert index.predictive_search('きょ') == ['きょ', 'きょう', 'きょうと', 'きょく']
+
+    def test_limit(self, index):
+        assert index.predictive_search('き', limit=2) == ['き', 'きょ']
+
+    def test_no_match(self, index):
+        assert index.predictive_search('あ') == []
+
+    def test_len_and_contains(self, index):
+        assert len(index) == len(READINGS)
+        assert 'きょく' in index
+        assert 'きゃ' not in index
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the structured event tracing ring buffer.
+
+Tests cover:
+- Enabling/disabling and the module-level guard
+- Ring buffer capacity and resizing
+- JSON lines dump format
+"""
+
+import json
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+import tracing
+
+
+@pytest.fixture(autouse=True)
+def reset_tracing():
+    tracing.configure(False)
+    tracing.clear()
+    yield
+    tracing.configure(False)
+    tracing.clear()
+
+
+class TestRingBuffer:
+    """Tests for configure(), record() and snapshot()."""
+
+    def test_disabled_by_default(self):
+        assert tracing.enabled is False
+
+    def test_configure_sets_guard(self):
+        tracing.configure(True)
+        assert tracing.enabled is True
+        tracing.configure(False)
+        assert tracing.enabled is False
+
+    def test_records_are_kept_in_order(self):
+        tracing.configure(True)
+        tracing.record('key', key='a', pressed=True)
+        tracing.record('marker', action='pressed')
+        events = tracing.snapshot()
+        assert [(kind, fields) for _, kind, fields in events] == [
+            ('key', {'key': 'a', 'pressed': True}),
+            ('marker', {'action': 'pressed'}),
+        ]
+        assert events[0][0] <= events[1][0]
+
+    def test_oldest_events_are_dropped(self):
+        tracing.configure(True, capacity=3)
+        for i in range(5):
+            tracing.record('key', n=i)
+        assert [fields['n'] for _, _, fields in tracing.snapshot()] == [2, 3, 4]
+
+    def test_resize_keeps_newest_events(self):
+        tracing.configure(True, capacity=4)
+        for i in range(4):
+            tracing.record('key', n=i)
+        tracing.configure(True, capacity=2)
+        assert [fields['n'] for _, _, fields in tracing.snapshot()] == [2, 3]
+
+    def test_invalid_capacity_uses_default(self):
+        tracing.configure(True, capacity='many')
+        for i in range(10):
+            tracing.record('key', n=i)
+        assert len(tracing.snapshot()) == 10
+
+    def test_clear(self):
+        tracing.configure(True)
+        tracing.record('key')
+        tracing.clear()
+        assert tracing.snapshot() == []
+
+
+class TestDump:
+    """Tests for dump()."""
+
+    def test_dump_writes_header_and_events(self, tmp_path):
+        tracing.configure(True, capacity=8)
+        tracing.record('key', key='a', elapsed_us=12)
+        tracing.record('kanchoku', action='output', kanji='漢', keys=('j', 'k'))
+        path = str(tmp_path / 'trace' / 'event_trace.jsonl')
+
+        assert tracing.dump(path) == 2
+        with open(path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        assert lines[0]['events'] == 2
+        assert lines[0]['capacity'] == 8
+        assert lines[1]['kind'] == 'key' and lines[1]['key'] == 'a' and lines[1]['elapsed_us'] == 12
+        assert lines[2]['kanji'] == '漢' and lines[2]['keys'] == ['j', 'k']
+        assert lines[1]['t_ns'] <= lines[2]['t_ns'] <= lines[0]['perf_counter_ns']
+
+    def test_dump_failure_returns_none(self, tmp_path):
+        blocker = tmp_path / 'file'
+        blocker.write_text('')
+        assert tracing.dump(str(blocker / 'event_trace.jsonl')) is None
@@ -3,6 +3,7 @@
 
 import pytest
 import json
+import itertools
 import os
 import tempfile
 import shutil
@@ -687,5 +688,217 @@ class TestGetDictionaryFiles:
         assert result[0] == imported_dict_path
 
 
+class FakeTagger:
+    """Minimal stand-in for pycrfsuite.Tagger exposing info() and labels()"""
+
+    def __init__(self):
+        self.info_calls = 0
+
+    def labels(self):
+        return ['B-L', 'I-L', 'B-P', 'I-P']
+
+    def info(self):
+        self.info_calls += 1
+        return MagicMock(
+            state_features={
+                ('char:き', 'B-L'): 2.0,
+                ('char:ょ', 'I-L'): 1.5,
+                ('char:う', 'I-L'): 1.0,
+                ('char:は', 'B-P'): 2.5,
+                ('char:う', 'B-P'): 0.5,
+                ('char:ょ', 'UNKNOWN'): 9.0,
+            },
+            transitions={
+                ('B-L', 'I-L'): 1.0,
+                ('I-L', 'I-L'): 0.5,
+                ('I-L', 'B-P'): 0.8,
+                ('B-P', 'B-L'): -0.3,
+            },
+        )
+
+
+class TestCRFModel:
+    """Test suite for CRFModel / compile_crf_model()"""
+
+    def test_compile_reads_tagger_info_once(self):
+        tagger = FakeTagger()
+        model = util.compile_crf_model(tagger)
+        for _ in range(3):
+            util.crf_nbest_predict(model, 'きょうは', n_best=3)
+        assert tagger.info_calls == 1
+
+    def test_compile_none_tagger(self):
+        assert util.compile_crf_model(None) is None
+
+    def test_feature_rows_and_transition_matrix(self):
+        model = util.compile_crf_model(FakeTagger())
+        assert model.feature_weights['char:う'] == (0.0, 1.0, 0.5, 0.0)
+        assert model.transitions[model.label_index['B-L']][model.label_index['I-L']] == 1.0
+        assert model.transitions[model.label_index['I-P']][model.label_index['B-L']] == 0.0
+
+    def test_emission_matches_uncompiled_path(self):
+        tagger = FakeTagger()
+        model = util.compile_crf_model(tagger)
+        features = util.add_features_per_line('きょうは')
+        info = tagger.info()
+        expected = util.crf_compute_emission_scores(features, info.state_features, tagger.labels())
+        assert model.emission_scores(features) == expected
+
+    def test_predict_with_model_matches_tagger(self):
+        tagger = FakeTagger()
+        model = util.compile_crf_model(tagger)
+        assert util.crf_nbest_predict(model, 'きょうは', n_best=4) == \
+            util.crf_nbest_predict(tagger, 'きょうは', n_best=4)
+
+    def test_predict_without_numpy_matches(self):
+        pytest.importorskip('numpy')
+        tagger = FakeTagger()
+        vectorized = util.crf_nbest_predict(util.compile_crf_model(tagger), 'きょうはうき', n_best=5)
+        with patch('util.np', None):
+            model = util.compile_crf_model(tagger)
+            assert model.weight_matrix is None
+            fallback = util.crf_nbest_predict(model, 'きょうはうき', n_best=5)
+        assert [labels for labels, _ in vectorized] == [labels for labels, _ in fallback]
+        assert [score for _, score in vectorized] == pytest.approx([score for _, score in fallback])
+
+
+class TestCRFNbestViterbiNumpy:
+    """Test suite for crf_nbest_viterbi_numpy() against crf_nbest_viterbi()"""
+
+    LABELS = ['B-L', 'I-L', 'B-P', 'I-P']
+
+    @pytest.mark.parametrize('n_positions, n_best', [(1, 5), (2, 3), (7, 1), (9, 10), (6, 40)])
+    def test_matches_pure_python(self, n_positions, n_best):
+        np = pytest.importorskip('numpy')
+        rng = np.random.default_rng(n_positions * 100 + n_best)
+        emission = rng.uniform(-3, 3, size=(n_positions, 4))
+        transitions = rng.uniform(-2, 2, size=(4, 4))
+
+        expected = util.crf_nbest_viterbi(emission.tolist(), transitions.tolist(), self.LABELS, n_best)
+        result = util.crf_nbest_viterbi_numpy(emission, transitions, self.LABELS, n_best)
+
+        assert [labels for labels, _ in result] == [labels for labels, _ in expected]
+        assert [score for _, score in result] == pytest.approx([score for _, score in expected])
+
+    def test_empty_emission(self):
+        np = pytest.importorskip('numpy')
+        assert util.crf_nbest_viterbi_numpy(np.zeros((0, 4)), np.zeros((4, 4)), self.LABELS) == []
+
+class TestCRFLattice:
+    """Test suite for CRFLattice incremental prediction"""
+
+    def _model(self):
+        return util.compile_crf_model(FakeTagger())
+
+    def test_growing_input_matches_full_prediction(self):
+        model = self._model()
+        lattice = util.CRFLattice(model, n_best=5)
+        text = ''
+        for ch in 'きょうはうきabcきょう':
+            text += ch
+            assert lattice.predict(text) == util.crf_nbest_predict(model, text, n_best=5)
+
+    def test_appending_reuses_prefix(self):
+        lattice = util.CRFLattice(self._model(), n_best=3)
+        lattice.predict('きょうはうき')
+        lattice.predict('きょうはうきょ')
+        assert lattice.reused_positions == 4
+
+    def test_backspace_and_edit(self):
+        model = self._model()
+        lattice = util.CRFLattice(model, n_best=3)
+        for text in ('きょうは', 'きょう', 'きはうは', '', 'う'):
+            assert lattice.predict(text) == util.crf_nbest_predict(model, text, n_best=3)
+
+    def test_pure_python_fallback(self):
+        with patch('util.np', None):
+            model = self._model()
+            lattice = util.CRFLattice(model, n_best=4)
+            for text in ('き', 'きょ', 'きょうは'):
+                assert lattice.predict(text) == util.crf_nbest_predict(model, text, n_best=4)
+
+    def test_is_compatible(self):
+        model = self._model()
+        lattice = util.CRFLattice(model, n_best=5)
+        assert lattice.is_compatible(model, 5, None)
+        assert not lattice.is_compatible(model, 3, None)
+        assert not lattice.is_compatible(self._model(), 5, None)
+
+    def test_marginals_then_predict(self):
+        model = self._model()
+        lattice = util.CRFLattice(model, n_best=3)
+        lattice.predict('きょう')
+        assert len(lattice.marginals('きょうはうき')) == 6
+        assert lattice.predict('きょうはうきょ') == util.crf_nbest_predict(model, 'きょうはうきょ', n_best=3)
+
+    @pytest.mark.parametrize('vectorized', [True, False])
+    def test_paths_match_nbest_prediction(self, vectorized):
+        with patch('util.np', util.np if vectorized else None):
+            model = self._model()
+            lattice = util.CRFLattice(model, n_best=1)
+            for text in ('きょう', 'きょうはうき', 'はう'):
+                expected = util.crf_nbest_predict(model, text, n_best=20)
+                result = list(itertools.islice(lattice.paths(text), 20))
+                # Equal-scoring paths may come out in either order
+                assert [score for _, score in result] == pytest.approx([score for _, score in expected])
+                assert result[0][0] == expected[0][0]
+
+    def test_paths_convert_only_changed_positions(self):
+        model = self._model()
+        lattice = util.CRFLattice(model, n_best=1)
+        lattice.paths('きょうはうき')
+        rows = list(lattice._viterbi_rows)
+        paths = lattice.paths('きょうはうきょ')
+        # Positions before the feature window of the change are shared
+        assert all(a is b for a, b in zip(rows[:4], lattice._viterbi_rows))
+        assert len(lattice._viterbi_rows) == 7
+        assert next(paths) == util.crf_nbest_predict(model, 'きょうはうきょ', n_best=1)[0]
+
+    def test_paths_outlive_lattice_updates(self):
+        model = self._model()
+        lattice = util.CRFLattice(model, n_best=1)
+        paths = lattice.paths('きょうは')
+        first = next(paths)
+        lattice.paths('うき')
+        expected = util.crf_nbest_predict(model, 'きょうは', n_best=3)
+        assert [first, next(paths), next(paths)] == expected
+        assert list(lattice.paths('')) == []
+
+
+class TestCRFMarginals:
+    """Test suite for crf_marginals() / crf_marginals_numpy()"""
+
+    EMISSION = [[1.0, -0.5, 0.3, 0.0], [0.2, 1.5, -1.0, 0.4], [-0.3, 0.8, 0.9, 0.1]]
+    TRANSITIONS = [[0.0, 1.0, -0.5, 0.2], [0.3, 0.5, 0.8, -0.2],
+                   [-0.3, 0.1, 0.0, 0.6], [0.4, -0.1, 0.2, 0.0]]
+
+    def _brute_force(self):
+        import itertools
+        import math
+        weights = {}
+        for path in itertools.product(range(4), repeat=len(self.EMISSION)):
+            score = sum(self.EMISSION[t][j] for t, j in enumerate(path))
+            score += sum(self.TRANSITIONS[i][j] for i, j in zip(path, path[1:]))
+            weights[path] = math.exp(score)
+        total = sum(weights.values())
+        return [[sum(w for path, w in weights.items() if path[t] == j) / total for j in range(4)]
+                for t in range(len(self.EMISSION))]
+
+    def test_matches_brute_force_enumeration(self):
+        marginals = util.crf_marginals(self.EMISSION, self.TRANSITIONS)
+        expected = self._brute_force()
+        for row, expected_row in zip(marginals, expected):
+            assert row == pytest.approx(expected_row)
+            assert sum(row) == pytest.approx(1.0)
+
+    def test_numpy_matches_pure_python(self):
+        np = pytest.importorskip('numpy')
+        result = util.crf_marginals_numpy(np.array(self.EMISSION), np.array(self.TRANSITIONS))
+        expected = util.crf_marginals(self.EMISSION, self.TRANSITIONS)
+        assert result.tolist() == [pytest.approx(row) for row in expected]
+
+    def test_empty(self):
+        assert util.crf_marginals([], self.TRANSITIONS) == []
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])